@@ -3,6 +3,19 @@ ASGI config for Placify project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The cheap, frequent views (pages, status polling and streaming, results,
+downloads, live job description analysis) are async and the middleware in
+main/middleware.py runs on the event loop, so a worker serves thousands of
+concurrent requests on one loop, e.g.
+
+    uvicorn Placify.asgi:application --workers 4
+
+For this profile run generation jobs with ``manage.py run_resume_workers``
+and RESUME_WORKERS_IN_PROCESS = False. On PostgreSQL use DB_POOL=1 rather
+than persistent connections. The form posts, history pages and admin are sync
+views and run in a thread. ``manage.py bench_asgi`` compares this profile
+with WSGI.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
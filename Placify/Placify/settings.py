@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,14 +41,18 @@ INSTALLED_APPS = [
     'main',
 ]
 
+# Django's built-in middleware, subclassed in main/middleware.py so that under
+# ASGI their hooks run on the event loop instead of in a thread each
 MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'main.middleware.RequestMetricsMiddleware',
+    'main.middleware.SecurityMiddleware',
+    'main.middleware.SessionMiddleware',
+    'main.middleware.CommonMiddleware',
+    'main.middleware.CsrfViewMiddleware',
+    'main.middleware.AuthenticationMiddleware',
+    'main.middleware.MessageMiddleware',
+    'main.middleware.XFrameOptionsMiddleware',
+    'main.middleware.ViewTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'Placify.urls'
@@ -56,8 +61,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory (Django's default since 4.1,
+            # spelled out here; with DEBUG on they are reloaded when edited)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -71,15 +83,71 @@ TEMPLATES = [
 WSGI_APPLICATION = 'Placify.wsgi.application'
 
 
-# Database
+# Database (see main/management/commands/bench_sessions.py)
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgresql selects the production profile: persistent
+# connections, or a psycopg connection pool with DB_POOL=1. The SQLite
+# profile is for development and small single-server deployments.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'placify'),
+            'USER': os.environ.get('DB_USER', 'placify'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Reuse connections across requests rather than connecting for
+            # each one; checked before reuse so a restarted server is survived
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DB_POOL') == '1':
+        # A pool shared by the threads of each process (requires psycopg[pool]);
+        # Django forbids combining it with persistent connections
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 20)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # Tests use a file rather than shared in-memory SQLite, where
+            # concurrent writers (the load test in main/tests.py) fail at once
+            # with "table is locked" instead of waiting
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+            'OPTIONS': {
+                # Take the write lock when a transaction starts. Deferred
+                # transactions that read and then write (update_or_create, the
+                # job claim) fail with "database is locked" under concurrency,
+                # since SQLite cannot wait for a lock upgrade.
+                'transaction_mode': 'IMMEDIATE',
+                # Busy timeout: seconds a writer waits for the lock before
+                # failing with "database is locked"
+                'timeout': int(os.environ.get('DB_SQLITE_TIMEOUT', 20)),
+                # Run on every new connection. WAL lets readers proceed while
+                # one connection writes, and with synchronous=NORMAL a commit
+                # no longer waits for fsync (a power loss may drop the last
+                # commits, never corrupt the file). mmap serves reads from the
+                # page cache without copying.
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA mmap_size=268435456;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -118,15 +186,210 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Static asset pipeline (see main/assets.py and bench_pages): collectstatic
+# writes content-hashed names plus .gz/.br copies to STATIC_ROOT. With
+# STATIC_SERVE Django serves them itself, precompressed and cached for a year;
+# turn it off when nginx or a CDN serves STATIC_ROOT.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATIC_SERVE = True
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'main.assets.CompressedManifestStorage'},
+}
+
+# Pages rendered once for every anonymous visitor (see main/page_cache.py).
+# Set PAGE_CACHE_SECONDS=0 while editing their templates.
+PAGE_CACHE = 'default'
+PAGE_CACHE_SECONDS = int(os.environ.get('PAGE_CACHE_SECONDS', 5 * 60))
+
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Generated resumes and job analyses (see main/resume_cache.py). LocMemCache
+    # evicts least-recently-used entries past MAX_ENTRIES; use a shared backend
+    # (file, Redis, Memcached) to share hits between worker processes.
+    'resumes': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'placify-resumes',
+        'OPTIONS': {
+            'MAX_ENTRIES': 2000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+    # Session reads for the cached_db and cache profiles (see Sessions below).
+    # A file cache is shared by every process on the host, so a session
+    # changed in one worker is never read stale from another; 'locmem' is
+    # faster but only safe with a single process.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'placify-sessions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    } if os.environ.get('SESSION_CACHE') == 'locmem' else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Progress events of running generations (see Live progress streaming
+    # below). A job publishes a few hundred events, kept for an hour. Workers
+    # in other processes need a cache they share with the web process; see
+    # RESUME_WORKERS_IN_PROCESS below.
+    'progress': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'placify-progress',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+    # Rate-limit buckets (see Rate limiting below), one per endpoint and user,
+    # session, client address or global scope. Kept apart from 'default' so
+    # cached pages and analyses cannot evict them and reset a limit. With
+    # several web processes use a shared backend (Redis, Memcached or the
+    # database cache) so they all count against the same buckets.
+    'ratelimit': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'placify-ratelimit',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# Session configuration for storing resume data
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Sessions and messages (see main/management/commands/bench_requests.py)
+# SESSION_PROFILE selects where sessions live:
+# - 'cached_db': read from the 'sessions' cache, written through to the
+#   database, so only requests that change the session touch it (default)
+# - 'cache': the cache alone; sessions end when it is cleared
+# - 'signed_cookies': in the cookie itself, no storage at all; the client can
+#   read (not change) the data, and it must stay well under 4 KB
+# - 'db': the database on every request
+SESSION_PROFILE = os.environ.get('SESSION_PROFILE', 'cached_db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_PROFILE}'
+SESSION_CACHE_ALIAS = 'sessions'
 SESSION_COOKIE_AGE = 3600  # 1 hour
+# Seconds between purges of expired sessions by the generation workers (see
+# main/jobs.py); 0 disables it, e.g. when a cron job runs clearsessions
+SESSION_PURGE_INTERVAL = 3600
+# Flash messages travel in a signed cookie, so showing one does not load the
+# session (the default falls back to the session for large messages)
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
 
 # Security settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
+
+# Resume generation job queue (see main/jobs.py)
+# Run workers as threads in the web process, which then loads CrewAI and
+# LangChain on its first job (see main/pipeline.py). Set False and run
+# run_resume_workers for web workers that never load them.
+RESUME_WORKERS_IN_PROCESS = True
+if not RESUME_WORKERS_IN_PROCESS and CACHES['progress']['BACKEND'].endswith('.LocMemCache'):
+    # Events published by out-of-process workers would never reach the web
+    # process; a file cache is shared by every process on the host. The
+    # main.E001 check refuses to start with a per-process cache here.
+    CACHES['progress'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'progress',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    }
+RESUME_WORKER_CONCURRENCY = 2
+RESUME_WORKER_POLL_INTERVAL = 2.0  # seconds
+RESUME_JOB_MAX_ATTEMPTS = 3
+RESUME_JOB_RETRY_BACKOFF = 5  # seconds, doubled after each failed attempt
+RESUME_JOB_TIMEOUT = 600  # seconds without a heartbeat before a running job is considered stale
+RESUME_JOB_HEARTBEAT_INTERVAL = 30  # seconds between heartbeats of a running job
+
+# LLM client and agent pool (see main/agent_pool.py)
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
+RESUME_AGENT_POOL_SIZE = RESUME_WORKER_CONCURRENCY
+RESUME_AGENT_CHECKOUT_TIMEOUT = 300  # seconds
+
+# LLM backend: 'openai', or 'mock' for the deterministic local stand-in in
+# main/mock_llm.py (offline load tests and benchmarks)
+RESUME_LLM_BACKEND = os.environ.get('RESUME_LLM_BACKEND', 'openai')
+RESUME_MOCK_LLM = {
+    'latency': 0.05,  # seconds before the first token
+    'tokens_per_second': 500,
+    'response_tokens': 250,
+    'failure_rate': 0.0,  # share of calls that raise MockLLMError
+    'seed': 0,
+}
+
+# Instrumentation (see main/tracing.py and main/metrics.py). Only sampled
+# traces record spans; timings, query counts and LLM usage are always counted.
+TRACE_REQUEST_SAMPLE_RATE = 0.1
+TRACE_JOB_SAMPLE_RATE = 1.0
+RESUME_LLM_PRICING = {'input_per_1k': 0.0015, 'output_per_1k': 0.002}  # USD, gpt-3.5-turbo-instruct
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')  # bearer token for /metrics/; staff may always read it
+RESUME_CREW_VERBOSE = False  # CrewAI console logging, for local debugging only
+
+# Rate limiting and admission control (see main/ratelimit.py). Rates are
+# "<requests>/<s|m|h|d>" token buckets per user, session, client IP or globally.
+RATELIMIT_ENABLED = True
+RATELIMIT_CACHE = 'ratelimit'
+RATELIMITS = {
+    'generate': {'user': '20/h', 'session': '10/h', 'ip': '60/h', 'global': '120/m'},
+    'analyze': {'user': '60/m', 'session': '60/m', 'ip': '300/m', 'global': '1200/m'},
+    'analyze_batch': {'user': '10/m', 'session': '10/m', 'ip': '30/m', 'global': '120/m'},
+    'search': {'user': '120/m', 'session': '120/m', 'ip': '600/m'},
+}
+RESUME_ADMISSION_MODE = 'queue'  # 'queue' up to RESUME_ADMISSION_MAX_QUEUE waiting jobs, or 'reject'
+RESUME_ADMISSION_MAX_QUEUE = 50
+# Running jobs at which 'reject' mode turns submissions away; None for
+# RESUME_WORKER_CONCURRENCY. Set it to the worker threads of all processes.
+RESUME_ADMISSION_MAX_RUNNING = None
+RESUME_ADMISSION_RETRY_AFTER = 30  # seconds
+
+# Prompt compaction (see main/prompts.py): estimated tokens for all the task
+# descriptions of one generation, fan-out sections included, and the share a
+# long job description or analysis may take of a task
+RESUME_PROMPT_TOKEN_BUDGET = 12000
+RESUME_PROMPT_POSTING_TOKENS = 600
+RESUME_PROMPT_ANALYSIS_TOKENS = 500
+
+# Section fan-out (see main/sections.py): sections written concurrently per
+# job, and LLM calls in flight per API key across all jobs in the process
+RESUME_SECTION_FANOUT = True
+RESUME_SECTION_CONCURRENCY = 4
+RESUME_LLM_KEY_CONCURRENCY = 8
+
+# Resume/analysis cache (see main/resume_cache.py)
+RESUME_CACHE_ENABLED = True
+RESUME_CACHE_ALIAS = 'resumes'
+RESUME_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # one week
+
+# Skill taxonomy (see main/taxonomy.py): how often each process checks the
+# Skill table for edits made by other processes
+SKILL_TAXONOMY_CHECK_INTERVAL = 30  # seconds
+
+# Batch job description analysis (see main/batch_analysis.py)
+ATS_BATCH_MAX_ITEMS = 500
+ATS_BATCH_CHUNK_SIZE = 8  # postings per pool task; smaller batches run inline
+ATS_BATCH_WORKERS = None  # pool processes; None uses every CPU, 0 disables the pool
+
+# Live job description analysis in the resume builder (see main/live_analysis.py).
+# The per-line state of the posting being typed is kept in this cache. With
+# LocMemCache a request served by another process makes the page resend the
+# whole text once; a shared cache avoids that.
+LIVE_ANALYSIS_CACHE = 'default'
+LIVE_ANALYSIS_TIMEOUT = 30 * 60  # seconds
+
+# Bulk resume matching (see main/matching.py): on-disk cache of the stacked
+# resume vector matrix, shared by web processes and management commands
+RESUME_MATRIX_CACHE = BASE_DIR / 'cache' / 'resume_matrix.npz'
+
+# Resume export (see main/export.py): rendered PDF/DOCX files, named by
+# content hash. Safe to delete; files are rendered again on demand.
+RESUME_EXPORT_DIR = BASE_DIR / 'cache' / 'exports'
+
+# Live progress streaming (see main/progress.py). The cache must be shared by
+# web and worker processes when workers run outside the web process.
+RESUME_STREAM_TOKENS = True
+RESUME_PROGRESS_CACHE_ALIAS = 'progress'
+RESUME_PROGRESS_TOKEN_INTERVAL = 0.25  # seconds of LLM tokens published as one event
+RESUME_PROGRESS_POLL_INTERVAL = 0.25  # seconds
+RESUME_PROGRESS_KEEPALIVE = 15  # seconds
@@ -1,14 +1,33 @@
-from django.contrib import admin
-from .models import ResumeGeneration, ATSAnalysis
-from django.shortcuts import render, redirect
-from django.contrib import messages
+import json
+
+from django.contrib import admin, messages
+from django.urls import path
+from django.utils.html import format_html
+from . import search
+from .models import ResumeGeneration, ATSAnalysis, Skill, PipelineStage
+from django.shortcuts import render
+
+class PipelineStageInline(admin.TabularInline):
+    model = PipelineStage
+    extra = 0
+    can_delete = False
+    fields = ['name', 'reused', 'llm_calls', 'sections', 'duration', 'created_at']
+    readonly_fields = fields
 
 @admin.register(ResumeGeneration)
 class ResumeGenerationAdmin(admin.ModelAdmin):
-    list_display = ['full_name', 'target_position', 'estimated_ats_score', 'created_at']
-    list_filter = ['target_industry', 'created_at', 'estimated_ats_score']
-    search_fields = ['full_name', 'email', 'target_position']
-    readonly_fields = ['created_at', 'updated_at']
+    list_display = ['full_name', 'target_position', 'status', 'estimated_ats_score', 'llm_cost_usd', 'created_at']
+    list_filter = ['status', 'target_industry', 'created_at', 'estimated_ats_score']
+    search_fields = ['full_name', 'email', 'target_position', 'job_description', 'generated_resume']
+    search_help_text = 'Searches names, emails, positions, resumes and job descriptions; words match as prefixes.'
+    search_limit = 1000
+    readonly_fields = ['created_at', 'updated_at', 'started_at', 'heartbeat_at', 'finished_at',
+                       'llm_tokens_in', 'llm_tokens_out', 'llm_cost_usd', 'request_trace_display', 'job_trace_display']
+    raw_id_fields = ['parent']
+    inlines = [PipelineStageInline]
+    actions = ['rank_matching_resumes']
+    list_select_related = ['user']
+    change_list_template = 'admin/main/resumegeneration/change_list.html'
     
     fieldsets = (
         ('Basic Information', {
@@ -21,57 +40,119 @@ class ResumeGenerationAdmin(admin.ModelAdmin):
         ('ATS Metrics', {
             'fields': ('estimated_ats_score', 'keywords_matched')
         }),
+        ('Generation Job', {
+            'fields': ('status', 'parent', 'attempts', 'error', 'available_at', 'started_at', 'heartbeat_at', 'finished_at'),
+        }),
+        ('Instrumentation', {
+            'fields': ('llm_tokens_in', 'llm_tokens_out', 'llm_cost_usd', 'request_trace_display', 'job_trace_display'),
+            'classes': ('collapse',)
+        }),
         ('Metadata', {
             'fields': ('form_data', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
 
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name == 'main_resumegeneration_changelist':
+            # The list shows none of the large columns
+            queryset = queryset.defer(*ResumeGeneration.LARGE_FIELDS)
+        return queryset
+
+    def get_search_results(self, request, queryset, search_term):
+        # The full-text index instead of icontains scans over search_fields;
+        # the list then applies its own ordering to the best matches
+        if not search_term.strip() or not search.enabled():
+            return super().get_search_results(request, queryset, search_term)
+        hits = search.search(search_term, limit=self.search_limit, snippets=False)
+        return queryset.filter(pk__in=[hit.pk for hit in hits]), False
+
+    def _trace_display(self, trace):
+        if not trace:
+            return '-'
+        return format_html('<pre>{}</pre>', json.dumps(trace, indent=2))
+
+    @admin.display(description='Request trace')
+    def request_trace_display(self, obj):
+        return self._trace_display(obj.request_trace)
+
+    @admin.display(description='Job trace')
+    def job_trace_display(self, obj):
+        return self._trace_display(obj.job_trace)
+
+    def get_urls(self):
+        return [
+            path('metrics/', self.admin_site.admin_view(self.metrics_view), name='main_resumegeneration_metrics'),
+        ] + super().get_urls()
+
+    def metrics_view(self, request):
+        """Latency, query and token summaries recorded by this process (see main/metrics.py)"""
+        from . import jobs, metrics
+
+        histograms = [
+            ('Requests (seconds)', metrics.REQUEST_SECONDS),
+            ('Database queries per request', metrics.REQUEST_QUERIES),
+            ('Spans (seconds)', metrics.SPAN_SECONDS),
+            ('Generation jobs (seconds)', metrics.JOB_SECONDS),
+        ]
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Instrumentation',
+            'opts': self.model._meta,
+            'histograms': [(title, histogram.labels[0], histogram.summary()) for title, histogram in histograms],
+            'tokens': {key[0]: value for key, value in metrics.LLM_TOKENS.samples().items()},
+            'cost': metrics.LLM_COST.samples().get((), 0.0),
+            'prompt_saved': sorted((key[0], value) for key, value in metrics.PROMPT_TOKENS_SAVED.samples().items()),
+            'cache': sorted(metrics.CACHE_LOOKUPS.samples().items()),
+            'queue': jobs.queue_stats(),
+        }
+        return render(request, 'admin/main/resumegeneration/metrics.html', context)
+
+    @admin.action(description='Rank all resumes against the selected job descriptions')
+    def rank_matching_resumes(self, request, queryset):
+        from . import matching
+
+        # Vectorizing a backlog takes a while per resume; leave it to the
+        # command instead of holding up the admin request
+        missing = matching.missing_vectors()
+        if missing:
+            self.message_user(
+                request, f'{missing} finished resumes have no match vector yet and are not ranked. '
+                'Run "manage.py vectorize_resumes" to add them.', messages.WARNING,
+            )
+        postings = list(queryset.select_related(None).only('pk', 'full_name', 'target_position', 'job_description'))
+        ranked = matching.rank([p.job_description for p in postings], top=20)
+        names = ResumeGeneration.objects.defer(*ResumeGeneration.LARGE_FIELDS).in_bulk(
+            {pk for results in ranked for pk, _ in results}
+        )
+        results = [
+            (posting, [(names[pk], round(score * 100, 1)) for pk, score in matches if pk in names])
+            for posting, matches in zip(postings, ranked)
+        ]
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Resume matches',
+            'opts': self.model._meta,
+            'results': results,
+        }
+        return render(request, 'admin/main/resumegeneration/rank_results.html', context)
+
 @admin.register(ATSAnalysis)
 class ATSAnalysisAdmin(admin.ModelAdmin):
     list_display = ['resume_generation', 'keyword_density', 'readability_score', 'created_at']
     list_filter = ['created_at', 'readability_score']
     readonly_fields = ['created_at']
+    raw_id_fields = ['resume_generation']
 
-# Additional view functions for history and detail
-def resume_history(request):
-    """Display user's resume generation history"""
-    if request.user.is_authenticated:
-        resumes = ResumeGeneration.objects.filter(user=request.user)
-    else:
-        # For anonymous users, show session-based history
-        session_resumes = request.session.get('resume_history', [])
-        resumes = ResumeGeneration.objects.filter(id__in=session_resumes)
-    
-    context = {'resumes': resumes}
-    return render(request, 'resume_history.html', context)
-
-def resume_detail(request, pk):
-    """Display detailed view of a specific resume"""
-    try:
-        if request.user.is_authenticated:
-            resume = ResumeGeneration.objects.get(pk=pk, user=request.user)
-        else:
-            # Check if resume ID is in session history
-            session_resumes = request.session.get('resume_history', [])
-            if pk not in session_resumes:
-                messages.error(request, 'Resume not found or access denied.')
-                return redirect('resume_history')
-            resume = ResumeGeneration.objects.get(pk=pk)
-        
-        # Get ATS analysis if available
-        ats_analysis = None
-        try:
-            ats_analysis = ATSAnalysis.objects.get(resume_generation=resume)
-        except ATSAnalysis.DoesNotExist:
-            pass
-        
-        context = {
-            'resume': resume,
-            'ats_analysis': ats_analysis
-        }
-        return render(request, 'resume_detail.html', context)
-        
-    except ResumeGeneration.DoesNotExist:
-        messages.error(request, 'Resume not found.')
-        return redirect('resume_history')
\ No newline at end of file
+    def get_queryset(self, request):
+        # resume_generation.__str__ needs its name and position, not its content
+        return super().get_queryset(request).select_related('resume_generation').defer(
+            *(f'resume_generation__{name}' for name in ResumeGeneration.LARGE_FIELDS)
+        )
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ['name', 'category', 'aliases', 'updated_at']
+    list_filter = ['category']
+    search_fields = ['name']
@@ -0,0 +1,138 @@
+"""Process-wide pool of ``ResumeOptimizerAgent`` instances.
+
+Building a ``ResumeOptimizerAgent`` creates an LLM client, three CrewAI agents
+and an ``ATSAnalyzerTool``. None of that depends on the request, so each worker
+process keeps a small pool of ready agents that share a single LLM client (and
+with it the client's HTTP connections). Only the per-request ``Task``/``Crew``
+objects are built on the hot path.
+
+CrewAI agents keep state while a crew runs, so an instance is checked out by one
+thread at a time. An instance that raises is discarded, together with the shared
+client, so a broken connection is not handed to the next request.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from . import tracing
+
+
+class AgentPool:
+    """Bounded, lazily-filled pool of reusable objects with exclusive checkout"""
+
+    def __init__(self, factory, size):
+        self._factory = factory
+        self._size = size
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        # Bumped on every error so instances checked out before a reset are
+        # not returned to the pool afterwards.
+        self._generation = 0
+        self.created = 0
+        self.discarded = 0
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        with tracing.span('agent_checkout'):
+            if not self._slots.acquire(timeout=timeout):
+                raise TimeoutError('No resume agent became available in time')
+        try:
+            with self._lock:
+                item = self._idle.pop() if self._idle else None
+                generation = self._generation
+            if item is None:
+                with tracing.span('agent_build'):
+                    item = self._factory()
+                self.created += 1
+            try:
+                yield item
+            except Exception:
+                self._on_error()
+                raise
+            with self._lock:
+                if generation == self._generation:
+                    self._idle.append(item)
+                else:
+                    self.discarded += 1
+        finally:
+            self._slots.release()
+
+    def _on_error(self):
+        # Idle agents hold the same client as the failed one; rebuild them too.
+        with self._lock:
+            self._generation += 1
+            self.discarded += len(self._idle) + 1
+            self._idle.clear()
+        reset_llm()
+
+    def stats(self):
+        with self._lock:
+            idle = len(self._idle)
+        return {'size': self._size, 'idle': idle, 'created': self.created, 'discarded': self.discarded}
+
+
+_llm = None
+_pool = None
+_pid = None
+_lock = threading.Lock()
+
+
+def _check_fork():
+    # A pool inherited across fork() (e.g. gunicorn --preload) must not share
+    # the parent's client sockets, so each process starts from scratch.
+    global _llm, _pool, _pid
+    if _pid != os.getpid():
+        _llm = None
+        _pool = None
+        _pid = os.getpid()
+
+
+def get_llm():
+    """Return the LLM client shared by every pooled agent in this process"""
+    global _llm
+    with _lock:
+        _check_fork()
+        if _llm is None:
+            from .pipeline import build_llm
+            _llm = build_llm()
+        return _llm
+
+
+def reset_llm():
+    """Drop the shared client; the next agent built gets a fresh one"""
+    global _llm
+    with _lock:
+        _llm = None
+
+
+def reset():
+    """Drop the pool and the shared client, e.g. after changing the LLM backend"""
+    global _llm, _pool
+    with _lock:
+        _llm = None
+        _pool = None
+
+
+def _build_agent():
+    from .pipeline import ResumeOptimizerAgent
+    return ResumeOptimizerAgent(llm=get_llm())
+
+
+def get_pool():
+    global _pool
+    with _lock:
+        _check_fork()
+        if _pool is None:
+            size = getattr(settings, 'RESUME_AGENT_POOL_SIZE', None) or getattr(settings, 'RESUME_WORKER_CONCURRENCY', 2)
+            _pool = AgentPool(_build_agent, size)
+        return _pool
+
+
+def checkout(timeout=None):
+    """Check out a ready ``ResumeOptimizerAgent`` for the duration of a ``with`` block"""
+    if timeout is None:
+        timeout = getattr(settings, 'RESUME_AGENT_CHECKOUT_TIMEOUT', 300)
+    return get_pool().checkout(timeout=timeout)
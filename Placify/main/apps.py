@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        # Connects the signals that keep the compiled skill taxonomy fresh,
+        # and registers the system checks
+        from . import checks, taxonomy  # noqa: F401
@@ -0,0 +1,122 @@
+"""Static files: content-hashed, precompressed, and served with far-future caching.
+
+``collectstatic`` copies every file into ``STATIC_ROOT`` under a name carrying
+a hash of its content (``main/css/home.3f2a9c1d04b7.css``) and writes a
+``.gz`` copy (and ``.br`` when the ``brotli`` package is installed) next to
+each text asset. ``{% static %}`` resolves to the hashed names, so a file can
+be cached by browsers for a year: a changed file gets a new URL.
+
+``serve`` sends those files with the best encoding the client accepts, for
+deployments without a front server (nginx, a CDN) doing it. With DEBUG on it
+falls back to Django's development view, which finds files in the app
+directories and needs no collectstatic.
+"""
+import gzip
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.contrib.staticfiles.views import serve as serve_unhashed
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.map', '.ttf', '.eot')
+MIN_COMPRESS_SIZE = 256  # bytes; smaller files gain less than the extra request headers
+# What ManifestStaticFilesStorage inserts: ".<12 hex digits>" before the extension
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]  # in order of preference
+ONE_YEAR = 60 * 60 * 24 * 365
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    """Hashed file names plus precompressed copies of the text assets"""
+
+    def stored_name(self, name):
+        # Without a manifest (no collectstatic yet, e.g. in tests) use the
+        # plain names the finders serve instead of failing
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE):
+                self._compress(name)
+
+    def _compress(self, name):
+        path = Path(self.path(name))
+        data = path.read_bytes()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        variants = [('.gz', gzip.compress(data, 9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data, quality=11)))
+        for suffix, compressed in variants:
+            if len(compressed) < len(data):
+                path.with_name(path.name + suffix).write_bytes(compressed)
+
+
+def _accepted_encodings(header):
+    """Content codings in an Accept-Encoding header, without those refused with q=0"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        name, _, value = params.strip().partition('=')
+        try:
+            if name.strip().lower() == 'q' and float(value) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def serve(request, path):
+    """A file from STATIC_ROOT, precompressed if the client accepts it"""
+    if settings.DEBUG:
+        return serve_unhashed(request, path, insecure=True)
+    try:
+        fullpath = Path(safe_join(settings.STATIC_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not fullpath.is_file():
+        raise Http404
+    stat = fullpath.stat()
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    served, encoding = fullpath, None
+    accepted = _accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    for coding, suffix in ENCODINGS:
+        candidate = fullpath.with_name(fullpath.name + suffix)
+        if coding in accepted and candidate.is_file():
+            served, encoding = candidate, coding
+            break
+
+    content_type, _ = mimetypes.guess_type(fullpath.name)
+    response = FileResponse(served.open('rb'), content_type=content_type or 'application/octet-stream')
+    response.headers['Content-Length'] = served.stat().st_size
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if HASHED_NAME.search(path):
+        patch_cache_control(response, public=True, max_age=ONE_YEAR, immutable=True)
+    else:
+        # Plain names change content in place; let caches revalidate
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
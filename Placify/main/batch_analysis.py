@@ -0,0 +1,122 @@
+"""Job description analysis for single requests and large batches.
+
+``analysis_payload`` is the response body ``analyze_job_description`` returns
+for one posting. ``analyze_batch`` runs the same analysis over many postings in
+a process pool and yields one result per item as soon as its chunk finishes,
+so the placement office can import hundreds of postings in one request.
+
+The functions that run in pool processes only use ``main.keywords`` and do not
+need Django, so the pool uses the ``spawn`` start method and never forks a
+threaded web worker.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+SUGGESTIONS = [
+    'Include these key skills in your resume',
+    'Use exact job title from the posting',
+    'Quantify your achievements with numbers',
+    'Match the company\'s language and terminology'
+]
+
+
+def analysis_payload(extraction):
+    """Analysis, skill ids and estimated score for one extraction result"""
+    analysis = extraction.as_dict()
+    # Calculate approximate ATS score based on various factors
+    score = min(100, len(analysis['keywords']) * 5 + len(analysis['skills']) * 3)
+    return {
+        'analysis': analysis,
+        'skill_ids': extraction.skill_ids(),
+        'estimated_keywords': len(analysis['keywords']),
+        'estimated_score': score,
+    }
+
+
+# --- pool side -------------------------------------------------------------
+
+_worker_extractor = None
+
+
+def _init_worker(extractor):
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _analyze_item(extractor, item):
+    index, item_id, job_description = item
+    result = {'index': index, 'id': item_id}
+    try:
+        result.update(analysis_payload(extractor.extract(job_description)))
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def _analyze_chunk(chunk):
+    return [_analyze_item(_worker_extractor, item) for item in chunk]
+
+
+# --- web side --------------------------------------------------------------
+
+_executor = None
+_executor_extractor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(extractor):
+    """The shared pool, recreated when the taxonomy has been recompiled"""
+    global _executor, _executor_extractor
+    with _executor_lock:
+        if _executor is None or _executor_extractor is not extractor:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'ATS_BATCH_WORKERS', None) or None,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(extractor,),
+            )
+            _executor_extractor = extractor
+        return _executor
+
+
+def _reset_executor():
+    global _executor, _executor_extractor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+        _executor_extractor = None
+
+
+def analyze_batch(extractor, items):
+    """Yield a result dict per ``(index, id, job_description)`` item
+
+    Results arrive in completion order; each carries its ``index`` and either
+    the analysis or an ``error``.
+    """
+    chunk_size = getattr(settings, 'ATS_BATCH_CHUNK_SIZE', 8)
+    if len(items) <= chunk_size or getattr(settings, 'ATS_BATCH_WORKERS', None) == 0:
+        for item in items:
+            yield _analyze_item(extractor, item)
+        return
+
+    executor = _get_executor(extractor)
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    futures = {executor.submit(_analyze_chunk, chunk): chunk for chunk in chunks}
+    for future in as_completed(futures):
+        try:
+            results = future.result()
+        except BrokenProcessPool:
+            _reset_executor()
+            results = [{'index': index, 'id': item_id, 'error': 'Analysis worker crashed'}
+                       for index, item_id, _ in futures[future]]
+        except Exception as e:
+            results = [{'index': index, 'id': item_id, 'error': str(e)}
+                       for index, item_id, _ in futures[future]]
+        yield from results
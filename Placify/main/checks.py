@@ -0,0 +1,36 @@
+"""System checks for setups that would otherwise only fail at runtime"""
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+@checks.register(checks.Tags.caches)
+def check_progress_cache(app_configs, **kwargs):
+    """Out-of-process workers need a progress cache the web process can read"""
+    if getattr(settings, 'RESUME_WORKERS_IN_PROCESS', True):
+        return []
+    alias = getattr(settings, 'RESUME_PROGRESS_CACHE_ALIAS', 'default')
+    if not isinstance(caches[alias], LocMemCache):
+        return []
+    return [checks.Error(
+        f"The '{alias}' cache keeps progress events in one process, but generation "
+        f"workers run in others, so streams would never see their events.",
+        hint='Use a cache shared between processes (file, database, Redis or Memcached) '
+             'for RESUME_PROGRESS_CACHE_ALIAS, or set RESUME_WORKERS_IN_PROCESS = True.',
+        id='main.E001',
+    )]
+
+
+@checks.register(checks.Tags.staticfiles)
+def check_font_awesome(app_configs, **kwargs):
+    """Pages link Font Awesome from this site, and only fall back to the CDN without it"""
+    from .templatetags.vendor import FONT_AWESOME
+    if finders.find(FONT_AWESOME):
+        return []
+    return [checks.Warning(
+        f'{FONT_AWESOME} is missing, so every page loads Font Awesome from a CDN.',
+        hint='Run manage.py vendor_assets and commit main/static/main/vendor.',
+        id='main.W001',
+    )]
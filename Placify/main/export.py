@@ -0,0 +1,334 @@
+"""ATS-friendly PDF and DOCX export of generated resumes.
+
+Both formats are written with the standard library only. The PDF uses the
+built-in Helvetica fonts, a single column and real text, and the DOCX uses
+plain paragraphs with the built-in Title and Heading 1 styles, which is
+what applicant tracking systems parse most reliably. The built-in fonts only
+cover Western European text (WinAnsiEncoding), so a resume with other
+characters is exported as DOCX when a PDF is asked for (see
+``output_format``).
+
+Rendered files are cached on disk under ``RESUME_EXPORT_DIR`` and named
+after a hash of the resume text, the title, the format and
+``RENDERER_VERSION``. A
+resume is therefore rendered once and then served as a file, and the same
+hash is the download's ETag. This module does not touch the database, so
+``export_resumes`` can call ``export_chunk`` from a process pool.
+"""
+import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+import zlib
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+
+# Bump when the layout changes so cached files are rendered again
+RENDERER_VERSION = 1
+
+FORMATS = {
+    'txt': 'text/plain; charset=utf-8',
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+NAME, CONTACT, HEADING, BULLET, TEXT, BLANK = 'name', 'contact', 'heading', 'bullet', 'text', 'blank'
+
+_markdown_heading = re.compile(r'^\s*#{1,6}\s*')
+_bullet = re.compile(r'^\s*(?:[-•*▪●]|\d+[.)])\s+')
+_emphasis = re.compile(r'(\*\*|__)(.+?)\1')
+_contact = re.compile(r'@|\+?\d[\d\s().-]{7,}\d|linkedin|https?://|\|', re.IGNORECASE)
+
+
+def content_hash(text, fmt, title=''):
+    payload = f'{RENDERER_VERSION}:{fmt}:{title or ""}\0{text or ""}'.encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+def output_format(text, fmt, title=''):
+    """The format ``fmt`` is exported as: DOCX for a PDF the built-in fonts cannot show"""
+    if fmt == 'pdf':
+        try:
+            f'{title}{text or ""}'.encode(PDF_ENCODING)
+        except UnicodeEncodeError:
+            return 'docx'
+    return fmt
+
+
+def filename(full_name, fmt):
+    stem = re.sub(r'[^\w-]+', '_', full_name or 'resume').strip('_') or 'resume'
+    return f'{stem}_ATS_optimized.{fmt}'
+
+
+def _is_heading(line, raw):
+    if not line or len(line) > 40 or line.endswith('.'):
+        return False
+    letters = [ch for ch in line if ch.isalpha()]
+    return bool(_markdown_heading.match(raw)) or (len(letters) > 2 and all(ch.isupper() for ch in letters))
+
+
+def parse(text):
+    """Split resume text into ``(kind, text)`` blocks for the renderers"""
+    blocks = []
+    for raw in (text or '').splitlines():
+        line = _emphasis.sub(r'\2', _markdown_heading.sub('', raw)).strip()
+        if not line or set(line) <= set('-=_*'):
+            if blocks and blocks[-1][0] != BLANK:
+                blocks.append((BLANK, ''))
+            continue
+        if not any(kind == NAME for kind, _ in blocks):
+            blocks.append((NAME, line.strip('*# ')))
+        elif blocks[-1][0] == NAME and _contact.search(line):
+            blocks.append((CONTACT, line))
+        elif _is_heading(line.rstrip(':').strip('*'), raw):
+            blocks.append((HEADING, line.rstrip(':').strip('* ').upper()))
+        elif _bullet.match(line):
+            blocks.append((BULLET, _bullet.sub('', line, count=1)))
+        else:
+            blocks.append((TEXT, line))
+    while blocks and blocks[-1][0] == BLANK:
+        blocks.pop()
+    return blocks
+
+
+# --- PDF ---------------------------------------------------------------------
+
+# Helvetica advance widths (1/1000 em) for ASCII 32-126, from the standard AFM
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+PDF_ENCODING = 'cp1252'  # WinAnsiEncoding, what the built-in fonts are declared with
+PAGE_WIDTH, PAGE_HEIGHT, MARGIN = 612, 792, 54  # US Letter, 0.75in margins
+# (font, size, leading, space before)
+PDF_STYLES = {
+    NAME: ('F2', 18, 22, 0),
+    CONTACT: ('F1', 10, 14, 0),
+    HEADING: ('F2', 12, 16, 10),
+    BULLET: ('F1', 10.5, 14, 0),
+    TEXT: ('F1', 10.5, 14, 0),
+}
+BULLET_INDENT = 12
+
+
+def _text_width(text, size, bold=False):
+    width = sum(_HELVETICA[ord(ch) - 32] if 32 <= ord(ch) < 127 else 556 for ch in text)
+    return width * size / 1000 * (1.08 if bold else 1.0)
+
+
+def _wrap(text, width, size, bold=False):
+    lines, current = [], ''
+    for word in text.split():
+        candidate = f'{current} {word}' if current else word
+        if current and _text_width(candidate, size, bold) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    return lines + [current] if current else lines
+
+
+def _pdf_string(text):
+    # Strict: a character the fonts lack must not turn into "?" (see output_format)
+    data = text.encode(PDF_ENCODING)
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def render_pdf(text, title=''):
+    pages, ops = [], []
+    y = PAGE_HEIGHT - MARGIN
+
+    def new_page():
+        nonlocal ops, y
+        ops = []
+        pages.append(ops)
+        y = PAGE_HEIGHT - MARGIN
+
+    new_page()
+    for kind, content in parse(text):
+        if kind == BLANK:
+            y -= 6
+            continue
+        font, size, leading, before = PDF_STYLES[kind]
+        indent = BULLET_INDENT if kind == BULLET else 0
+        lines = _wrap(content, PAGE_WIDTH - 2 * MARGIN - indent, size, bold=font == 'F2')
+        y -= before
+        for index, line in enumerate(lines):
+            if y - leading < MARGIN:
+                new_page()
+            y -= leading
+            x = MARGIN + indent
+            ops.append(b'BT /%s %g Tf %g %g Td %s Tj ET' % (font.encode(), size, x, y, _pdf_string(line)))
+            if kind == BULLET and index == 0:
+                ops.append(b'BT /F1 %g Tf %g %g Td %s Tj ET' % (size, MARGIN + 2, y, _pdf_string('•')))
+        if kind == HEADING:
+            ops.append(b'0.6 G 0.5 w %g %g m %g %g l S' % (MARGIN, y - 3, PAGE_WIDTH - MARGIN, y - 3))
+            y -= 4
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, once the page ids are known
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+        b'<< /Title %s /Producer (Placify) >>' % _pdf_string(title or 'Resume'),
+    ]
+    page_ids = []
+    for page_ops in pages:
+        stream = zlib.compress(b'\n'.join(page_ops))
+        objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>' % (PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+        )
+        page_ids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % page_id for page_id in page_ids), len(page_ids))
+
+    out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# --- DOCX --------------------------------------------------------------------
+
+_W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+_DOCX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '<Override PartName="/word/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="word/document.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'word/_rels/document.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="styles.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+        '</Relationships>'
+    ),
+    'word/styles.xml': (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:styles xmlns:w="{_W}">'
+        '<w:docDefaults><w:rPrDefault><w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:cs="Calibri"/>'
+        '<w:sz w:val="21"/></w:rPr></w:rPrDefault>'
+        '<w:pPrDefault><w:pPr><w:spacing w:after="60"/></w:pPr></w:pPrDefault></w:docDefaults>'
+        '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>'
+        '<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/>'
+        '<w:rPr><w:b/><w:sz w:val="36"/></w:rPr></w:style>'
+        '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/>'
+        '<w:pPr><w:keepNext/><w:spacing w:before="200" w:after="60"/><w:outlineLvl w:val="0"/>'
+        '<w:pBdr><w:bottom w:val="single" w:sz="4" w:space="1" w:color="999999"/></w:pBdr></w:pPr>'
+        '<w:rPr><w:b/><w:sz w:val="24"/></w:rPr></w:style>'
+        '</w:styles>'
+    ),
+}
+_DOCX_PARAGRAPH = {
+    NAME: '<w:pPr><w:pStyle w:val="Title"/></w:pPr>',
+    HEADING: '<w:pPr><w:pStyle w:val="Heading1"/></w:pPr>',
+    BULLET: '<w:pPr><w:ind w:left="360" w:hanging="220"/></w:pPr>',
+    CONTACT: '',
+    TEXT: '',
+}
+
+
+def render_docx(text, title=''):
+    paragraphs = []
+    for kind, content in parse(text):
+        if kind == BLANK:
+            continue
+        if kind == BULLET:
+            content = f'•\t{content}'
+        run = escape(content).replace('\t', '</w:t><w:tab/><w:t xml:space="preserve">')
+        paragraphs.append(f'<w:p>{_DOCX_PARAGRAPH[kind]}<w:r><w:t xml:space="preserve">{run}</w:t></w:r></w:p>')
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document xmlns:w="{_W}"><w:body>'
+        + ''.join(paragraphs)
+        + '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+          '<w:pgMar w:top="1080" w:right="1080" w:bottom="1080" w:left="1080"/></w:sectPr>'
+        + '</w:body></w:document>'
+    )
+    parts = dict(_DOCX_PARTS, **{'word/document.xml': document})
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, body in parts.items():
+            # Fixed timestamps keep the output identical for identical input
+            archive.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), body,
+                             compress_type=zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+
+def render(text, fmt, title=''):
+    if fmt == 'pdf':
+        return render_pdf(text, title)
+    if fmt == 'docx':
+        return render_docx(text, title)
+    if fmt == 'txt':
+        return (text or '').encode('utf-8')
+    raise ValueError(f'Unknown export format {fmt!r}')
+
+
+# --- on-disk cache -------------------------------------------------------------
+
+def export_dir():
+    return Path(getattr(settings, 'RESUME_EXPORT_DIR', Path(settings.BASE_DIR) / 'cache' / 'exports'))
+
+
+def export_path(text, fmt, title='', directory=None):
+    """Path of the rendered file, rendering it on first use; returns ``(path, rendered)``"""
+    directory = Path(directory or export_dir())
+    digest = content_hash(text, fmt, title)
+    path = directory / digest[:2] / f'{digest}.{fmt}'
+    if path.exists():
+        return path, False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so a concurrent download never sees a partial file
+    handle, temp = tempfile.mkstemp(dir=path.parent, suffix='.part')
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            file.write(render(text, fmt, title))
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+    return path, True
+
+
+def export_to(item):
+    """Process-pool task of ``export_resumes``: ``(pk, name, text, fmt, cache_dir, out_dir)``"""
+    pk, full_name, text, fmt, cache_dir, out_dir = item
+    fmt = output_format(text, fmt, full_name)
+    path, rendered = export_path(text, fmt, full_name, cache_dir)
+    target = Path(out_dir) / f'{pk}_{filename(full_name, fmt)}'
+    shutil.copyfile(path, target)
+    return str(target), rendered
+
+
+def export_chunk(items):
+    return [export_to(item) for item in items]
@@ -0,0 +1,364 @@
+"""Database-backed job queue for resume generation.
+
+Resume generation runs three sequential LLM tasks, which is far too slow to do
+inside a request. ``resume_builder`` stores a pending ``ResumeGeneration`` row
+and returns immediately; a ``WorkerPool`` (threads in the web process, or the
+``run_resume_workers`` management command) claims pending rows and runs the
+pipeline. No external broker is needed: the ``status``/``available_at`` columns
+are the queue.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import agent_pool, matching, metrics, progress, resume_cache, scoring, stages, tracing
+from .models import ResumeGeneration
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(user_data, user=None, parent=None):
+    """Persist a pending generation job and wake the local worker pool
+
+    A submission that was generated before is answered from the resume cache
+    and stored as already done, without occupying a worker. ``parent`` is the
+    generation this submission edits (see main/stages.py).
+    """
+    fields = dict(
+        user=user,
+        parent=parent,
+        full_name=user_data.get('full_name') or '',
+        email=user_data.get('email') or '',
+        target_position=user_data.get('target_position') or '',
+        target_industry=user_data.get('target_industry') or '',
+        form_data=user_data,
+        job_description=user_data.get('job_description') or '',
+    )
+    cached = resume_cache.get_resume(user_data)
+    if cached is not None:
+        now = timezone.now()
+        job = ResumeGeneration.objects.create(
+            generated_resume=cached['resume'],
+            status=ResumeGeneration.STATUS_DONE,
+            started_at=now,
+            finished_at=now,
+            **fields,
+        )
+        stages.StageRecorder(job).record_cached(user_data, cached['analysis'], cached['resume'])
+        _record_metrics(job)
+        return job
+
+    job = ResumeGeneration.objects.create(status=ResumeGeneration.STATUS_PENDING, **fields)
+    if _setting('RESUME_WORKERS_IN_PROCESS', True):
+        get_pool().wake()
+    return job
+
+
+def claim_next():
+    """Atomically move the oldest runnable job to ``running`` and return it"""
+    now = timezone.now()
+    candidates = (
+        ResumeGeneration.objects
+        .filter(status=ResumeGeneration.STATUS_PENDING, available_at__lte=now)
+        .order_by('available_at')
+        .values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        # The status filter makes the UPDATE a compare-and-swap, so two workers
+        # racing for the same row cannot both claim it.
+        claimed = ResumeGeneration.objects.filter(
+            pk=pk, status=ResumeGeneration.STATUS_PENDING,
+        ).update(
+            status=ResumeGeneration.STATUS_RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return ResumeGeneration.objects.get(pk=pk)
+    return None
+
+
+def requeue_stale():
+    """Return jobs stuck in ``running`` (e.g. after a worker crash) to the queue
+
+    A job is stuck when its worker has not refreshed ``heartbeat_at`` for
+    ``RESUME_JOB_TIMEOUT`` seconds, however long it has been running. A job
+    that has used up its attempts fails instead, so input that reliably kills
+    its worker is not retried forever.
+    """
+    timeout = _setting('RESUME_JOB_TIMEOUT', 600)
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=timeout)
+    stale = ResumeGeneration.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=ResumeGeneration.STATUS_RUNNING,
+    )
+    max_attempts = _setting('RESUME_JOB_MAX_ATTEMPTS', 3)
+    requeued = []
+    for pk, attempts in stale.values_list('pk', 'attempts'):
+        if attempts < max_attempts:
+            requeued.append(pk)
+            continue
+        # Same compare-and-swap as claim_next: skip a job that finished meanwhile
+        error = f'The worker stopped responding (attempt {attempts} of {max_attempts})'
+        if ResumeGeneration.objects.filter(pk=pk, status=ResumeGeneration.STATUS_RUNNING).update(
+            status=ResumeGeneration.STATUS_FAILED, error=error, finished_at=now,
+        ):
+            progress.publish(pk, 'failed', {'error': error})
+    if not requeued:
+        return 0
+    return stale.filter(pk__in=requeued).update(status=ResumeGeneration.STATUS_PENDING, available_at=now)
+
+
+def purge_expired_sessions():
+    """Delete expired sessions, as ``manage.py clearsessions`` does"""
+    engine = import_module(settings.SESSION_ENGINE)
+    # A no-op for cookie and cache sessions, which expire on their own
+    engine.SessionStore.clear_expired()
+
+
+_last_session_purge = None
+_session_purge_lock = threading.Lock()
+
+
+def _purge_sessions_periodically():
+    # Whichever worker thread gets here first purges, once per interval per process
+    global _last_session_purge
+    interval = _setting('SESSION_PURGE_INTERVAL', 3600)
+    if not interval:
+        return
+    with _session_purge_lock:
+        now = time.monotonic()
+        if _last_session_purge is not None and now - _last_session_purge < interval:
+            return
+        _last_session_purge = now
+    purge_expired_sessions()
+
+
+def retry_delay(attempts):
+    """Exponential backoff in seconds for the given number of attempts so far"""
+    base = _setting('RESUME_JOB_RETRY_BACKOFF', 5)
+    return base * (2 ** max(attempts - 1, 0))
+
+
+def _claimed(job):
+    """The job's row, as long as this worker's attempt still owns it
+
+    ``requeue_stale`` may have handed the job to another worker meanwhile;
+    filtering on the attempt makes writes through this a compare-and-swap.
+    """
+    return ResumeGeneration.objects.filter(
+        pk=job.pk, status=ResumeGeneration.STATUS_RUNNING, attempts=job.attempts,
+    )
+
+
+class _Heartbeat:
+    """Refresh ``heartbeat_at`` of a running job from a thread of its own"""
+
+    def __init__(self, job):
+        self.job = job
+        self.interval = _setting('RESUME_JOB_HEARTBEAT_INTERVAL', 30)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f'resume-heartbeat-{job.pk}', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopping.set()
+        self._thread.join()
+
+    def _beat(self):
+        try:
+            while not self._stopping.wait(self.interval):
+                try:
+                    _claimed(self.job).update(heartbeat_at=timezone.now())
+                except Exception:
+                    logger.exception('Could not refresh the heartbeat of resume job %s', self.job.pk)
+        finally:
+            connection.close()
+
+
+def run_job(job):
+    """Generate the resume for a claimed job and record the outcome and its trace"""
+    with tracing.trace('job') as trace:
+        succeeded = _run(job)
+    _record_trace(job, trace)
+    return succeeded
+
+
+def _run(job):
+    progress.publish(job.pk, 'running', {'attempt': job.attempts})
+    try:
+        with _Heartbeat(job), agent_pool.checkout() as optimizer, progress.bind(job.pk):
+            result = optimizer.create_optimized_resume(job.form_data, stages.StageRecorder(job))
+    except Exception as e:
+        logger.exception('Resume job %s failed (attempt %s)', job.pk, job.attempts)
+        job.error = str(e)
+        if job.attempts < _setting('RESUME_JOB_MAX_ATTEMPTS', 3):
+            job.status = ResumeGeneration.STATUS_PENDING
+            job.available_at = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        else:
+            job.status = ResumeGeneration.STATUS_FAILED
+            job.finished_at = timezone.now()
+        if not _claimed(job).update(status=job.status, error=job.error, available_at=job.available_at,
+                                    finished_at=job.finished_at, updated_at=timezone.now()):
+            return _lost(job)
+        if job.status == ResumeGeneration.STATUS_FAILED:
+            progress.publish(job.pk, 'failed', {'error': job.error})
+        else:
+            progress.publish(job.pk, 'retry', {'attempt': job.attempts, 'error': job.error})
+        return False
+
+    job.generated_resume = str(result)
+    job.status = ResumeGeneration.STATUS_DONE
+    job.error = ''
+    job.finished_at = timezone.now()
+    if not _claimed(job).update(generated_resume=job.generated_resume, status=job.status, error=job.error,
+                                finished_at=job.finished_at, updated_at=timezone.now()):
+        return _lost(job)
+    with tracing.span('ats_metrics'):
+        _record_metrics(job)
+    progress.publish(job.pk, 'done', {'status': job.status})
+    return True
+
+
+def _lost(job):
+    logger.warning('Resume job %s was requeued while attempt %s ran; discarding its outcome',
+                   job.pk, job.attempts)
+    job.refresh_from_db(fields=['status'])
+    return False
+
+
+def _record_trace(job, trace):
+    ResumeGeneration.objects.filter(pk=job.pk).update(
+        job_trace=trace.as_dict(),
+        llm_tokens_in=F('llm_tokens_in') + trace.tokens_in,
+        llm_tokens_out=F('llm_tokens_out') + trace.tokens_out,
+        llm_cost_usd=F('llm_cost_usd') + trace.cost,
+    )
+    outcome = 'retry' if job.status == ResumeGeneration.STATUS_PENDING else job.status
+    metrics.JOB_SECONDS.observe(trace.duration, status=outcome)
+
+
+def _record_metrics(job):
+    # Metrics and match vectors are a convenience; a failure here must not
+    # fail the generation.
+    try:
+        scoring.record_ats_analysis(job)
+        matching.store_vector(job)
+    except Exception:
+        logger.exception('Could not record ATS metrics for resume job %s', job.pk)
+
+
+def queue_stats(sample_size=200):
+    """Queue depth and latency figures for monitoring"""
+    now = timezone.now()
+    pending = ResumeGeneration.objects.filter(status=ResumeGeneration.STATUS_PENDING)
+    oldest = pending.order_by('created_at').values_list('created_at', flat=True).first()
+
+    recent = (
+        ResumeGeneration.objects
+        .filter(status=ResumeGeneration.STATUS_DONE, started_at__isnull=False, finished_at__isnull=False)
+        .order_by('-finished_at')
+        .values_list('created_at', 'started_at', 'finished_at')[:sample_size]
+    )
+    waits = [(started - created).total_seconds() for created, started, _ in recent]
+    runs = [(finished - started).total_seconds() for _, started, finished in recent]
+
+    return {
+        'depth': pending.count(),
+        'running': ResumeGeneration.objects.filter(status=ResumeGeneration.STATUS_RUNNING).count(),
+        'failed': ResumeGeneration.objects.filter(status=ResumeGeneration.STATUS_FAILED).count(),
+        'oldest_pending_seconds': (now - oldest).total_seconds() if oldest else 0.0,
+        'avg_wait_seconds': sum(waits) / len(waits) if waits else 0.0,
+        'avg_run_seconds': sum(runs) / len(runs) if runs else 0.0,
+        'workers': _pool.concurrency if _pool else 0,
+    }
+
+
+class WorkerPool:
+    """A fixed number of threads that drain the generation queue"""
+
+    def __init__(self, concurrency=None, poll_interval=None):
+        self.concurrency = concurrency or _setting('RESUME_WORKER_CONCURRENCY', 2)
+        self.poll_interval = poll_interval or _setting('RESUME_WORKER_POLL_INTERVAL', 2.0)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._loop, name=f'resume-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info('Started %s resume workers', self.concurrency)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _loop(self):
+        # The first check runs here rather than in start(), which may be
+        # called from inside a request
+        last_stale_check = None
+        while not self._stopping.is_set():
+            close_old_connections()
+            try:
+                if last_stale_check is None or time.monotonic() - last_stale_check > self.poll_interval * 30:
+                    requeue_stale()
+                    last_stale_check = time.monotonic()
+                _purge_sessions_periodically()
+                job = claim_next()
+                if job is not None:
+                    run_job(job)
+                    continue
+            except Exception:
+                logger.exception('Resume worker loop error')
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+        close_old_connections()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide worker pool, starting it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = WorkerPool()
+                pool.start()
+                _pool = pool
+    return _pool
+
+
+def stop_pool(timeout=None):
+    """Stop the process-wide worker pool, if it was started"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.stop(timeout)
@@ -0,0 +1,357 @@
+"""Single-pass keyword extraction for job descriptions.
+
+``KeywordExtractor`` compiles a dictionary of technologies, degree terms and
+section headers into one Aho–Corasick automaton. ``extract`` walks the text
+once and reports every technology, degree and years-of-experience mention with
+its position, while assigning each line to the requirements/skills section it
+belongs to. Matching cost is linear in the text length and does not grow with
+the size of the dictionary, unlike a regex alternation. Technology terms can
+carry a canonical skill id (see ``main/taxonomy.py``), so aliases resolve to the
+same skill. ``LineIndex`` keeps a per-line extraction of a document that is
+being edited, so only changed lines are scanned again, and ``combine`` puts
+the results of consecutive indexes together.
+
+Matching rules mirror the original regexes in ``ATSAnalyzerTool``:
+technologies and degrees are case-insensitive whole-word matches, years of
+experience follow ``\\b\\d+\\+?\\s*years?\\b``, and a line counts as a section
+header when it contains one of the header phrases anywhere.
+"""
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+DEFAULT_TECH_TERMS = [
+    'Python', 'Java', 'JavaScript', 'React', 'Django', 'Flask', 'AWS', 'Azure',
+    'Docker', 'Kubernetes', 'SQL', 'NoSQL', 'Git', 'Agile', 'Scrum',
+]
+DEGREE_TERMS = ['Bachelor', 'Master', 'PhD', 'degree']
+REQUIREMENT_HEADERS = ['requirements', 'qualifications', 'must have']
+SKILL_HEADERS = ['skills', 'technologies', 'experience with']
+
+TECH = 'tech'
+DEGREE = 'degree'
+YEARS = 'years'
+REQUIREMENTS_HEADER = 'requirements'
+SKILLS_HEADER = 'skills'
+_YEAR_UNIT = 'year'
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def _lower_preserving_length(text):
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A handful of characters (e.g. 'İ') lower-case to two code points, which
+    # would shift every offset after them.
+    return ''.join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+
+@dataclass
+class Match:
+    kind: str
+    term: str
+    start: int
+    end: int
+    text: str
+    # Canonical taxonomy id for technology matches (see main/taxonomy.py)
+    skill_id: Optional[int] = None
+
+
+@dataclass
+class ExtractionResult:
+    matches: List[Match] = field(default_factory=list)
+    requirements: List[str] = field(default_factory=list)
+    skills: List[str] = field(default_factory=list)
+    # Kind of each section header line, in order
+    headers: List[str] = field(default_factory=list)
+
+    @property
+    def counts(self) -> Counter:
+        """Occurrences per (kind, term)"""
+        return Counter((m.kind, m.term) for m in self.matches)
+
+    def skill_ids(self) -> List[int]:
+        """Distinct canonical skill ids in order of first appearance"""
+        return list(dict.fromkeys(m.skill_id for m in self.matches if m.skill_id is not None))
+
+    def keywords(self) -> List[str]:
+        """Distinct matched texts in order of first appearance"""
+        return list(dict.fromkeys(m.text for m in self.matches))
+
+    def as_dict(self) -> Dict[str, List[str]]:
+        """The shape returned by ``ATSAnalyzerTool._run``"""
+        return {
+            'keywords': self.keywords(),
+            'skills': self.skills,
+            'requirements': self.requirements,
+        }
+
+
+class KeywordExtractor:
+    """Aho–Corasick automaton over technologies, degrees and section headers"""
+
+    def __init__(self, tech_terms=None, degree_terms=None, term_ids=None):
+        self.tech_terms = list(tech_terms if tech_terms is not None else DEFAULT_TECH_TERMS)
+        self.degree_terms = list(degree_terms if degree_terms is not None else DEGREE_TERMS)
+        # Maps a technology term (or alias) to its canonical skill id
+        self.term_ids = dict(term_ids or {})
+        # goto[state] maps a character to the next state; out[state] lists the
+        # (kind, term, length, whole_word, skill_id) patterns ending there.
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for term in self.tech_terms:
+            self._add(term, TECH, whole_word=True, skill_id=self.term_ids.get(term))
+        for term in self.degree_terms:
+            self._add(term, DEGREE, whole_word=True)
+        for header in REQUIREMENT_HEADERS:
+            self._add(header, REQUIREMENTS_HEADER, whole_word=False)
+        for header in SKILL_HEADERS:
+            self._add(header, SKILLS_HEADER, whole_word=False)
+        self._add(_YEAR_UNIT, YEARS, whole_word=False)
+        self._build_failure_links()
+
+    def __len__(self):
+        return len(self.tech_terms) + len(self.degree_terms)
+
+    def _add(self, term, kind, whole_word, skill_id=None):
+        pattern = _lower_preserving_length(term.strip())
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((kind, term, len(pattern), whole_word, skill_id))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = link if link != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    @staticmethod
+    def _years_start(text, start):
+        """Start of ``\\d+\\+?\\s*`` ending at ``start``, or -1 if absent"""
+        i = start - 1
+        while i >= 0 and text[i].isspace():
+            i -= 1
+        if i >= 0 and text[i] == '+':
+            i -= 1
+        digits_end = i
+        while i >= 0 and text[i].isdigit():
+            i -= 1
+        if i == digits_end or (i >= 0 and _is_word(text[i])):
+            return -1
+        return i + 1
+
+    def extract(self, text: str) -> ExtractionResult:
+        result = ExtractionResult()
+        lowered = _lower_preserving_length(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        length = len(lowered)
+
+        state = 0
+        line_start = 0
+        line_header = None
+        section = None
+
+        for i in range(length + 1):
+            ch = lowered[i] if i < length else '\n'
+
+            if ch == '\n':
+                line = text[line_start:i].lower().strip()
+                if line_header is not None:
+                    section = line_header
+                    result.headers.append(line_header)
+                elif line and section == REQUIREMENTS_HEADER:
+                    result.requirements.append(line)
+                elif line and section == SKILLS_HEADER:
+                    result.skills.append(line)
+                line_start = i + 1
+                line_header = None
+
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state] or i == length:
+                continue
+
+            end = i + 1
+            for kind, term, size, whole_word, skill_id in out[state]:
+                start = end - size
+                if kind == REQUIREMENTS_HEADER:
+                    line_header = REQUIREMENTS_HEADER
+                elif kind == SKILLS_HEADER:
+                    if line_header is None:
+                        line_header = SKILLS_HEADER
+                elif kind == YEARS:
+                    match_end = end + 1 if end < length and lowered[end] == 's' else end
+                    if match_end < length and _is_word(lowered[match_end]):
+                        continue
+                    years_start = self._years_start(lowered, start)
+                    if years_start >= 0:
+                        result.matches.append(Match(YEARS, text[years_start:match_end].lower(),
+                                                    years_start, match_end, text[years_start:match_end]))
+                else:
+                    if whole_word and (
+                        (_is_word(lowered[start]) and start > 0 and _is_word(lowered[start - 1]))
+                        or (_is_word(lowered[end - 1]) and end < length and _is_word(lowered[end]))
+                    ):
+                        continue
+                    result.matches.append(Match(kind, term, start, end, text[start:end], skill_id))
+
+        result.matches = self._drop_overlaps(result.matches)
+        return result
+
+    @staticmethod
+    def _drop_overlaps(matches):
+        # Like successive regex matches, occurrences of one kind never overlap:
+        # the leftmost wins, and the longest term among those starting there.
+        matches.sort(key=lambda m: (m.start, -(m.end - m.start)))
+        kept = []
+        last_end = {}
+        for match in matches:
+            if match.start < last_end.get(match.kind, 0):
+                continue
+            last_end[match.kind] = match.end
+            kept.append(match)
+        return kept
+
+    def analyze(self, text: str) -> Dict[str, List[str]]:
+        return self.extract(text).as_dict()
+
+
+class LineIndex:
+    """Per-line extraction of a document, kept current through line edits
+
+    ``replace`` scans only the lines it is given. ``result`` assigns lines to
+    sections and collects the matches from the stored lines without scanning
+    any text, so an edit costs time in proportion to the lines it touches.
+    Match offsets are relative to their line. Each line is scanned on its own,
+    so unlike ``extract`` a years phrase broken across lines ("5+\\nyears") is
+    not matched. Lines are stored as plain tuples, which pickle several times
+    faster than ``Match`` objects when the index is kept in a cache.
+    """
+
+    def __init__(self, extractor, text=''):
+        # (text, lower-cased stripped text, header kind or None, match tuples) per line
+        self.lines = []
+        self.replace(extractor, 0, 0, text.split('\n'))
+
+    @classmethod
+    def from_lines(cls, lines):
+        """An index over lines already scanned by another index"""
+        index = cls.__new__(cls)
+        index.lines = list(lines)
+        return index
+
+    def split(self, size):
+        """This index as consecutive indexes of at most ``size`` lines, without scanning"""
+        return [LineIndex.from_lines(self.lines[start:start + size]) for start in range(0, len(self.lines), size)]
+
+    def __len__(self):
+        return len(self.lines)
+
+    @property
+    def text(self):
+        return '\n'.join(line[0] for line in self.lines)
+
+    def replace(self, extractor, start, end, lines):
+        """Replace lines ``start:end`` with ``lines``, scanning only those"""
+        if not 0 <= start <= end <= len(self.lines):
+            raise ValueError(f'Line range {start}:{end} is outside a document of {len(self.lines)} lines')
+        scanned = []
+        for line in lines:
+            result = extractor.extract(line)
+            matches = tuple((m.kind, m.term, m.start, m.end, m.text, m.skill_id) for m in result.matches)
+            scanned.append((line, line.lower().strip(), result.headers[0] if result.headers else None, matches))
+        self.lines[start:end] = scanned
+
+    def result(self) -> ExtractionResult:
+        """What ``extract`` reports for the whole document"""
+        result = ExtractionResult([Match(*match) for line in self.lines for match in line[3]])
+        section = None
+        for _, lowered, header, _ in self.lines:
+            if header is not None:
+                section = header
+                result.headers.append(header)
+            elif lowered and section == REQUIREMENTS_HEADER:
+                result.requirements.append(lowered)
+            elif lowered and section == SKILLS_HEADER:
+                result.skills.append(lowered)
+        return result
+
+    def summary(self):
+        """What ``combine`` needs of this index as one part of a longer document
+
+        The first match of each distinct text, and the non-empty lines before
+        the first section header and after each one. Which section the leading
+        lines belong to depends on the parts before this one.
+        """
+        firsts = {}
+        for line in self.lines:
+            for match in line[3]:
+                firsts.setdefault(match[4], match)
+        segments = [(None, [])]
+        for _, lowered, header, _ in self.lines:
+            if header is not None:
+                segments.append((header, []))
+            elif lowered:
+                segments[-1][1].append(lowered)
+        return tuple(firsts.values()), segments
+
+
+def combine(summaries) -> ExtractionResult:
+    """``LineIndex.result`` for consecutive indexes, from their ``summary``
+
+    ``matches`` holds the first match of each distinct text, which is all that
+    ``keywords``, ``skill_ids`` and ``as_dict`` read; ``counts`` is not kept.
+    """
+    firsts = {}
+    result = ExtractionResult()
+    section = None
+    for matches, segments in summaries:
+        for match in matches:
+            firsts.setdefault(match[4], match)
+        for header, lines in segments:
+            if header is not None:
+                section = header
+                result.headers.append(header)
+            if section == REQUIREMENTS_HEADER:
+                result.requirements.extend(lines)
+            elif section == SKILLS_HEADER:
+                result.skills.extend(lines)
+    result.matches = [Match(*match) for match in firsts.values()]
+    return result
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_extractor() -> KeywordExtractor:
+    """Extractor over the built-in dictionary, used when no taxonomy is loaded"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = KeywordExtractor()
+    return _default
@@ -0,0 +1,237 @@
+"""Incremental analysis of the job description typed into the resume builder.
+
+The builder page sends the posting once in full and, after that, only the
+lines that changed since the text the server last analysed::
+
+    {"doc": "<random id of the page>", "base": <hash of the previous text>,
+     "hash": <hash of the new text>,
+     "changes": [{"start": 3, "end": 5, "lines": ["...", "..."]}]}
+
+Each change replaces lines ``start:end`` of the text as left by the changes
+before it. The server keeps the text per session and page in the
+``LIVE_ANALYSIS_CACHE`` cache, as ``keywords.LineIndex`` blocks of up to
+``BLOCK_LINES`` lines, each in an entry of its own, and a header entry with
+the size, hash and ``LineIndex.summary`` of every block. An edit loads, scans
+and stores again only the blocks it touches, and the analysis and hash of the
+whole text are put together from the header. Hashes are CRC-32 of the UTF-8
+text, which the page computes too, so a reconstructed text that differs from
+the browser's is caught. When the state is gone (expired, evicted, or kept by
+another process) or does not match, ``Resync`` tells the page to send the
+whole text again.
+"""
+import functools
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from . import taxonomy
+from .keywords import LineIndex, combine
+
+BLOCK_LINES = 128  # lines per cache entry; an edit stores again only the blocks it touches
+
+
+class Resync(Exception):
+    """The client has to send the whole text again"""
+
+
+def content_hash(text):
+    return zlib.crc32(text.encode('utf-8'))
+
+
+def _gf2_times(matrix, vector):
+    total = 0
+    for row in matrix:
+        if not vector:
+            break
+        if vector & 1:
+            total ^= row
+        vector >>= 1
+    return total
+
+
+@functools.lru_cache(maxsize=None)
+def _zeros(power):
+    """The GF(2) operator that appends ``2 ** power`` zero bytes to a CRC-32"""
+    if power:
+        previous = _zeros(power - 1)
+        return tuple(_gf2_times(previous, row) for row in previous)
+    operator = (0xEDB88320,) + tuple(1 << bit for bit in range(31))  # one zero bit
+    for _ in range(3):
+        operator = tuple(_gf2_times(operator, row) for row in operator)
+    return operator
+
+
+def crc32_combine(crc1, crc2, length2):
+    """CRC-32 of ``a + b`` from those of ``a`` and ``b`` and the length of ``b``, as in zlib"""
+    power = 0
+    while length2:
+        if length2 & 1:
+            crc1 = _gf2_times(_zeros(power), crc1)
+        length2 >>= 1
+        power += 1
+    return crc1 ^ crc2
+
+
+def _cache():
+    return caches[getattr(settings, 'LIVE_ANALYSIS_CACHE', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'LIVE_ANALYSIS_TIMEOUT', 30 * 60)
+
+
+def _key(session_key, doc):
+    if not isinstance(doc, str) or len(doc) > 64:
+        raise ValueError('doc must be a string of at most 64 characters')
+    # Visitors without a session would share one state
+    if not session_key:
+        raise Resync
+    return f'live-analysis:{session_key}:{doc}'
+
+
+def _changes(data):
+    """Validated ``(start, end, lines)`` edits from a request body"""
+    changes = data.get('changes')
+    if not isinstance(changes, list):
+        raise ValueError('changes must be a list')
+    edits = []
+    for change in changes:
+        if not isinstance(change, dict):
+            raise ValueError('Each change must be an object')
+        start, end, lines = change.get('start'), change.get('end'), change.get('lines')
+        if not (isinstance(start, int) and isinstance(end, int) and isinstance(lines, list)
+                and all(isinstance(line, str) and '\n' not in line for line in lines)):
+            raise ValueError('Each change needs integer start and end and a list of lines')
+        edits.append((start, end, lines))
+    return edits
+
+
+class _State:
+    """The header entry of a stored text and the blocks loaded or changed for one request"""
+
+    def __init__(self, key, header):
+        self.key = key
+        self.header = header
+        self.loaded = {}
+        self.written = {}
+        self.removed = []
+        # Blocks from here on need their running hash recomputed
+        self.changed_from = len(header['blocks'])
+
+    @classmethod
+    def new(cls, key):
+        return cls(key, {'blocks': [], 'next': 0, 'taxonomy': taxonomy.version()})
+
+    def _block_key(self, block_id):
+        return f'{self.key}:{block_id}'
+
+    def _load(self, block_ids):
+        missing = [block_id for block_id in block_ids if block_id not in self.loaded]
+        if missing:
+            found = _cache().get_many([self._block_key(block_id) for block_id in missing])
+            for block_id in missing:
+                index = found.get(self._block_key(block_id))
+                if index is None:
+                    raise Resync
+                self.loaded[block_id] = index
+        return [self.loaded[block_id] for block_id in block_ids]
+
+    def replace(self, extractor, start, end, lines):
+        """Apply one edit, rebuilding only the blocks that hold lines ``start:end``"""
+        blocks = self.header['blocks']
+        first, offset = len(blocks), sum(block['lines'] for block in blocks)
+        position = 0
+        for number, block in enumerate(blocks):
+            if start < position + block['lines']:
+                first, offset = number, position
+                break
+            position += block['lines']
+        if blocks and first == len(blocks):
+            # Appending: extend the last block
+            first, offset = first - 1, offset - blocks[-1]['lines']
+        last, position = first, offset
+        for number in range(first, len(blocks)):
+            position += blocks[number]['lines']
+            last = number + 1
+            if end <= position:
+                break
+
+        touched = blocks[first:last]
+        merged = LineIndex.from_lines(
+            line for index in self._load([block['id'] for block in touched]) for line in index.lines
+        )
+        try:
+            merged.replace(extractor, start - offset, end - offset, lines)
+        except ValueError:
+            raise Resync
+
+        for block in touched:
+            self.removed.append(block['id'])
+            self.written.pop(block['id'], None)
+        rebuilt = []
+        for index in merged.split(BLOCK_LINES):
+            block_id = self.header['next']
+            self.header['next'] += 1
+            text = index.text.encode('utf-8')
+            rebuilt.append({'id': block_id, 'lines': len(index), 'crc': zlib.crc32(text), 'size': len(text),
+                            'summary': index.summary()})
+            self.loaded[block_id] = self.written[block_id] = index
+        blocks[first:last] = rebuilt
+        self.changed_from = min(self.changed_from, first)
+
+    def digest(self):
+        """Hash of the whole text, from the running hash of each block through its end"""
+        blocks = self.header['blocks']
+        crc = blocks[self.changed_from - 1]['through'] if self.changed_from else 0
+        for number in range(self.changed_from, len(blocks)):
+            if number:
+                crc = zlib.crc32(b'\n', crc)
+            crc = blocks[number]['through'] = crc32_combine(crc, blocks[number]['crc'], blocks[number]['size'])
+        self.changed_from = len(blocks)
+        return crc
+
+    def result(self):
+        return combine(block['summary'] for block in self.header['blocks'])
+
+    def save(self, digest):
+        self.header['hash'] = digest
+        entries = {self._block_key(block_id): index for block_id, index in self.written.items()}
+        entries[self.key] = self.header
+        _cache().set_many(entries, timeout=_timeout())
+        if self.removed:
+            _cache().delete_many([self._block_key(block_id) for block_id in self.removed])
+
+
+def start(extractor, session_key, doc, text):
+    """Analyse the whole ``text`` and keep its state for later edits"""
+    state = _State.new(_key(session_key, doc))
+    state.replace(extractor, 0, 0, text.split('\n'))
+    digest = state.digest()
+    state.save(digest)
+    return state.result(), digest
+
+
+def update(extractor, session_key, doc, data):
+    """Apply the edits in ``data`` to the stored text; its analysis and hash"""
+    edits = _changes(data)
+    key = _key(session_key, doc)
+    header = _cache().get(key)
+    if header is None or header['hash'] != data.get('base') or header['taxonomy'] != taxonomy.version():
+        raise Resync
+    state = _State(key, header)
+    for start_line, end_line, lines in edits:
+        state.replace(extractor, start_line, end_line, lines)
+    digest = state.digest()
+    if digest != data.get('hash'):
+        _cache().delete(key)
+        raise Resync
+    state.save(digest)
+    return state.result(), digest
+
+
+# For async views: the cache round trips and the rescan of the edited blocks
+# run in a worker thread, off the event loop
+astart = sync_to_async(start, thread_sensitive=False)
+aupdate = sync_to_async(update, thread_sensitive=False)
@@ -0,0 +1,216 @@
+"""End-to-end load test of the resume endpoints.
+
+``LoadTest`` runs simulated user sessions from a thread pool. Each session:
+
+1. posts a job description to ``analyze_job_description``;
+2. submits the form to ``resume_builder``;
+3. polls ``resume_status`` until the generation job finishes;
+4. loads ``resume_result`` and ``download_resume``.
+
+Every request is timed and its database queries counted. ``run`` returns
+p50/p95/p99 latency and query counts per endpoint, overall throughput, and the
+submit-to-done latency of the generation jobs. Use it with
+``RESUME_LLM_BACKEND = 'mock'`` (see main/mock_llm.py) so runs are offline and
+repeatable. It is driven by ``main.tests.ResumeLoadTest`` and by the
+``load_test`` management command.
+
+``PageLoadTest`` runs signed-in browsing (login, home, result) instead, to
+compare session and message storage (``bench_requests``).
+"""
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+POSTINGS = [
+    'Backend Engineer. Requirements: 3+ years of Python and Django, PostgreSQL, Docker, AWS. '
+    'Bachelor degree in Computer Science.',
+    'Frontend Developer. Must have: React, JavaScript, TypeScript and Git. Experience with Agile teams.',
+    'Data Engineer. Qualifications: SQL, Python, Kubernetes, Azure. 5+ years building pipelines.',
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100.0 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def session_form(index):
+    """Form data for simulated user ``index``; every user is distinct"""
+    return {
+        'full_name': f'Load Test User {index}',
+        'email': f'user{index}@example.com',
+        'phone': '+1 555 0100',
+        'location': 'Remote',
+        'target_position': 'Software Engineer',
+        'target_industry': 'Technology',
+        'job_description': POSTINGS[index % len(POSTINGS)],
+        'current_summary': 'Engineer who ships reliable web services.',
+        'years_experience': '4-5',
+        'career_level': 'mid',
+        'technical_skills': 'Python, Django, React, SQL, Docker',
+        'soft_skills': 'Communication, Mentoring',
+        'experience_title[]': ['Software Engineer', 'Junior Developer'],
+        'experience_company[]': ['Acme', 'Initech'],
+        'experience_start[]': ['2021-01', '2019-06'],
+        'experience_end[]': ['', '2020-12'],
+        'experience_description[]': ['Built APIs used by 1M users', 'Maintained internal tools'],
+        'education_degree[]': ['BSc Computer Science'],
+        'education_school[]': ['State University'],
+        'education_year[]': ['2019'],
+        'education_gpa[]': [''],
+    }
+
+
+class LoadTest:
+    """Drive the resume endpoints with ``sessions`` users, ``concurrency`` at a time"""
+
+    def __init__(self, sessions=20, concurrency=4, poll_interval=0.05, job_timeout=120):
+        self.sessions = sessions
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._queries = defaultdict(list)
+        self._errors = defaultdict(int)
+        self._job_latencies = []
+        self._job_statuses = defaultdict(int)
+
+    def _request(self, name, call, expected=(200,)):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = call()
+            elapsed = time.perf_counter() - started
+        with self._lock:
+            self._latencies[name].append(elapsed)
+            self._queries[name].append(len(queries))
+            if response.status_code not in expected:
+                self._errors[name] += 1
+        return response
+
+    def _session(self, index):
+        client = Client()
+        form = session_form(index)
+        try:
+            self._request('analyze_job_description', lambda: client.post(
+                reverse('analyze_job'),
+                data=json.dumps({'job_description': form['job_description']}),
+                content_type='application/json',
+            ))
+
+            submitted = time.perf_counter()
+            response = self._request('resume_builder', lambda: client.post(reverse('ai_resume'), form),
+                                     expected=(302,))
+            if response.status_code != 302:
+                return
+            pk = response.url.rstrip('/').rsplit('/', 1)[-1]
+
+            status = 'pending'
+            deadline = submitted + self.job_timeout
+            while status in ('pending', 'running') and time.perf_counter() < deadline:
+                status = self._request(
+                    'resume_status', lambda: client.get(reverse('resume_status', args=[pk]))
+                ).json().get('status')
+                if status in ('pending', 'running'):
+                    time.sleep(self.poll_interval)
+            with self._lock:
+                self._job_statuses[status] += 1
+                if status == 'done':
+                    self._job_latencies.append(time.perf_counter() - submitted)
+            if status != 'done':
+                return
+
+            self._request('resume_result', lambda: client.get(reverse('res_result', args=[pk])))
+            self._request('download_resume', lambda: client.get(reverse('download_resume', args=[pk])))
+        finally:
+            # Each session thread has its own connection
+            connections.close_all()
+
+    def run(self):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='load-test') as executor:
+            list(executor.map(self._session, range(self.sessions)))
+        elapsed = time.perf_counter() - started
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        requests = sum(len(values) for values in self._latencies.values())
+        endpoints = {}
+        for name, latencies in self._latencies.items():
+            queries = self._queries[name]
+            endpoints[name] = {
+                'requests': len(latencies),
+                'errors': self._errors[name],
+                'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+                'queries_mean': round(sum(queries) / len(queries), 2),
+                'queries_max': max(queries),
+            }
+        return {
+            'sessions': self.sessions,
+            'concurrency': self.concurrency,
+            'elapsed_s': round(elapsed, 3),
+            'throughput_rps': round(requests / elapsed, 2) if elapsed else 0.0,
+            'endpoints': endpoints,
+            'jobs': {
+                'statuses': dict(self._job_statuses),
+                'p50_s': round(percentile(self._job_latencies, 50), 3),
+                'p95_s': round(percentile(self._job_latencies, 95), 3),
+                'p99_s': round(percentile(self._job_latencies, 99), 3),
+            },
+        }
+
+
+class PageLoadTest(LoadTest):
+    """Signed-in browsing: each session logs in, then views the home and result pages
+
+    Measures the per-request cost of the session and message storage rather
+    than generation; ``result_pk`` must be a finished generation of the user.
+    """
+
+    def __init__(self, username, password, result_pk, pages=10, **kwargs):
+        super().__init__(**kwargs)
+        self.credentials = {'username': username, 'password': password}
+        self.result_pk = result_pk
+        self.pages = pages
+
+    def _session(self, index):
+        client = Client()
+        try:
+            self._request('login_page', lambda: client.post(reverse('login'), self.credentials), expected=(302,))
+            for _ in range(self.pages):
+                self._request('home', lambda: client.get(reverse('home')))
+                self._request('resume_result', lambda: client.get(reverse('res_result', args=[self.result_pk])))
+        finally:
+            connections.close_all()
+
+
+def format_report(report):
+    lines = [
+        f"{report['sessions']} sessions, concurrency {report['concurrency']}: "
+        f"{report['elapsed_s']} s, {report['throughput_rps']} req/s",
+        f"{'endpoint':<26}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'queries':>9}{'max q':>7}",
+    ]
+    for name, stats in sorted(report['endpoints'].items()):
+        lines.append(
+            f"{name:<26}{stats['requests']:>9}{stats['errors']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+            f"{stats['p99_ms']:>10}{stats['queries_mean']:>9}{stats['queries_max']:>7}"
+        )
+    jobs = report['jobs']
+    if jobs['statuses']:
+        lines.append(f"jobs {jobs['statuses']}: p50 {jobs['p50_s']} s, p95 {jobs['p95_s']} s, p99 {jobs['p99_s']} s")
+    return '\n'.join(lines)
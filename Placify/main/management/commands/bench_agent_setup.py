@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import agent_pool
+from main.pipeline import ResumeOptimizerAgent
+
+SAMPLE_USER_DATA = {
+    'full_name': 'Jane Doe',
+    'email': 'jane@example.com',
+    'target_position': 'Backend Engineer',
+    'target_industry': 'Software',
+    'job_description': 'We are looking for a Python developer with Django and AWS experience.',
+    'technical_skills': 'Python, Django, PostgreSQL, Docker',
+    'experience_data': [{'title': 'Developer', 'company': 'Acme', 'start_date': '2021',
+                         'end_date': 'Present', 'description': 'Built APIs'}],
+    'education_data': [{'degree': 'BSc Computer Science', 'school': 'State University',
+                        'year': '2020', 'gpa': ''}],
+    'projects_data': [],
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request agent setup overhead with and without the agent pool (no LLM calls)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+
+    def _report(self, label, timings):
+        timings.sort()
+        mean = sum(timings) / len(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(f'{label:<28} mean={mean * 1000:8.3f} ms  p95={p95 * 1000:8.3f} ms')
+        return mean
+
+    def handle(self, *args, **options):
+        n = options['requests']
+
+        # Before: every request builds a client, three agents and the tool.
+        fresh = []
+        for _ in range(n):
+            start = time.perf_counter()
+            optimizer = ResumeOptimizerAgent()
+            optimizer.build_analysis_crew(SAMPLE_USER_DATA)
+            optimizer.build_resume_crew(SAMPLE_USER_DATA, 'analysis')
+            fresh.append(time.perf_counter() - start)
+
+        # After: agents come from the pool; only Task/Crew objects are built.
+        with agent_pool.checkout():
+            pass  # warm the pool so lazy init is not counted per request
+        pooled = []
+        for _ in range(n):
+            start = time.perf_counter()
+            with agent_pool.checkout() as optimizer:
+                optimizer.build_analysis_crew(SAMPLE_USER_DATA)
+                optimizer.build_resume_crew(SAMPLE_USER_DATA, 'analysis')
+            pooled.append(time.perf_counter() - start)
+
+        before = self._report('fresh agent per request', fresh)
+        after = self._report('pooled agent', pooled)
+        if after:
+            self.stdout.write(f'speedup: {before / after:.1f}x over {n} requests')
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import SyncToAsync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from main.loadtest import percentile
+from main.models import ResumeGeneration
+
+JOB_DESCRIPTION = ('Backend engineer with Python, Django and PostgreSQL experience. Docker, AWS and CI/CD '
+                   'a plus. Strong communication and teamwork skills.')
+# Django's own classes for the middleware main.middleware subclasses
+STOCK_MIDDLEWARE = {
+    'main.middleware.SecurityMiddleware': 'django.middleware.security.SecurityMiddleware',
+    'main.middleware.SessionMiddleware': 'django.contrib.sessions.middleware.SessionMiddleware',
+    'main.middleware.CommonMiddleware': 'django.middleware.common.CommonMiddleware',
+    'main.middleware.CsrfViewMiddleware': 'django.middleware.csrf.CsrfViewMiddleware',
+    'main.middleware.AuthenticationMiddleware': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'main.middleware.MessageMiddleware': 'django.contrib.messages.middleware.MessageMiddleware',
+    'main.middleware.XFrameOptionsMiddleware': 'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+
+
+def endpoints(pk):
+    """(name, method, path, JSON body) of the cheap requests a visitor repeats"""
+    return [
+        ('home', 'get', reverse('home'), None),
+        ('resume_status', 'get', reverse('resume_status', args=[pk]), None),
+        ('resume_result', 'get', reverse('res_result', args=[pk]), None),
+        ('download_resume', 'get', reverse('download_resume', args=[pk, 'txt']), None),
+        ('analyze_job_description', 'post', reverse('analyze_job'), {'job_description': JOB_DESCRIPTION}),
+    ]
+
+
+class _HandOffs:
+    """Count sync_to_async calls, i.e. jumps from the event loop to a thread"""
+
+    def __enter__(self):
+        self.count = 0
+        self._call = SyncToAsync.__call__
+        counter = self
+
+        def call(adapter, *args, **kwargs):
+            counter.count += 1
+            return counter._call(adapter, *args, **kwargs)
+
+        SyncToAsync.__call__ = call
+        return self
+
+    def __exit__(self, *exc_info):
+        SyncToAsync.__call__ = self._call
+
+
+class Command(BaseCommand):
+    help = ('Serve the light endpoints (home, status polling, result, download, JD analysis) concurrently '
+            'through the WSGI and the ASGI handler, in a throwaway test database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint')
+        parser.add_argument('--threads', type=int, default=16, help='WSGI worker threads')
+        parser.add_argument('--concurrency', type=int, default=1000, help='Requests in flight on the ASGI event loop')
+
+    def _wsgi(self, user, requests, threads):
+        """A threaded WSGI server: each thread serves one request at a time"""
+        def worker(calls):
+            client = Client()
+            client.force_login(user)
+            results = []
+            try:
+                for name, method, path, body in calls:
+                    started = time.perf_counter()
+                    if body is None:
+                        response = getattr(client, method)(path)
+                    else:
+                        response = getattr(client, method)(path, json.dumps(body), content_type='application/json')
+                    results.append((name, response.status_code, time.perf_counter() - started))
+            finally:
+                connections.close_all()
+            return results
+
+        calls = self._calls(requests)
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            chunks = pool.map(worker, [calls[index::threads] for index in range(threads)])
+            return [result for chunk in chunks for result in chunk]
+
+    async def _asgi(self, user, requests, concurrency):
+        """One event loop with ``concurrency`` requests in flight"""
+        client = AsyncClient()
+        await client.aforce_login(user)
+        slots = asyncio.Semaphore(concurrency)
+
+        async def call(name, method, path, body):
+            async with slots:
+                started = time.perf_counter()
+                if body is None:
+                    response = await getattr(client, method)(path)
+                else:
+                    response = await getattr(client, method)(path, json.dumps(body), content_type='application/json')
+                return name, response.status_code, time.perf_counter() - started
+
+        return await asyncio.gather(*(call(*spec) for spec in self._calls(requests)))
+
+    def _calls(self, requests):
+        return [spec for _ in range(requests) for spec in endpoints(self.pk)]
+
+    def _report(self, label, results, elapsed, hand_offs):
+        self.stdout.write(f'{label}: {len(results) / elapsed:.0f} req/s in {elapsed:.2f} s, '
+                          f'{hand_offs / len(results):.1f} thread hand-offs per request')
+        self.stdout.write(f'  {"endpoint":<25} {"errors":>6} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+        for name, *_ in endpoints(self.pk):
+            latencies = [seconds for endpoint, _, seconds in results if endpoint == name]
+            errors = sum(1 for endpoint, status, _ in results if endpoint == name and status >= 400)
+            self.stdout.write(
+                f'  {name:<25} {errors:>6} {percentile(latencies, 50) * 1000:>8.1f} '
+                f'{percentile(latencies, 95) * 1000:>8.1f} {percentile(latencies, 99) * 1000:>8.1f}'
+            )
+
+    def handle(self, *args, **options):
+        # No setup_test_environment(): its template instrumentation copies every
+        # render into every in-flight test client request, which grows with the
+        # square of the concurrency and would swamp the ASGI numbers
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            user = User.objects.create_user('bench', password='bench')
+            self.pk = ResumeGeneration.objects.create(
+                user=user, full_name='Ann Lee', email='ann@example.com', target_position='Backend Engineer',
+                job_description=JOB_DESCRIPTION, generated_resume='Ann Lee\n\n## SKILLS\nPython, Django',
+                form_data={}, status=ResumeGeneration.STATUS_DONE, finished_at=timezone.now(),
+            ).pk
+            with override_settings(RATELIMIT_ENABLED=False, ALLOWED_HOSTS=['testserver']):
+                # Warm up caches, templates and the taxonomy outside the timings
+                self._wsgi(user, 2, 1)
+                with _HandOffs() as hand_offs:
+                    started = time.perf_counter()
+                    results = self._wsgi(user, options['requests'], options['threads'])
+                    self._report(f'WSGI, {options["threads"]} threads', results,
+                                 time.perf_counter() - started, hand_offs.count)
+
+                stock = [STOCK_MIDDLEWARE.get(path, path) for path in settings.MIDDLEWARE]
+                for label, middleware in (("Django's middleware", stock), ('main.middleware', settings.MIDDLEWARE)):
+                    with override_settings(MIDDLEWARE=middleware), _HandOffs() as hand_offs:
+                        started = time.perf_counter()
+                        results = asyncio.run(self._asgi(user, options['requests'], options['concurrency']))
+                        self._report(f'ASGI with {label}, 1 event loop, up to {options["concurrency"]} in flight',
+                                     results, time.perf_counter() - started, hand_offs.count)
+            connections.close_all()
+        finally:
+            runner.teardown_databases(old_config)
@@ -0,0 +1,99 @@
+import random
+import re
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.keywords import DEFAULT_TECH_TERMS, DEGREE_TERMS, KeywordExtractor
+
+FILLER = (
+    'We are hiring an engineer to join our platform team. You will design services, '
+    'review code and mentor colleagues. Experience with {tech} and {tech} is a plus. '
+    'Candidates need {years}+ years of professional experience and a Bachelor degree.\n'
+)
+
+
+def legacy_analyze(job_description, tech_terms):
+    """The pre-automaton ATSAnalyzerTool implementation, for comparison"""
+    keywords = []
+    skills = []
+    requirements = []
+    lines = job_description.lower().split('\n')
+    current_section = None
+    for line in lines:
+        line = line.strip()
+        if any(word in line for word in ['requirements', 'qualifications', 'must have']):
+            current_section = 'requirements'
+        elif any(word in line for word in ['skills', 'technologies', 'experience with']):
+            current_section = 'skills'
+        elif line and current_section:
+            if current_section == 'requirements':
+                requirements.append(line)
+            elif current_section == 'skills':
+                skills.append(line)
+    tech_patterns = [
+        r'\b(' + '|'.join(re.escape(term) for term in tech_terms) + r')\b',
+        r'\b(\d+\+?\s*years?)\b',
+        r'\b(' + '|'.join(DEGREE_TERMS) + r')\b',
+    ]
+    for pattern in tech_patterns:
+        keywords.extend(re.findall(pattern, job_description, re.IGNORECASE))
+    return {'keywords': list(set(keywords)), 'skills': skills, 'requirements': requirements}
+
+
+def synthetic_terms(count, rng):
+    terms = list(DEFAULT_TECH_TERMS)
+    while len(terms) < count:
+        size = rng.randint(3, 12)
+        terms.append(''.join(rng.choice(string.ascii_lowercase) for _ in range(size)))
+    return terms
+
+
+def synthetic_job_description(size, terms, rng):
+    parts = ['Requirements:\n']
+    while sum(len(p) for p in parts) < size:
+        parts.append(FILLER.format(tech=rng.choice(terms), years=rng.randint(1, 10)))
+        if rng.random() < 0.05:
+            parts.append(rng.choice(['Skills:\n', 'Qualifications:\n']))
+    return ''.join(parts)
+
+
+class Command(BaseCommand):
+    help = 'Compare the regex-based and automaton-based job description analysis'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='2000,20000,200000',
+                            help='Comma-separated job description sizes in characters')
+        parser.add_argument('--dictionaries', default='15,500,5000',
+                            help='Comma-separated dictionary sizes (number of terms)')
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=7)
+
+    def _time(self, fn, repeat):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        sizes = [int(s) for s in options['sizes'].split(',')]
+        dictionaries = [int(d) for d in options['dictionaries'].split(',')]
+
+        self.stdout.write(f"{'terms':>6} {'chars':>8} {'build ms':>9} {'regex ms':>10} {'automaton ms':>13} {'speedup':>8}")
+        for count in dictionaries:
+            terms = synthetic_terms(count, rng)
+            start = time.perf_counter()
+            extractor = KeywordExtractor(tech_terms=terms)
+            build = time.perf_counter() - start
+            for size in sizes:
+                text = synthetic_job_description(size, terms, rng)
+                regex = self._time(lambda: legacy_analyze(text, terms), options['repeat'])
+                automaton = self._time(lambda: extractor.analyze(text), options['repeat'])
+                self.stdout.write(
+                    f'{count:>6} {len(text):>8} {build * 1000:>9.1f} {regex * 1000:>10.2f} '
+                    f'{automaton * 1000:>13.2f} {regex / automaton:>7.1f}x'
+                )
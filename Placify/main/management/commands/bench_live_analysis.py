@@ -0,0 +1,62 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import batch_analysis, live_analysis, taxonomy
+from main.loadtest import percentile
+
+SECTIONS = [
+    ['About us', 'We build software for {n} hospitals across the region and value curious people.'],
+    ['Requirements:', '- {n}+ years of Python, Django and SQL in production', '- A Bachelor degree or equivalent'],
+    ['Skills and technologies:', '- Docker, Kubernetes and AWS at scale {n}', '- Git, Agile and Scrum teams'],
+]
+
+
+def posting(lines):
+    """A synthetic posting of about ``lines`` lines"""
+    text = []
+    while len(text) < lines:
+        for section in SECTIONS:
+            text.extend(line.format(n=len(text)) for line in section)
+    return text[:lines]
+
+
+class Command(BaseCommand):
+    help = ('Time the live job description analysis of one edited line: a full re-analysis against an '
+            'incremental update of the stored per-line state')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, nargs='+', default=[20, 100, 500], help='Posting sizes in lines')
+        parser.add_argument('--edits', type=int, default=200)
+
+    def handle(self, *args, **options):
+        extractor = taxonomy.get_extractor()
+        rng = random.Random(0)
+        for size in options['lines']:
+            lines = posting(size)
+            text = '\n'.join(lines)
+            _, digest = live_analysis.start(extractor, 'bench', 'bench', text)
+            full, incremental = [], []
+            for _ in range(options['edits']):
+                row = rng.randrange(len(lines))
+                lines[row] += rng.choice([' Flask', ' React', ' and more', ' PhD'])
+                text = '\n'.join(lines)
+
+                started = time.perf_counter()
+                batch_analysis.analysis_payload(extractor.extract(text))
+                full.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                change = {'start': row, 'end': row + 1, 'lines': [lines[row]]}
+                extraction, digest = live_analysis.update(extractor, 'bench', 'bench', {
+                    'base': digest, 'hash': live_analysis.content_hash(text), 'changes': [change],
+                })
+                batch_analysis.analysis_payload(extraction)
+                incremental.append(time.perf_counter() - started)
+
+            self.stdout.write(
+                f'{size:>5} lines ({len(text) / 1024:5.1f} KB): full p50 {percentile(full, 50) * 1000:6.2f} ms, '
+                f'incremental p50 {percentile(incremental, 50) * 1000:6.2f} ms '
+                f'(p95 {percentile(full, 95) * 1000:.2f} / {percentile(incremental, 95) * 1000:.2f} ms)'
+            )
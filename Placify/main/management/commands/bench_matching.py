@@ -0,0 +1,67 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import matching
+from main.keywords import DEFAULT_TECH_TERMS, default_extractor
+
+WORDS = (
+    'designed built led shipped migrated scaled automated improved maintained mentored reduced latency '
+    'pipeline service platform dashboard api customers revenue team release testing monitoring cloud '
+    'analytics reporting data model deployment infrastructure security mobile frontend backend'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ranking synthetic resumes against a posting with the vectorized matcher'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resumes', type=int, default=50000)
+        parser.add_argument('--postings', type=int, default=1)
+        parser.add_argument('--words', type=int, default=300, help='Words per synthetic resume')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _document(self, rng, words):
+        tokens = [rng.choice(WORDS) for _ in range(words)]
+        tokens += rng.sample(DEFAULT_TECH_TERMS, 4)
+        rng.shuffle(tokens)
+        return ' '.join(tokens)
+
+    def handle(self, *args, **options):
+        import numpy as np
+        from scipy import sparse
+
+        rng = random.Random(options['seed'])
+        extractor = default_extractor()
+
+        started = time.perf_counter()
+        # Vectorize a pool of distinct documents and tile it; the cost being
+        # measured is the ranking, not vectorization.
+        pool = [matching.vectorize(self._document(rng, options['words']), extractor) for _ in range(500)]
+        rows = [pool[i % len(pool)] for i in range(options['resumes'])]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(indices) for indices, _ in rows], out=indptr[1:])
+        csr = sparse.csr_matrix(
+            (
+                np.concatenate([np.frombuffer(values.tobytes(), dtype=np.float32) for _, values in rows]),
+                np.concatenate([np.frombuffer(indices.tobytes(), dtype=np.int32) for indices, _ in rows]),
+                indptr,
+            ),
+            shape=(len(rows), matching.N_FEATURES),
+        )
+        matrix = matching.ResumeMatrix(np.arange(len(rows), dtype=np.int64), csr)
+        self.stdout.write(f'Built {len(rows)} x {matching.N_FEATURES} matrix '
+                          f'({csr.nnz} non-zeros) in {(time.perf_counter() - started) * 1000:.0f} ms')
+
+        postings = [self._document(rng, 150) for _ in range(options['postings'])]
+        timings = []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            matching.rank(postings, top=20, matrix=matrix, extractor=extractor)
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(
+            f'rank {len(rows)} resumes x {len(postings)} postings: '
+            f'best {min(timings) * 1000:.1f} ms, mean {sum(timings) / len(timings) * 1000:.1f} ms'
+        )
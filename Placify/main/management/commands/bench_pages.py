@@ -0,0 +1,91 @@
+import gzip
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from main.loadtest import percentile
+from main.models import ResumeGeneration
+
+ASSET = re.compile(r'<(?:link[^>]+href|script[^>]+src)="([^"]+)"')
+
+
+def gzip_size(content):
+    return len(gzip.compress(content, 9, mtime=0))
+
+
+class Command(BaseCommand):
+    help = ('Measure HTML and asset bytes per page and server time per request for the template-heavy pages, '
+            'in a throwaway test database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50, help='Requests per page for the timings')
+
+    def _asset_size(self, url):
+        """Bytes on the wire for a local asset: the precompressed file if collectstatic made one"""
+        if not url.startswith(settings.STATIC_URL) and not url.startswith('/' + settings.STATIC_URL):
+            return None
+        name = url.split(settings.STATIC_URL, 1)[1].split('?')[0]
+        root = Path(settings.STATIC_ROOT) if getattr(settings, 'STATIC_ROOT', None) else None
+        for suffix in ('.br', '.gz'):
+            if root and (root / (name + suffix)).exists():
+                return (root / (name + suffix)).stat().st_size
+        path = root / name if root and (root / name).exists() else finders.find(name)
+        return gzip_size(Path(path).read_bytes()) if path else 0
+
+    def _measure(self, label, client, url, repeat):
+        client.get(url)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - started)
+        html = response.content
+        local, external = 0, 0
+        for asset in set(ASSET.findall(html.decode())):
+            size = self._asset_size(asset)
+            if size is None:
+                external += 1
+            else:
+                local += size
+        self.stdout.write(
+            f'{label:<28} {len(html) / 1024:8.1f} {gzip_size(html) / 1024:8.1f} {local / 1024:8.1f} '
+            f'{(len(html) + local) / 1024:8.1f} {len(html) / 1024:8.1f} {external:>5} '
+            f'{percentile(timings, 50) * 1000:8.2f} {percentile(timings, 95) * 1000:8.2f}'
+        )
+
+    def handle(self, *args, **options):
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver'], RATELIMIT_ENABLED=False):
+                user = User.objects.create_user('bench', password='bench', first_name='Ann', last_name='Lee')
+                job = ResumeGeneration.objects.create(
+                    user=user, full_name='Ann Lee', generated_resume='Ann Lee\n\n## SKILLS\nPython, Django',
+                    form_data={}, status=ResumeGeneration.STATUS_DONE, finished_at=timezone.now(),
+                )
+                self.stdout.write('KB per page. Assets are counted compressed as served; the HTML is sent as is '
+                                  '(html gz: what a compressing proxy would send). A first visit downloads the '
+                                  'HTML and assets, a repeat visit only the HTML; cdn counts third-party files.')
+                self.stdout.write(f'{"page":<28} {"html":>8} {"html gz":>8} {"assets":>8} {"first":>8} '
+                                  f'{"repeat":>8} {"cdn":>5} {"p50 ms":>8} {"p95 ms":>8}')
+                anonymous = Client()
+                for name in ('home', 'index', 'login', 'register', 'ai_resume'):
+                    self._measure(f'{name} (anonymous)', anonymous, reverse(name), options['repeat'])
+                member = Client()
+                member.force_login(user)
+                for name, args in (('home', []), ('index', []), ('ai_resume', []), ('res_result', [job.pk])):
+                    self._measure(f'{name} (logged in)', member, reverse(name, args=args), options['repeat'])
+            connections.close_all()
+        finally:
+            runner.teardown_databases(old_config)
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from main.loadtest import PageLoadTest, format_report
+from main.models import ResumeGeneration
+
+SESSIONS = 'django.contrib.sessions.backends.'
+PROFILES = {
+    # What settings.py used before: every request reads the session from the
+    # database, and messages fall back to it
+    'db': {'SESSION_ENGINE': SESSIONS + 'db',
+           'MESSAGE_STORAGE': 'django.contrib.messages.storage.fallback.FallbackStorage'},
+    'cached_db': {'SESSION_ENGINE': SESSIONS + 'cached_db'},
+    'cache': {'SESSION_ENGINE': SESSIONS + 'cache'},
+    'signed_cookies': {'SESSION_ENGINE': SESSIONS + 'signed_cookies'},
+}
+
+
+class Command(BaseCommand):
+    help = ('Compare login/home/result throughput under each session storage profile, '
+            'in a throwaway test database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=40)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--pages', type=int, default=10, help='Home and result views per session')
+        parser.add_argument('--profile', dest='profiles', action='append', choices=sorted(PROFILES),
+                            help='Profile to run; repeat for several (default: all)')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        # Login cost should be the session, not a deliberately slow password hash
+        hashers = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+        hashers.enable()
+        try:
+            user = User.objects.create_user('bench-requests', password='bench-requests')
+            result = ResumeGeneration.objects.create(
+                user=user, full_name='Bench User', target_position='Engineer', form_data={},
+                generated_resume='Bench User\nbench@example.com\n\nSUMMARY\nEngineer.',
+                status=ResumeGeneration.STATUS_DONE,
+            )
+            for name in options['profiles'] or list(PROFILES):
+                caches[settings.SESSION_CACHE_ALIAS].clear()
+                with override_settings(**PROFILES[name]):
+                    report = PageLoadTest(
+                        'bench-requests', 'bench-requests', result.pk, pages=options['pages'],
+                        sessions=options['sessions'], concurrency=options['concurrency'],
+                    ).run()
+                self.stdout.write(f'--- {name} ---\n{format_report(report)}\n')
+        finally:
+            hashers.disable()
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
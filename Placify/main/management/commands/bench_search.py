@@ -0,0 +1,75 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main import search
+from main.keywords import DEFAULT_TECH_TERMS
+from main.models import ResumeGeneration
+
+WORDS = (
+    'designed built led shipped migrated scaled automated improved maintained mentored reduced latency '
+    'pipeline service platform dashboard api customers revenue team release testing monitoring cloud '
+    'analytics reporting data model deployment infrastructure security mobile frontend backend'
+).split()
+NAMES = 'ann bob carla dev emma farid grace hiro ines jamal kofi lena mateo nina omar priya'.split()
+POSITIONS = ['Backend Engineer', 'Data Analyst', 'Frontend Developer', 'DevOps Engineer', 'Product Manager']
+# Rare words, so some queries are as selective as real names and skills
+# are; every word in WORDS and most tech terms match a large share of rows
+TAIL = [f'w{index}x' for index in range(20000)]
+QUERIES = ['python django', 'kubernetes', 'data analyst', 'pri', 'migrated latency aws', 'w123x', 'w7x w9x', 'nosuchterm']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full-text resume search over synthetic rows (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resumes', type=int, default=100000)
+        parser.add_argument('--words', type=int, default=300, help='Words per synthetic resume')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _text(self, rng, words):
+        tokens = [rng.choice(WORDS) for _ in range(words)] + rng.sample(DEFAULT_TECH_TERMS, 4)
+        tokens += [TAIL[min(int(rng.paretovariate(1.0)) - 1, len(TAIL) - 1)] for _ in range(words // 10)]
+        rng.shuffle(tokens)
+        return ' '.join(tokens)
+
+    def handle(self, *args, **options):
+        if not search.enabled():
+            raise CommandError('This database has no search index; run migrate on SQLite or PostgreSQL')
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            user = User.objects.create_user('bench-search')
+            started = time.perf_counter()
+            rows = (
+                ResumeGeneration(
+                    user=user if index % 100 == 0 else None,
+                    full_name=f'{rng.choice(NAMES).title()} {rng.choice(NAMES).title()}',
+                    email=f'{rng.choice(NAMES)}{index}@example.com',
+                    target_position=rng.choice(POSITIONS),
+                    form_data={},
+                    job_description=self._text(rng, options['words'] // 2),
+                    generated_resume=self._text(rng, options['words']),
+                )
+                for index in range(options['resumes'])
+            )
+            ResumeGeneration.objects.bulk_create(rows, batch_size=2000)
+            self.stdout.write(f"Inserted and indexed {options['resumes']} resumes "
+                              f'in {time.perf_counter() - started:.1f} s')
+
+            for query in QUERIES:
+                for scope in ({}, {'user': user}):
+                    timings = []
+                    for _ in range(options['repeat']):
+                        started = time.perf_counter()
+                        hits = search.search(query, limit=20, **scope)
+                        timings.append(time.perf_counter() - started)
+                    self.stdout.write(
+                        f"{query!r:<22} {'one user' if scope else 'all':<8} {len(hits):>3} hits  "
+                        f'best {min(timings) * 1000:.1f} ms, mean {sum(timings) / len(timings) * 1000:.1f} ms'
+                    )
+            transaction.set_rollback(True)
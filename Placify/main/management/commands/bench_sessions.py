@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from main.loadtest import percentile
+
+# SQLite's defaults, to compare the tuned profile in settings.DATABASES with
+SQLITE_BASELINE = 'PRAGMA journal_mode=DELETE;PRAGMA synchronous=FULL;'
+
+
+class Command(BaseCommand):
+    help = ('Benchmark concurrent session writes (a request that loads, changes and saves its '
+            'session) against the configured database profile, in a throwaway test database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200, help='Session writes per thread')
+        parser.add_argument('--sqlite-baseline', action='store_true',
+                            help="Use SQLite's default rollback journal and synchronous=FULL instead of the profile")
+
+    def _profile(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('PRAGMA journal_mode')
+                journal = cursor.fetchone()[0]
+                cursor.execute('PRAGMA synchronous')
+                return f'sqlite journal_mode={journal} synchronous={cursor.fetchone()[0]}'
+        pool = connection.settings_dict['OPTIONS'].get('pool')
+        return (f"{connection.vendor} CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']} "
+                f"pool={pool or 'off'}")
+
+    def _client(self, requests, latencies, errors):
+        """One simulated visitor: create a session, then keep updating it"""
+        try:
+            store = SessionStore()
+            store['resume_history'] = []
+            store.save()
+            key = store.session_key
+            for index in range(requests):
+                started = time.perf_counter()
+                try:
+                    store = SessionStore(key)
+                    store['resume_history'] = (store.get('resume_history', []) + [index])[-10:]
+                    store['resume_job_id'] = index
+                    store.save()
+                except OperationalError:
+                    errors.append(1)
+                else:
+                    latencies.append(time.perf_counter() - started)
+            return key
+        finally:
+            connections.close_all()
+
+    def handle(self, *args, **options):
+        options_dict = settings.DATABASES['default']['OPTIONS']
+        original = dict(options_dict)
+        if options['sqlite_baseline']:
+            if connection.vendor != 'sqlite':
+                self.stderr.write('--sqlite-baseline only applies to the SQLite profile')
+                return
+            options_dict['init_command'] = SQLITE_BASELINE
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            profile = self._profile()
+            connection.close()
+            latencies, errors = [], []
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+                keys = list(pool.map(
+                    lambda _: self._client(options['requests'], latencies, errors), range(options['threads'])
+                ))
+            elapsed = time.perf_counter() - started
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+            options_dict.clear()
+            options_dict.update(original)
+
+        writes = len(latencies)
+        self.stdout.write(f'{profile}: {options["threads"]} threads x {options["requests"]} session writes '
+                          f'({len(set(keys))} sessions)')
+        self.stdout.write(
+            f'{writes / elapsed:.0f} writes/s in {elapsed:.2f} s, {len(errors)} failed with "database is locked"; '
+            f'latency p50 {percentile(latencies, 50) * 1000:.1f} ms, p95 {percentile(latencies, 95) * 1000:.1f} ms, '
+            f'p99 {percentile(latencies, 99) * 1000:.1f} ms'
+        )
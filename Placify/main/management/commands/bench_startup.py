@@ -0,0 +1,61 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter: boot Django as a WSGI worker does, load the
+# URLconf (every view module) and, for a generation process, build an agent
+# the way the first job does. Prints seconds and peak RSS as JSON.
+CHILD = '''
+import json, resource, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+if sys.argv[1] == 'generation':
+    from main import agent_pool
+    with agent_pool.checkout():
+        pass
+seconds = time.perf_counter() - started
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'seconds': seconds,
+    'rss_mb': rss / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+    'llm_modules': sorted({name.split('.')[0] for name in sys.modules if name.startswith(('crewai', 'langchain'))}),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = ('Measure boot time and peak memory of a web-only process and of a process that runs '
+            'generation jobs, each in a fresh interpreter')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def _run(self, profile):
+        result = subprocess.run(
+            [sys.executable, '-c', CHILD, profile],
+            cwd=settings.BASE_DIR, env=os.environ, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        for profile in ('web', 'generation'):
+            try:
+                runs = [self._run(profile) for _ in range(options['repeat'])]
+            except RuntimeError as error:
+                self.stdout.write(f'{profile:<11} failed: {error}')
+                continue
+            seconds = statistics.median(run['seconds'] for run in runs)
+            rss = statistics.median(run['rss_mb'] for run in runs)
+            modules = ', '.join(runs[0]['llm_modules']) or 'none'
+            self.stdout.write(f'{profile:<11} boot {seconds * 1000:7.0f} ms  peak RSS {rss:6.1f} MB  '
+                              f'LLM libraries loaded: {modules}')
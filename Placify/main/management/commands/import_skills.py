@@ -0,0 +1,50 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main.models import Skill
+
+
+class Command(BaseCommand):
+    help = ('Load skills into the taxonomy from a JSON file '
+            '([{"name": ..., "aliases": [...], "category": ...}]) or a text file with one skill per line')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--replace', action='store_true',
+                            help='Delete skills that are not in the file')
+
+    def _read(self, path):
+        with open(path, encoding='utf-8') as handle:
+            content = handle.read()
+        if path.endswith('.json'):
+            try:
+                return [
+                    {'name': item['name'], 'aliases': item.get('aliases', []), 'category': item.get('category', '')}
+                    for item in json.loads(content)
+                ]
+            except (ValueError, KeyError, TypeError) as e:
+                raise CommandError(f'Invalid skills file: {e}')
+        return [
+            {'name': line.strip(), 'aliases': [], 'category': ''}
+            for line in content.splitlines() if line.strip() and not line.startswith('#')
+        ]
+
+    def handle(self, *args, **options):
+        entries = self._read(options['path'])
+        created = updated = 0
+        with transaction.atomic():
+            for entry in entries:
+                _, was_created = Skill.objects.update_or_create(
+                    name=entry['name'],
+                    defaults={'aliases': entry['aliases'], 'category': entry['category']},
+                )
+                if was_created:
+                    created += 1
+                else:
+                    updated += 1
+            removed = 0
+            if options['replace']:
+                removed, _ = Skill.objects.exclude(name__in=[e['name'] for e in entries]).delete()
+        self.stdout.write(f'{created} created, {updated} updated, {removed} removed')
@@ -0,0 +1,53 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from main import agent_pool, jobs
+from main.loadtest import LoadTest, format_report
+
+
+class Command(BaseCommand):
+    help = ('Load-test resume_builder, analyze_job_description, resume_result and download_resume '
+            'end to end against the mock LLM, in a throwaway test database')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=20)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--workers', type=int, default=None, help='Generation worker threads')
+        parser.add_argument('--latency', type=float, default=None, help='Mock LLM seconds to first token')
+        parser.add_argument('--tokens-per-second', type=float, default=None)
+        parser.add_argument('--failure-rate', type=float, default=None)
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        mock = dict(getattr(settings, 'RESUME_MOCK_LLM', {}))
+        for option, key in (('latency', 'latency'), ('tokens_per_second', 'tokens_per_second'),
+                            ('failure_rate', 'failure_rate')):
+            if options[option] is not None:
+                mock[key] = options[option]
+        overrides = {
+            'RESUME_LLM_BACKEND': 'mock',
+            'RESUME_MOCK_LLM': mock,
+            'RESUME_WORKERS_IN_PROCESS': True,
+            'RESUME_WORKER_POLL_INTERVAL': 0.05,
+        }
+        if options['workers']:
+            overrides['RESUME_WORKER_CONCURRENCY'] = overrides['RESUME_AGENT_POOL_SIZE'] = options['workers']
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            with override_settings(**overrides):
+                agent_pool.reset()
+                report = LoadTest(sessions=options['sessions'], concurrency=options['concurrency']).run()
+        finally:
+            jobs.stop_pool()
+            agent_pool.reset()
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        self.stdout.write(json.dumps(report, indent=2) if options['json'] else format_report(report))
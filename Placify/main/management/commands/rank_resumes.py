@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import matching
+from main.models import ResumeGeneration
+
+
+class Command(BaseCommand):
+    help = 'Rank all stored resumes against one or more job postings using cached resume vectors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_description_files', nargs='+', help='Text files, one posting each')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--skip-refresh', action='store_true',
+                            help='Do not vectorize resumes that have no cached vector yet')
+
+    def handle(self, *args, **options):
+        postings = []
+        for path in options['job_description_files']:
+            with open(path, encoding='utf-8') as handle:
+                postings.append(handle.read())
+
+        if not options['skip_refresh']:
+            started = time.perf_counter()
+            added = matching.ensure_vectors()
+            if added:
+                self.stdout.write(f'Vectorized {added} resumes in {(time.perf_counter() - started) * 1000:.0f} ms')
+
+        started = time.perf_counter()
+        matrix = matching.get_matrix()
+        loaded = time.perf_counter() - started
+        started = time.perf_counter()
+        ranked = matching.rank(postings, top=options['top'], matrix=matrix)
+        elapsed = time.perf_counter() - started
+
+        ids = {pk for results in ranked for pk, _ in results}
+        names = dict(ResumeGeneration.objects.filter(pk__in=ids).values_list('pk', 'full_name'))
+        for path, results in zip(options['job_description_files'], ranked):
+            self.stdout.write(self.style.MIGRATE_HEADING(path))
+            for pk, similarity in results:
+                self.stdout.write(f'{similarity:6.3f}  #{pk:<7} {names.get(pk, "")[:40]}')
+        self.stdout.write(
+            f'Ranked {len(matrix)} resumes against {len(postings)} postings in {elapsed * 1000:.0f} ms '
+            f'(matrix load {loaded * 1000:.0f} ms)'
+        )
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text index over resumes and job descriptions'
+
+    def handle(self, *args, **options):
+        if not search.enabled():
+            raise CommandError('This database has no search index; run migrate on SQLite or PostgreSQL')
+        started = time.perf_counter()
+        with transaction.atomic():
+            search.rebuild()
+        self.stdout.write(f'Rebuilt the search index in {time.perf_counter() - started:.2f} s')
@@ -0,0 +1,41 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from main import agent_pool, jobs
+
+
+class Command(BaseCommand):
+    help = 'Run resume generation workers in the foreground until interrupted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Number of worker threads (default: RESUME_WORKER_CONCURRENCY)')
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='Seconds between queue polls when idle')
+
+    def handle(self, *args, **options):
+        pool = jobs.WorkerPool(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+        )
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        # Load the pipeline and build an agent before taking jobs, so the first
+        # job does not pay for the imports and a broken install fails here
+        with agent_pool.checkout():
+            pass
+        pool.start()
+        self.stdout.write(f'Started {pool.concurrency} resume workers')
+        while not stop.wait(60):
+            stats = jobs.queue_stats()
+            self.stdout.write(
+                f"queue depth={stats['depth']} running={stats['running']} "
+                f"avg_wait={stats['avg_wait_seconds']:.1f}s avg_run={stats['avg_run_seconds']:.1f}s"
+            )
+
+        self.stdout.write('Stopping workers...')
+        pool.stop()
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import scoring
+from main.models import ResumeGeneration
+
+
+class Command(BaseCommand):
+    help = 'Score stored resumes against a job description and list the best matches (no LLM calls)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_description_file', help='Text file containing the posting')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with open(options['job_description_file'], encoding='utf-8') as handle:
+            requirements = scoring.JobRequirements(handle.read())
+
+        started = time.perf_counter()
+        ranked = []
+        rows = (
+            ResumeGeneration.objects
+            .filter(status=ResumeGeneration.STATUS_DONE)
+            .values_list('pk', 'full_name', 'generated_resume')
+            .iterator(chunk_size=options['batch_size'])
+        )
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == options['batch_size']:
+                ranked += self.score(requirements, batch)
+                batch = []
+        ranked += self.score(requirements, batch)
+        elapsed = time.perf_counter() - started
+
+        ranked.sort(key=lambda item: item[0].ats_score, reverse=True)
+        for result, pk, full_name in ranked[:options['top']]:
+            self.stdout.write(
+                f'{result.ats_score:>4}  #{pk:<7} {full_name[:30]:<30} '
+                f'coverage={result.coverage:.0%} density={result.keyword_density:.1f} '
+                f'readability={result.readability:.0f}'
+            )
+        self.stdout.write(f'Scored {len(ranked)} resumes in {elapsed * 1000:.0f} ms')
+
+    def score(self, requirements, rows):
+        scores = requirements.score_many([resume for _, _, resume in rows])
+        return [(result, pk, full_name) for result, (pk, full_name, _) in zip(scores, rows)]
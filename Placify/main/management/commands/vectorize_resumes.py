@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import matching
+
+
+class Command(BaseCommand):
+    help = ('Compute the cached match vectors of finished resumes that have none, e.g. after upgrading '
+            'or changing the feature version; run from cron or after deploys')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        added = matching.ensure_vectors(batch_size=options['batch_size'])
+        self.stdout.write(f'Vectorized {added} resumes in {(time.perf_counter() - started) * 1000:.0f} ms')
@@ -0,0 +1,42 @@
+import io
+import shutil
+import urllib.request
+import zipfile
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+FONT_AWESOME_ZIP = 'https://use.fontawesome.com/releases/v6.0.0/fontawesome-free-6.0.0-web.zip'
+KEEP = ('css/all.min.css', 'webfonts/', 'LICENSE.txt')
+
+
+class Command(BaseCommand):
+    help = ('Download Font Awesome into main/static so that it is hashed, compressed and served with the '
+            'other static files instead of from a CDN; commit the result')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=FONT_AWESOME_ZIP, help='Font Awesome Free "web" release archive')
+
+    def handle(self, *args, **options):
+        target = Path(apps.get_app_config('main').path) / 'static' / 'main' / 'vendor' / 'fontawesome'
+        try:
+            with urllib.request.urlopen(options['url'], timeout=60) as response:
+                archive = zipfile.ZipFile(io.BytesIO(response.read()))
+        except (OSError, zipfile.BadZipFile) as error:
+            raise CommandError(f'Could not download {options["url"]}: {error}')
+
+        shutil.rmtree(target, ignore_errors=True)
+        files = 0
+        for member in archive.infolist():
+            # Members live under a top-level directory named after the release
+            name = member.filename.partition('/')[2]
+            if member.is_dir() or not name.startswith(KEEP):
+                continue
+            path = target / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(archive.read(member))
+            files += 1
+        if not (target / 'css' / 'all.min.css').exists():
+            raise CommandError(f'{options["url"]} has no css/all.min.css')
+        self.stdout.write(f'Wrote {files} files to {target}; run collectstatic to publish them')
@@ -0,0 +1,226 @@
+"""Bulk matching of stored resumes against job postings.
+
+Each finished resume is turned into a sparse vector once and cached in
+``ResumeVector``: hashed word features plus its canonical skill ids from the
+taxonomy (weighted higher), log-scaled and L2-normalized. Ranking then needs no
+LLM calls. ``ResumeMatrix`` stacks the cached vectors into a SciPy CSR matrix,
+and one sparse product gives the N x M cosine similarity matrix for M postings.
+
+The stacked matrix is kept in memory and saved to ``RESUME_MATRIX_CACHE`` on
+disk, keyed by the vector table's row count and latest update. Separate
+processes such as the ``rank_resumes`` command then skip reading every vector
+from the database.
+
+Vectorizing needs only the standard library. NumPy and SciPy are imported
+only by the ranking functions.
+"""
+import math
+import re
+import threading
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from . import taxonomy
+from .keywords import TECH
+from .models import ResumeGeneration, ResumeVector
+
+FEATURE_VERSION = 1
+N_FEATURES = 2 ** 20
+SKILL_WEIGHT = 3.0
+
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it of on or our that the to '
+    'we will with you your this their they who'.split()
+)
+_token = re.compile(r'\w[\w+#]*')
+
+
+def _feature(name):
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(name.encode('utf-8')) % N_FEATURES
+
+
+def vectorize(text, extractor=None):
+    """Sparse feature vector of ``text`` as ``(indices, values)`` arrays"""
+    extractor = extractor or taxonomy.get_extractor()
+    counts = Counter()
+    for token in _token.findall(text.lower()):
+        if token not in STOPWORDS and not token.isdigit():
+            counts[_feature('w:' + token)] += 1.0
+    for match in extractor.extract(text).matches:
+        if match.kind == TECH and match.skill_id is not None:
+            counts[_feature(f's:{match.skill_id}')] += SKILL_WEIGHT
+
+    weights = {index: 1.0 + math.log(count) for index, count in counts.items()}
+    norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+    indices = array('i', sorted(weights))
+    values = array('f', (weights[index] / norm for index in indices))
+    return indices, values
+
+
+def store_vector(generation, extractor=None):
+    """Compute and cache the vector for a finished ``ResumeGeneration``"""
+    indices, values = vectorize(generation.generated_resume, extractor)
+    vector, _ = ResumeVector.objects.update_or_create(
+        resume_generation=generation,
+        defaults={'version': FEATURE_VERSION, 'indices': indices.tobytes(), 'values': values.tobytes()},
+    )
+    return vector
+
+
+def _unvectorized():
+    return ResumeGeneration.objects.filter(status=ResumeGeneration.STATUS_DONE).exclude(vector__version=FEATURE_VERSION)
+
+
+def missing_vectors():
+    """Number of finished resumes that ``ensure_vectors`` would vectorize"""
+    return _unvectorized().count()
+
+
+def ensure_vectors(batch_size=500):
+    """Vectorize finished resumes that have no current vector; returns the count
+
+    Jobs store their vector when they finish, so this is a backfill for older
+    rows or a new ``FEATURE_VERSION`` (``manage.py vectorize_resumes``).
+    """
+    extractor = taxonomy.get_extractor()
+    done = 0
+    for generation in _unvectorized().only('pk', 'generated_resume').iterator(chunk_size=batch_size):
+        store_vector(generation, extractor)
+        done += 1
+    return done
+
+
+def _signature():
+    stats = ResumeVector.objects.filter(version=FEATURE_VERSION).aggregate(count=Count('id'), latest=Max('updated_at'))
+    return f"{FEATURE_VERSION}:{stats['count']}:{stats['latest'].isoformat() if stats['latest'] else '-'}"
+
+
+class ResumeMatrix:
+    """All cached resume vectors stacked into one CSR matrix"""
+
+    def __init__(self, ids, matrix, signature=''):
+        self.ids = ids
+        self.matrix = matrix
+        self.signature = signature
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_database(cls, signature=''):
+        import numpy as np
+        from scipy import sparse
+
+        ids, lengths, indices, values = [], [], [], []
+        rows = (
+            ResumeVector.objects
+            .filter(version=FEATURE_VERSION)
+            .order_by('resume_generation_id')
+            .values_list('resume_generation_id', 'indices', 'values')
+        )
+        for generation_id, packed_indices, packed_values in rows.iterator(chunk_size=2000):
+            row_indices = np.frombuffer(bytes(packed_indices), dtype=np.int32)
+            ids.append(generation_id)
+            lengths.append(len(row_indices))
+            indices.append(row_indices)
+            values.append(np.frombuffer(bytes(packed_values), dtype=np.float32))
+
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        matrix = sparse.csr_matrix(
+            (
+                np.concatenate(values) if values else np.zeros(0, dtype=np.float32),
+                np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+                indptr,
+            ),
+            shape=(len(ids), N_FEATURES),
+        )
+        return cls(np.array(ids, dtype=np.int64), matrix, signature)
+
+    @classmethod
+    def from_file(cls, path, signature):
+        import numpy as np
+        from scipy import sparse
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data['signature']) != signature:
+                    return None
+                matrix = sparse.csr_matrix(
+                    (data['data'], data['indices'], data['indptr']), shape=(len(data['ids']), N_FEATURES)
+                )
+                return cls(data['ids'], matrix, signature)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, path):
+        import numpy as np
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp.npz')
+        np.savez(tmp, ids=self.ids, data=self.matrix.data, indices=self.matrix.indices,
+                 indptr=self.matrix.indptr, signature=np.array(self.signature))
+        tmp.replace(path)
+
+    def similarity(self, postings):
+        """Dense N x M cosine similarities against M posting vectors"""
+        import numpy as np
+        from scipy import sparse
+
+        data, indices, indptr = [], [], [0]
+        for posting_indices, posting_values in postings:
+            indices.append(np.frombuffer(posting_indices.tobytes(), dtype=np.int32))
+            data.append(np.frombuffer(posting_values.tobytes(), dtype=np.float32))
+            indptr.append(indptr[-1] + len(posting_indices))
+        jobs = sparse.csr_matrix(
+            (np.concatenate(data), np.concatenate(indices), np.array(indptr)),
+            shape=(len(postings), N_FEATURES),
+        )
+        return (self.matrix @ jobs.T).toarray()
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def get_matrix():
+    """The resume matrix, rebuilt only when the cached vectors have changed"""
+    global _matrix
+    signature = _signature()
+    with _matrix_lock:
+        if _matrix is not None and _matrix.signature == signature:
+            return _matrix
+        path = getattr(settings, 'RESUME_MATRIX_CACHE', None)
+        path = Path(path) if path else None
+        matrix = ResumeMatrix.from_file(path, signature) if path and path.exists() else None
+        if matrix is None:
+            matrix = ResumeMatrix.from_database(signature)
+            if path:
+                matrix.save(path)
+        _matrix = matrix
+        return _matrix
+
+
+def rank(job_descriptions, top=20, matrix=None, extractor=None):
+    """Best matching resumes per posting as ``[[(generation_id, score), ...], ...]``"""
+    import numpy as np
+
+    matrix = matrix or get_matrix()
+    if not len(matrix) or not job_descriptions:
+        return [[] for _ in job_descriptions]
+    extractor = extractor or taxonomy.get_extractor()
+    scores = matrix.similarity([vectorize(text, extractor) for text in job_descriptions])
+
+    ranked = []
+    k = min(top, len(matrix))
+    for column in scores.T:
+        best = np.argpartition(-column, k - 1)[:k]
+        best = best[np.argsort(-column[best])]
+        ranked.append([(int(matrix.ids[i]), float(column[i])) for i in best if column[i] > 0])
+    return ranked
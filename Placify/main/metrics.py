@@ -0,0 +1,171 @@
+"""In-process metrics, rendered in the Prometheus text format.
+
+Counters and histograms live in the process that records them, the same way
+``prometheus_client`` does by default. When generation workers run in their
+own process (``run_resume_workers``), its job and LLM metrics are not visible
+to the web process. Queue gauges are read from the database at scrape time,
+so they are correct in every process.
+"""
+import math
+import threading
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for key, value in sorted(self.samples().items()):
+            lines.append(f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=DURATION_BUCKETS, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        # label values -> [count per bucket..., count above the last bucket, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self):
+        with self._lock:
+            return {key: list(counts) for key, counts in self._values.items()}
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for key, counts in sorted(self.samples().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = '+Inf' if bound == math.inf else _format_value(bound)
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, [("le", le)])} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {_format_value(round(counts[-1], 6))}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {cumulative}')
+        return lines
+
+    def quantile(self, counts, q):
+        """Estimate a quantile from bucket counts, like PromQL's histogram_quantile"""
+        total = sum(counts[:-1])
+        if not total:
+            return 0.0
+        target = q * total
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, counts):
+            if cumulative + count >= target:
+                return lower + (bound - lower) * (target - cumulative) / count if count else bound
+            cumulative += count
+            lower = bound
+        return self.buckets[-1]
+
+    def summary(self):
+        """Count, mean and estimated p50/p95/p99 per label set, for display"""
+        rows = []
+        for key, counts in sorted(self.samples().items()):
+            count = sum(counts[:-1])
+            rows.append({
+                'labels': dict(zip(self.labels, key)),
+                'count': count,
+                'mean': counts[-1] / count if count else 0.0,
+                'p50': self.quantile(counts, 0.50),
+                'p95': self.quantile(counts, 0.95),
+                'p99': self.quantile(counts, 0.99),
+            })
+        return rows
+
+
+REQUEST_SECONDS = Histogram(
+    'placify_request_duration_seconds', 'Wall time of HTTP requests by view.', labels=('view',))
+REQUEST_QUERIES = Histogram(
+    'placify_request_db_queries', 'Database queries per HTTP request by view.',
+    buckets=COUNT_BUCKETS, labels=('view',))
+SPAN_SECONDS = Histogram(
+    'placify_span_duration_seconds', 'Wall time of traced request and pipeline spans.', labels=('span',))
+JOB_SECONDS = Histogram(
+    'placify_job_duration_seconds', 'Wall time of resume generation job attempts by outcome.', labels=('status',))
+LLM_TOKENS = Counter('placify_llm_tokens_total', 'LLM tokens by direction (in/out).', labels=('direction',))
+LLM_COST = Counter('placify_llm_cost_usd_total', 'Estimated LLM spend in US dollars.')
+PROMPT_TOKENS_SAVED = Counter(
+    'placify_prompt_tokens_saved_total', 'Estimated prompt tokens saved by compaction, by reason.', labels=('reason',))
+REQUESTS_REJECTED = Counter(
+    'placify_requests_rejected_total', 'Requests answered 429 by rate limits or admission control.',
+    labels=('endpoint', 'reason'))
+CACHE_LOOKUPS = Counter(
+    'placify_resume_cache_lookups_total', 'Resume and analysis cache lookups by outcome.', labels=('kind', 'outcome'))
+
+
+def _queue_gauges():
+    from . import jobs
+
+    stats = jobs.queue_stats()
+    gauges = [
+        ('placify_queue_depth', 'Pending resume generation jobs.', stats['depth']),
+        ('placify_jobs_running', 'Resume generation jobs being run.', stats['running']),
+        ('placify_queue_oldest_pending_seconds', 'Age of the oldest pending job.', stats['oldest_pending_seconds']),
+    ]
+    lines = []
+    for name, documentation, value in gauges:
+        lines += [f'# HELP {name} {documentation}', f'# TYPE {name} gauge', f'{name} {_format_value(value)}']
+    return lines
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    lines += _queue_gauges()
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,182 @@
+"""Request instrumentation (see main/tracing.py and main/metrics.py) and
+event-loop versions of Django's middleware for the ASGI profile.
+
+Under ASGI, Django runs every hook of a ``MiddlewareMixin`` middleware in the
+thread that serves sync code, one hand-off per hook per request. The built-in
+middleware below only touch headers, cookies and in-memory state, so their
+subclasses here run the hooks inline on the event loop and behave exactly like
+the originals under WSGI. Sessions and messages still go to a thread when they
+have to write to the session store.
+"""
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.contrib.auth.middleware import AuthenticationMiddleware as BaseAuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware as BaseMessageMiddleware
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.sessions.middleware import SessionMiddleware as BaseSessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware as BaseXFrameOptionsMiddleware
+from django.middleware.common import CommonMiddleware as BaseCommonMiddleware
+from django.middleware.csrf import CsrfViewMiddleware as BaseCsrfViewMiddleware
+from django.middleware.security import SecurityMiddleware as BaseSecurityMiddleware
+
+from . import metrics, tracing
+from .models import ResumeGeneration
+
+
+class _Middleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+
+class RequestMetricsMiddleware(_Middleware):
+    """Time every request, count its queries and trace a sample of them
+
+    Install first in ``MIDDLEWARE``. Together with ``ViewTimingMiddleware``
+    at the end of the list, a sampled trace splits a request into the view
+    and the middleware around it, which is mostly session and message writes.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with tracing.trace('request') as trace:
+            response = self.get_response(request)
+        self._finish(request, trace)
+        self._attach(trace)
+        return response
+
+    async def __acall__(self, request):
+        # Async views do their database work in executor threads, out of
+        # reach of this context's query counter.
+        with tracing.trace('request', count_queries=False) as trace:
+            response = await self.get_response(request)
+        self._finish(request, trace, count_queries=False)
+        if trace.sampled and trace.attributes.get('generation_id'):
+            await sync_to_async(self._attach)(trace)
+        return response
+
+    @staticmethod
+    def _finish(request, trace, count_queries=True):
+        view = request.resolver_match.url_name if request.resolver_match else 'unmatched'
+        metrics.REQUEST_SECONDS.observe(trace.duration, view=view)
+        if count_queries:
+            metrics.REQUEST_QUERIES.observe(trace.queries, view=view)
+        view_seconds = trace.attributes.get('view_seconds')
+        if trace.sampled and view_seconds is not None:
+            trace.add_span('middleware', trace.duration - view_seconds, 0)
+
+    @staticmethod
+    def _attach(trace):
+        generation_id = trace.attributes.get('generation_id')
+        if trace.sampled and generation_id:
+            ResumeGeneration.objects.filter(pk=generation_id).update(request_trace=trace.as_dict())
+
+
+class ViewTimingMiddleware(_Middleware):
+    """Record the view's own time on sampled request traces (install last)"""
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with tracing.span('view'):
+            response = self.get_response(request)
+        self._finish(started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with tracing.span('view'):
+            response = await self.get_response(request)
+        self._finish(started)
+        return response
+
+    @staticmethod
+    def _finish(started):
+        trace = tracing.current()
+        if trace is not None:
+            trace.attributes['view_seconds'] = time.perf_counter() - started
+
+
+class _Inline:
+    """Run a ``MiddlewareMixin`` middleware's hooks on the event loop
+
+    Only for middleware whose hooks do no I/O; under WSGI nothing changes.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.async_mode and hasattr(self, 'process_view'):
+            # The handler wraps sync process_view hooks in sync_to_async
+            process_view = self.process_view
+
+            async def aprocess_view(request, view_func, view_args, view_kwargs):
+                return process_view(request, view_func, view_args, view_kwargs)
+
+            self.process_view = aprocess_view
+
+    def _in_thread(self, request):
+        """Whether ``process_response`` has I/O to do for this request"""
+        return False
+
+    async def __acall__(self, request):
+        response = None
+        if hasattr(self, 'process_request'):
+            response = self.process_request(request)
+        response = response or await self.get_response(request)
+        if hasattr(self, 'process_response'):
+            if self._in_thread(request):
+                response = await sync_to_async(self.process_response)(request, response)
+            else:
+                response = self.process_response(request, response)
+        return response
+
+
+class SecurityMiddleware(_Inline, BaseSecurityMiddleware):
+    pass
+
+
+class CommonMiddleware(_Inline, BaseCommonMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(_Inline, BaseCsrfViewMiddleware):
+    """Inline only while the token lives in a cookie"""
+
+    def __init__(self, get_response):
+        if settings.CSRF_USE_SESSIONS:
+            raise ImproperlyConfigured('main.middleware.CsrfViewMiddleware reads the token from the cookie; '
+                                       'use django.middleware.csrf.CsrfViewMiddleware with CSRF_USE_SESSIONS')
+        super().__init__(get_response)
+
+
+class AuthenticationMiddleware(_Inline, BaseAuthenticationMiddleware):
+    pass
+
+
+class SessionMiddleware(_Inline, BaseSessionMiddleware):
+    """Loads sessions lazily as before; only saving one leaves the event loop"""
+
+    def _in_thread(self, request):
+        session = getattr(request, 'session', None)
+        return session is not None and (session.modified or settings.SESSION_SAVE_EVERY_REQUEST)
+
+
+class MessageMiddleware(_Inline, BaseMessageMiddleware):
+    """Inline with cookie storage; session-backed storage saves in a thread"""
+
+    def _in_thread(self, request):
+        return not isinstance(getattr(request, '_messages', None), (CookieStorage, type(None)))
+
+
+class XFrameOptionsMiddleware(_Inline, BaseXFrameOptionsMiddleware):
+    pass
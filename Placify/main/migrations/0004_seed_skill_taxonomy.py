@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# The technologies ATSAnalyzerTool used to match with a hardcoded regex, plus
+# common aliases and a few frequently requested skills.
+SKILLS = [
+    ('Python', 'language', []),
+    ('Java', 'language', []),
+    ('JavaScript', 'language', ['JS', 'ECMAScript']),
+    ('TypeScript', 'language', ['TS']),
+    ('React', 'framework', ['ReactJS', 'React.js']),
+    ('Django', 'framework', []),
+    ('Flask', 'framework', []),
+    ('Node.js', 'framework', ['NodeJS']),
+    ('AWS', 'cloud', ['Amazon Web Services']),
+    ('Azure', 'cloud', ['Microsoft Azure']),
+    ('Docker', 'devops', []),
+    ('Kubernetes', 'devops', ['k8s']),
+    ('CI/CD', 'devops', ['Continuous Integration']),
+    ('SQL', 'database', []),
+    ('NoSQL', 'database', []),
+    ('PostgreSQL', 'database', ['Postgres']),
+    ('MongoDB', 'database', ['Mongo']),
+    ('Git', 'tool', []),
+    ('Agile', 'methodology', []),
+    ('Scrum', 'methodology', []),
+    ('Machine Learning', 'data', ['ML']),
+]
+
+
+def seed_skills(apps, schema_editor):
+    Skill = apps.get_model('main', 'Skill')
+    for name, category, aliases in SKILLS:
+        Skill.objects.get_or_create(name=name, defaults={'category': category, 'aliases': aliases})
+
+
+def remove_skills(apps, schema_editor):
+    Skill = apps.get_model('main', 'Skill')
+    Skill.objects.filter(name__in=[name for name, _, _ in SKILLS]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_skill_taxonomy'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_skills, remove_skills),
+    ]
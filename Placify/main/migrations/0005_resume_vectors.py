@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_seed_skill_taxonomy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeVector',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveSmallIntegerField()),
+                ('indices', models.BinaryField()),
+                ('values', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('resume_generation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='vector', to='main.resumegeneration')),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_resume_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumegeneration',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revisions', to='main.resumegeneration'),
+        ),
+        migrations.CreateModel(
+            name='PipelineStage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20)),
+                ('input_digest', models.CharField(max_length=64)),
+                ('output', models.TextField()),
+                ('sections', models.JSONField(blank=True, default=list)),
+                ('llm_calls', models.PositiveSmallIntegerField(default=0)),
+                ('reused', models.BooleanField(default=False)),
+                ('duration', models.FloatField(default=0.0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resume_generation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stages', to='main.resumegeneration')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('resume_generation', 'name'), name='pipelinestage_unique_name')],
+            },
+        ),
+    ]
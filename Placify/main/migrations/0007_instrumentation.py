@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_pipeline_stages'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumegeneration',
+            name='job_trace',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='resumegeneration',
+            name='llm_cost_usd',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='resumegeneration',
+            name='llm_tokens_in',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resumegeneration',
+            name='llm_tokens_out',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resumegeneration',
+            name='request_trace',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
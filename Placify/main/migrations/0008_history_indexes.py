@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_instrumentation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resumegeneration',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='resumegen_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumegeneration',
+            index=models.Index(fields=['-created_at'], name='resumegen_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumegeneration',
+            index=models.Index(fields=['target_industry', '-created_at'], name='resumegen_industry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumegeneration',
+            index=models.Index(fields=['estimated_ats_score', '-created_at'], name='resumegen_ats_score_idx'),
+        ),
+    ]
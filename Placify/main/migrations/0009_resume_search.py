@@ -0,0 +1,81 @@
+from django.db import migrations
+
+# The schema as of this migration, written out rather than imported from
+# main/search.py, so later changes there need a migration of their own
+COLUMNS = 'full_name, email, target_position, job_description, generated_resume'
+NEW = 'new.full_name, new.email, new.target_position, new.job_description, new.generated_resume'
+OLD = 'old.full_name, old.email, old.target_position, old.job_description, old.generated_resume'
+SQLITE_DELETE = (
+    f"INSERT INTO main_resumesearch(main_resumesearch, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD});"
+)
+SQLITE_INSERT = f'INSERT INTO main_resumesearch(rowid, {COLUMNS}) VALUES (new.id, {NEW});'
+
+SQLITE = [
+    f"CREATE VIRTUAL TABLE main_resumesearch USING fts5({COLUMNS}, content='main_resumegeneration', "
+    f"content_rowid='id', tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')",
+    f'CREATE TRIGGER main_resumesearch_insert AFTER INSERT ON main_resumegeneration BEGIN {SQLITE_INSERT} END',
+    f'CREATE TRIGGER main_resumesearch_delete AFTER DELETE ON main_resumegeneration BEGIN {SQLITE_DELETE} END',
+    f'CREATE TRIGGER main_resumesearch_update AFTER UPDATE OF {COLUMNS} ON main_resumegeneration '
+    f'BEGIN {SQLITE_DELETE} {SQLITE_INSERT} END',
+    "INSERT INTO main_resumesearch(main_resumesearch) VALUES ('rebuild')",
+    "INSERT INTO main_resumesearch(main_resumesearch) VALUES ('optimize')",
+]
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS main_resumesearch_insert',
+    'DROP TRIGGER IF EXISTS main_resumesearch_delete',
+    'DROP TRIGGER IF EXISTS main_resumesearch_update',
+    'DROP TABLE IF EXISTS main_resumesearch',
+]
+
+
+def pg_document(row):
+    return (
+        f"setweight(to_tsvector('english', coalesce({row}.full_name, '')), 'A') || "
+        f"setweight(to_tsvector('simple', coalesce({row}.email, '')), 'A') || "
+        f"setweight(to_tsvector('english', coalesce({row}.target_position, '')), 'A') || "
+        f"setweight(to_tsvector('english', coalesce({row}.generated_resume, '')), 'B') || "
+        f"setweight(to_tsvector('english', coalesce({row}.job_description, '')), 'C')"
+    )
+
+
+POSTGRESQL = [
+    'CREATE TABLE main_resumesearch (resume_id bigint PRIMARY KEY REFERENCES main_resumegeneration(id) '
+    'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, document tsvector NOT NULL)',
+    'CREATE INDEX main_resumesearch_document_idx ON main_resumesearch USING gin(document)',
+    f'CREATE FUNCTION main_resumesearch_sync() RETURNS trigger AS $$ BEGIN '
+    f'INSERT INTO main_resumesearch(resume_id, document) VALUES (NEW.id, {pg_document("NEW")}) '
+    f'ON CONFLICT (resume_id) DO UPDATE SET document = EXCLUDED.document; '
+    f'RETURN NULL; END $$ LANGUAGE plpgsql',
+    f'CREATE TRIGGER main_resumesearch_sync AFTER INSERT OR UPDATE OF {COLUMNS} ON main_resumegeneration '
+    f'FOR EACH ROW EXECUTE FUNCTION main_resumesearch_sync()',
+    f'INSERT INTO main_resumesearch(resume_id, document) SELECT r.id, {pg_document("r")} '
+    f'FROM main_resumegeneration r ON CONFLICT (resume_id) DO UPDATE SET document = EXCLUDED.document',
+]
+POSTGRESQL_REVERSE = [
+    'DROP TRIGGER IF EXISTS main_resumesearch_sync ON main_resumegeneration',
+    'DROP FUNCTION IF EXISTS main_resumesearch_sync()',
+    'DROP TABLE IF EXISTS main_resumesearch',
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        # Other backends have no index; searches fall back to icontains filters
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return apply
+
+
+class Migration(migrations.Migration):
+    """Full-text index over resumes, kept in sync by triggers (see main/search.py)"""
+
+    dependencies = [
+        ('main', '0008_history_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE, 'postgresql': POSTGRESQL}),
+            run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRESQL_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,102 @@
+"""Deterministic local stand-in for the OpenAI LLM.
+
+Selected with ``RESUME_LLM_BACKEND = 'mock'`` and configured by
+``RESUME_MOCK_LLM``. It lets the resume pipeline run offline (load tests,
+benchmarks, demos) with realistic timing:
+
+* ``latency``: seconds before the first token;
+* ``tokens_per_second``: streaming rate of the response, sent through the
+  LangChain callbacks like real streamed tokens;
+* ``response_tokens``: approximate response length in words;
+* ``failure_rate``: share of calls that raise ``MockLLMError``, to exercise
+  the job queue's retries;
+* ``seed``: makes failure injection reproducible.
+
+Responses depend only on the prompt: a resume-shaped text built from the
+technologies the prompt mentions, wrapped in the ``Final Answer:`` format that
+CrewAI agents parse.
+"""
+import hashlib
+import itertools
+import random
+import time
+from typing import Any, List, Optional
+
+from langchain.callbacks.manager import CallbackManagerForLLMRun
+from langchain.llms.base import LLM
+
+from .keywords import TECH, default_extractor
+
+FILLER = (
+    'delivered reliable features for customers by collaborating with product design and '
+    'operations teams while improving quality reducing costs and documenting decisions'
+).split()
+
+_calls = itertools.count(1)
+
+
+class MockLLMError(RuntimeError):
+    """Failure injected by ``MockLLM``"""
+
+
+def mock_response(prompt, words=250):
+    """The deterministic answer to ``prompt``, roughly ``words`` words long"""
+    rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+    terms = sorted({m.term for m in default_extractor().extract(prompt).matches if m.kind == TECH})
+    skills = ', '.join(terms) or 'Communication, Problem Solving'
+    lines = [
+        'PROFESSIONAL SUMMARY',
+        f'Experienced professional skilled in {skills}.',
+        '',
+        'EXPERIENCE',
+    ]
+    count = len(' '.join(lines).split())
+    while count < words - 10:
+        bullet = ' '.join(rng.choice(FILLER) for _ in range(12))
+        if terms:
+            bullet += f' using {rng.choice(terms)}'
+        lines.append(f'- {bullet.capitalize()}, improving results by {rng.randint(5, 60)}%.')
+        count += len(lines[-1].split())
+    lines += ['', 'SKILLS', skills]
+    return 'Thought: I now can give a great answer\nFinal Answer: ' + '\n'.join(lines)
+
+
+class MockLLM(LLM):
+    """LangChain LLM that answers locally with configurable latency and failures"""
+
+    latency: float = 0.05
+    tokens_per_second: float = 500.0
+    response_tokens: int = 250
+    failure_rate: float = 0.0
+    seed: int = 0
+    streaming: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return 'placify-mock'
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        call = next(_calls)
+        time.sleep(self.latency)
+        if self.failure_rate and random.Random(f'{self.seed}:{call}').random() < self.failure_rate:
+            raise MockLLMError(f'Injected failure on mock LLM call {call}')
+
+        text = mock_response(prompt, self.response_tokens)
+        for sequence in stop or []:
+            text = text.split(sequence, 1)[0]
+
+        tokens = text.split(' ')
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        if self.streaming and run_manager:
+            for i, token in enumerate(tokens):
+                run_manager.on_llm_new_token(token if i == 0 else ' ' + token)
+                time.sleep(delay)
+        else:
+            time.sleep(delay * len(tokens))
+        return text
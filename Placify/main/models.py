@@ -3,6 +3,7 @@ from django.db import models
 # Create your models here.
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 import json
 
 class Student(models.Model):
@@ -17,6 +18,19 @@ class Student(models.Model):
 
 class ResumeGeneration(models.Model):
     """Store resume generation history and data"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    # Columns list views defer; they hold the content and can run to many KB
+    LARGE_FIELDS = ('form_data', 'job_description', 'generated_resume', 'request_trace', 'job_trace')
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     full_name = models.CharField(max_length=200)
     email = models.EmailField()
@@ -26,17 +40,44 @@ class ResumeGeneration(models.Model):
     # Store form data as JSON
     form_data = models.JSONField()
     job_description = models.TextField()
-    generated_resume = models.TextField()
+    generated_resume = models.TextField(blank=True, default='')
+    # Earlier generation this submission edits; its stage outputs may be reused
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='revisions')
     
     # ATS optimization metrics
     estimated_ats_score = models.IntegerField(default=0)
     keywords_matched = models.IntegerField(default=0)
     
+    # Generation job state (see main/jobs.py)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while the job runs; see jobs.requeue_stale
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    # Instrumentation (see main/tracing.py); LLM usage adds up across attempts
+    llm_tokens_in = models.PositiveIntegerField(default=0)
+    llm_tokens_out = models.PositiveIntegerField(default=0)
+    llm_cost_usd = models.FloatField(default=0.0)
+    request_trace = models.JSONField(default=dict, blank=True)
+    job_trace = models.JSONField(default=dict, blank=True)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='resumegen_queue_idx'),
+            # History pages and the admin list, newest first, per user or filtered
+            models.Index(fields=['user', '-created_at', '-id'], name='resumegen_user_created_idx'),
+            models.Index(fields=['-created_at'], name='resumegen_created_idx'),
+            models.Index(fields=['target_industry', '-created_at'], name='resumegen_industry_idx'),
+            models.Index(fields=['estimated_ats_score', '-created_at'], name='resumegen_ats_score_idx'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} - {self.target_position}"
@@ -54,3 +95,62 @@ class ATSAnalysis(models.Model):
     
     def __str__(self):
         return f"ATS Analysis for {self.resume_generation.full_name}"
+
+
+class SkillQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # auto_now only applies to save(); the taxonomy notices edits made
+        # elsewhere by the latest updated_at (see main/taxonomy.py), so bulk
+        # updates such as admin actions and bulk_update() stamp it too
+        kwargs.setdefault('updated_at', timezone.now())
+        return super().update(**kwargs)
+
+
+class Skill(models.Model):
+    """Canonical skill in the taxonomy used for job description keyword extraction"""
+    name = models.CharField(max_length=100, unique=True)
+    category = models.CharField(max_length=50, blank=True)
+    # Alternative spellings matched as this skill, e.g. "JS" for JavaScript
+    aliases = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = SkillQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+class ResumeVector(models.Model):
+    """Cached sparse feature vector of a generated resume (see main/matching.py)"""
+    resume_generation = models.OneToOneField(ResumeGeneration, on_delete=models.CASCADE, related_name='vector')
+    version = models.PositiveSmallIntegerField()
+    # Packed int32 feature indices and float32 weights
+    indices = models.BinaryField()
+    values = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Vector for {self.resume_generation_id}"
+
+class PipelineStage(models.Model):
+    """Recorded input digest and output of one resume pipeline stage (see main/stages.py)"""
+    resume_generation = models.ForeignKey(ResumeGeneration, on_delete=models.CASCADE, related_name='stages')
+    name = models.CharField(max_length=20)
+    input_digest = models.CharField(max_length=64)
+    output = models.TextField()
+    # Sections revised in tweak mode; empty when the stage ran in full
+    sections = models.JSONField(default=list, blank=True)
+    llm_calls = models.PositiveSmallIntegerField(default=0)
+    reused = models.BooleanField(default=False)
+    duration = models.FloatField(default=0.0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['resume_generation', 'name'], name='pipelinestage_unique_name'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} stage of {self.resume_generation_id}"
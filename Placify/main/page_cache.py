@@ -0,0 +1,40 @@
+"""Whole-page caching for visitors who are not logged in.
+
+Pages such as the landing page render the same HTML for every anonymous
+visitor, so that HTML and its headers are kept in the ``PAGE_CACHE`` cache
+for ``PAGE_CACHE_SECONDS`` and sent again without running the view or its
+templates. Logged-in visitors, query strings and responses that set cookies
+always go through the view.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+def _cache():
+    return caches[getattr(settings, 'PAGE_CACHE', 'default')]
+
+
+def anonymous_page(view):
+    """Cache what the async ``view`` renders for anonymous GET requests"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        seconds = getattr(settings, 'PAGE_CACHE_SECONDS', 0)
+        if not seconds or request.method not in ('GET', 'HEAD') or request.GET:
+            return await view(request, *args, **kwargs)
+        request.user = await request.auser()
+        if request.user.is_authenticated:
+            return await view(request, *args, **kwargs)
+
+        key = f'page:{request.get_host()}{request.path}'
+        cached = await _cache().aget(key)
+        if cached is not None:
+            content, headers = cached
+            return HttpResponse(content, headers=headers)
+        response = await view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            await _cache().aset(key, (response.content, dict(response.items())), seconds)
+        return response
+    return wrapper
@@ -0,0 +1,430 @@
+"""The LLM resume pipeline: CrewAI agents, tasks and the LLM client.
+
+This is the only module that imports CrewAI and LangChain, which take seconds
+and a lot of memory to load. Views and the admin never import it. It is loaded
+on first use by ``agent_pool`` (see main/agent_pool.py), that is, in the
+process that runs generation jobs. With ``RESUME_WORKERS_IN_PROCESS = False``
+only the ``run_resume_workers`` processes load it and web workers stay small
+(see ``bench_startup``).
+"""
+import threading
+import time
+from typing import Any, Dict, List
+
+from crewai import Agent, Crew, Task
+from crewai.tools import BaseTool
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.llms import OpenAI
+
+from . import progress, prompts, resume_cache, sections, stages, taxonomy, tracing
+
+
+class ATSAnalyzerTool(BaseTool):
+    name: str = "ATS Analyzer"
+    description: str = "Analyzes job descriptions and extracts key requirements for ATS optimization"
+
+    def _run(self, job_description: str) -> Dict[str, List[str]]:
+        """Extract keywords and requirements from job description"""
+        # Single pass over the text with the compiled skill taxonomy
+        return taxonomy.get_extractor().analyze(job_description)
+
+class TokenStreamHandler(BaseCallbackHandler):
+    """Forward streamed LLM tokens to the progress stream of the running job"""
+
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        progress.emit_token(token)
+
+class UsageHandler(BaseCallbackHandler):
+    """Account LLM tokens and estimated cost to the current trace (see main/tracing.py)
+    
+    Streaming OpenAI responses carry no token usage, so counts fall back to
+    the number of streamed tokens and ``prompts.estimate_tokens``.
+    """
+    
+    def __init__(self):
+        self._runs = {}
+        self._lock = threading.Lock()
+    
+    def on_llm_start(self, serialized, prompt_texts, *, run_id=None, **kwargs) -> None:
+        with self._lock:
+            self._runs[run_id] = {'prompt_tokens': sum(map(prompts.estimate_tokens, prompt_texts)), 'streamed': 0}
+    
+    def on_llm_new_token(self, token: str, *, run_id=None, **kwargs) -> None:
+        run = self._runs.get(run_id)
+        if run is not None:
+            run['streamed'] += 1
+    
+    def on_llm_end(self, response, *, run_id=None, **kwargs) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None) or {'prompt_tokens': 0, 'streamed': 0}
+        usage = (response.llm_output or {}).get('token_usage') or {}
+        completion = ''.join(g.text for generations in response.generations for g in generations)
+        tracing.record_llm_usage(
+            usage.get('prompt_tokens') or run['prompt_tokens'],
+            usage.get('completion_tokens') or run['streamed'] or prompts.estimate_tokens(completion),
+        )
+    
+    def on_llm_error(self, error, *, run_id=None, **kwargs) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+def crew_verbose():
+    return getattr(settings, 'RESUME_CREW_VERBOSE', False)
+
+def build_llm():
+    """Create the LLM client shared by the resume agents"""
+    streaming = getattr(settings, 'RESUME_STREAM_TOKENS', True)
+    callbacks = [UsageHandler()] + ([TokenStreamHandler()] if streaming else [])
+    backend = getattr(settings, 'RESUME_LLM_BACKEND', 'openai')
+    if backend == 'mock':
+        from .mock_llm import MockLLM
+        return MockLLM(streaming=streaming, callbacks=callbacks, **getattr(settings, 'RESUME_MOCK_LLM', {}))
+    if backend != 'openai':
+        raise ImproperlyConfigured(f"Unknown RESUME_LLM_BACKEND {backend!r}; use 'openai' or 'mock'")
+    return OpenAI(
+        temperature=0.7,
+        openai_api_key=settings.OPENAI_API_KEY,
+        streaming=streaming,
+        callbacks=callbacks
+    )
+
+class ResumeOptimizerAgent:
+    def __init__(self, llm=None):
+        # Pooled instances share one process-wide client (see main/agent_pool.py)
+        self.llm = llm if llm is not None else build_llm()
+        
+        # Initialize CrewAI agents
+        self.ats_analyzer = Agent(
+            role='ATS Optimization Specialist',
+            goal='Analyze job descriptions and optimize resumes for ATS systems',
+            backstory="""You are an expert in Applicant Tracking Systems (ATS) and resume optimization. 
+            You understand how ATS systems parse and rank resumes, and you know the best practices for 
+            keyword optimization, formatting, and content structure to achieve high ATS scores.""",
+            verbose=crew_verbose(),
+            allow_delegation=False,
+            llm=self.llm,
+            tools=[ATSAnalyzerTool()]
+        )
+        
+        self.content_writer = self._writer_agent()
+        
+        self.quality_reviewer = Agent(
+            role='Resume Quality Assurance Specialist',
+            goal='Review and improve resume quality and ATS compatibility',
+            backstory="""You are a meticulous quality assurance specialist who reviews resumes for 
+            grammar, consistency, ATS compatibility, and overall impact. You ensure that resumes 
+            meet industry standards and will perform well in both ATS systems and human review.""",
+            verbose=crew_verbose(),
+            allow_delegation=False,
+            llm=self.llm
+        )
+
+    def _writer_agent(self) -> Agent:
+        # Section fan-out gives each concurrent task its own writer agent
+        return Agent(
+            role='Professional Resume Writer',
+            goal='Create compelling and professional resume content',
+            backstory="""You are a professional resume writer with 10+ years of experience. You excel at 
+            crafting compelling professional summaries, quantifying achievements, and presenting experience 
+            in the most impactful way. You know how to highlight transferable skills and make candidates 
+            stand out while maintaining professional standards.""",
+            verbose=crew_verbose(),
+            allow_delegation=False,
+            llm=self.llm
+        )
+
+    def create_optimized_resume(self, user_data: Dict[str, Any], recorder: stages.StageRecorder = None) -> str:
+        """Create an ATS-optimized resume using CrewAI
+        
+        With a ``recorder`` for the generation being run, stages whose inputs
+        did not change since the edited generation reuse its output, and tweak
+        mode revises only the changed sections of its resume.
+        """
+        recorder = recorder or stages.StageRecorder()
+        changed = recorder.tweak_sections(user_data)
+        fan_out = not changed and getattr(settings, 'RESUME_SECTION_FANOUT', True)
+        
+        # One prompt budget for every task description of the generation,
+        # planned up front so the analysis leaves a share for the tasks after it
+        budget = prompts.Budget()
+        budget.plan()
+        if changed:
+            budget.plan(prompts.RESUME_WEIGHT)
+        elif fan_out:
+            budget.plan(len(sections.plan_sections(user_data)))
+            budget.plan(prompts.RESUME_WEIGHT)
+        else:
+            budget.plan(2)
+        
+        # The job analysis only depends on the posting, so it is cached on its
+        # own and shared by every candidate applying to the same job. Lookups
+        # of the finished resume happen in jobs.enqueue, before a worker is used.
+        def analyze():
+            cached = resume_cache.get_analysis(user_data)
+            if cached is not None:
+                budget.skip()
+                return cached, 0
+            with sections.llm_slot(), tracing.span('analysis_crew'):
+                output = str(self.build_analysis_crew(user_data, budget).kickoff())
+            resume_cache.set_analysis(user_data, output)
+            return output, 1
+        
+        analysis, reused = recorder.run(stages.STAGE_ANALYSIS, stages.analysis_digest(user_data), analyze)
+        if reused:
+            budget.skip()
+        progress.emit('stage', {'stage': 'analysis', 'cached': reused})
+        
+        if changed:
+            def write():
+                progress.stream_tokens()
+                crew = self.build_tweak_crew(user_data, analysis, recorder.parent.generated_resume, changed, budget)
+                with sections.llm_slot(), tracing.span('tweak'):
+                    return str(crew.kickoff()), 1
+        elif fan_out:
+            def write():
+                # Section calls are recorded as stages of their own
+                draft = self.write_sections(user_data, analysis, recorder, budget)
+                self._draft_written(draft)
+                with sections.llm_slot(), tracing.span('review'):
+                    return str(self.build_review_crew(draft, analysis, user_data, budget).kickoff()), 1
+        else:
+            def write():
+                with sections.llm_slot(), tracing.span('write_review_crew'):
+                    return str(self.build_resume_crew(user_data, analysis, budget).kickoff()), 2
+        
+        result, reused = recorder.run(
+            stages.STAGE_RESUME, stages.resume_digest(user_data), write, sections=changed or ()
+        )
+        if changed or reused:
+            progress.emit('stage', {'stage': 'draft', 'cached': reused})
+        progress.emit('stage', {'stage': 'review', 'cached': reused})
+        resume_cache.set_resume(user_data, result, analysis)
+        return result
+
+    def write_sections(self, user_data: Dict[str, Any], analysis: str, recorder: stages.StageRecorder,
+                       budget: prompts.Budget = None) -> str:
+        """Generate the resume sections concurrently and merge them into one draft
+        
+        Sections whose inputs are unchanged since the edited generation are
+        reused, so editing one experience entry regenerates only that entry.
+        """
+        analysis_digest = stages.analysis_digest(user_data)
+        planned = sections.plan_sections(user_data)
+        outputs, pending = {}, []
+        for section in planned:
+            output = recorder.reusable(section.name, section.digest(analysis_digest))
+            if output is None:
+                pending.append(section)
+            else:
+                outputs[section.name] = output
+                recorder.record(section.name, section.digest(analysis_digest), output, reused=True)
+                if budget is not None:
+                    budget.skip()
+        
+        def generate(section):
+            started = time.perf_counter()
+            output = str(self.build_section_crew(section, analysis, budget).kickoff())
+            return output, time.perf_counter() - started
+        
+        for section, (output, duration) in sections.run_sections(pending, generate):
+            outputs[section.name] = output
+            recorder.record(section.name, section.digest(analysis_digest), output, llm_calls=1, duration=duration)
+            progress.emit('section', {'section': section.name})
+        return sections.merge_sections(user_data, planned, outputs)
+
+    @staticmethod
+    def _draft_written(output) -> None:
+        # The review task runs next and produces the final text, so its tokens
+        # are the ones worth streaming to the browser.
+        progress.emit('stage', {'stage': 'draft'})
+        progress.stream_tokens()
+
+    def build_analysis_crew(self, user_data: Dict[str, Any], budget: prompts.Budget = None) -> Crew:
+        """Build the job description analysis stage"""
+        
+        # Task 1: Analyze job description for ATS optimization
+        analyze_task = Task(
+            description=prompts.render("""
+            Analyze the following job description and extract:
+            1. Key technical skills and technologies
+            2. Required qualifications and experience levels
+            3. Important keywords that should appear in the resume
+            4. Soft skills mentioned in the job posting
+            5. Company culture indicators
+            
+            Job Description:
+            {job_description}
+            
+            Target Position: {target_position}
+            Target Industry: {target_industry}
+            """,
+                budget=budget,
+                job_description=prompts.Part(prompts.posting(user_data.get('job_description'))),
+                target_position=user_data.get('target_position') or '',
+                target_industry=user_data.get('target_industry') or '',
+            ),
+            agent=self.ats_analyzer,
+            expected_output="A detailed analysis of job requirements and ATS optimization keywords"
+        )
+        
+        return Crew(
+            agents=[self.ats_analyzer],
+            tasks=[analyze_task],
+            verbose=crew_verbose()
+        )
+
+    def build_resume_crew(self, user_data: Dict[str, Any], analysis: str, budget: prompts.Budget = None) -> Crew:
+        """Build the writing and review stages around a finished job analysis
+        
+        CrewAI hands the draft to the review task itself, outside ``budget``.
+        """
+        
+        # Task 2: Create optimized resume content
+        write_task = Task(
+            description=prompts.render("""
+            Create an ATS-optimized resume using the following job analysis and candidate information:
+            
+            Job Analysis:
+            {analysis}
+            
+            Candidate Information:
+            {candidate}
+            
+            Requirements:
+            1. Create a compelling professional summary that incorporates job-specific keywords
+            2. Optimize work experience descriptions with action verbs and quantified achievements
+            3. Ensure skills section matches job requirements
+            4. Use ATS-friendly formatting
+            5. Include relevant keywords naturally throughout the resume
+            6. Structure the resume for maximum ATS compatibility
+            """,
+                budget=budget,
+                analysis=prompts.Part(prompts.analysis(analysis)),
+                candidate=prompts.Part(prompts.candidate(user_data), min_tokens=400),
+            ),
+            agent=self.content_writer,
+            expected_output="A complete, ATS-optimized resume in professional format",
+            callback=self._draft_written
+        )
+        
+        # Task 3: Quality review and final optimization
+        review_task = self._review_task(analysis, user_data, context=[write_task], budget=budget)
+        
+        return Crew(
+            agents=[self.content_writer, self.quality_reviewer],
+            tasks=[write_task, review_task],
+            verbose=crew_verbose()
+        )
+
+    def build_section_crew(self, section: sections.Section, analysis: str, budget: prompts.Budget = None) -> Crew:
+        """Build the task that writes one section of the resume"""
+        writer = self._writer_agent()
+        section_task = Task(
+            description=prompts.render("""
+            {instructions}
+            Return only the text of this section, without a section heading.
+            
+            Candidate Information:
+            {candidate}
+            
+            Job Analysis:
+            {analysis}
+            """,
+                budget=budget,
+                instructions=sections.INSTRUCTIONS[section.kind],
+                candidate=prompts.Part(prompts.section_data(section), min_tokens=200),
+                analysis=prompts.Part(prompts.analysis(analysis)),
+            ),
+            agent=writer,
+            expected_output=f"The {section.kind} section of an ATS-optimized resume"
+        )
+        
+        return Crew(
+            agents=[writer],
+            tasks=[section_task],
+            verbose=crew_verbose()
+        )
+
+    def build_review_crew(self, draft: str, analysis: str, user_data: Dict[str, Any],
+                          budget: prompts.Budget = None) -> Crew:
+        """Build the single review pass over a draft merged from sections"""
+        return Crew(
+            agents=[self.quality_reviewer],
+            tasks=[self._review_task(analysis, user_data, draft=draft, budget=budget)],
+            verbose=crew_verbose()
+        )
+
+    def _review_task(self, analysis: str, user_data: Dict[str, Any], draft: str = '', context=None,
+                     budget: prompts.Budget = None) -> Task:
+        # The draft was written from the analysis, so the reviewer only gets
+        # the terms to check for rather than the analysis a second time
+        return Task(
+            description=prompts.render("""
+            Review the generated resume against the target keywords below and ensure:
+            1. ATS compatibility (proper formatting, keyword density, structure)
+            2. Grammar and consistency
+            3. Professional presentation
+            4. Keyword optimization without over-stuffing
+            5. Quantified achievements where possible
+            6. Proper contact information formatting
+            7. Industry-appropriate language and terminology
+            
+            Provide the final, polished resume ready for submission.
+            
+            {keywords}
+            {draft}""",
+                budget=budget,
+                weight=prompts.RESUME_WEIGHT if draft else 1,
+                keywords=prompts.Part(prompts.keyword_brief(analysis, user_data.get('job_description'))),
+                draft=prompts.Part(f'\nResume Draft:\n{draft}' if draft else '', min_tokens=2000),
+            ),
+            agent=self.quality_reviewer,
+            expected_output="A final, polished, ATS-optimized resume",
+            context=context
+        )
+
+    def build_tweak_crew(self, user_data: Dict[str, Any], analysis: str, previous_resume: str,
+                         changed: List[str], budget: prompts.Budget = None) -> Crew:
+        """Build a single task that revises only the changed sections of a resume"""
+        
+        tweak_task = Task(
+            description=prompts.render("""
+            Update the existing ATS-optimized resume below. The candidate changed only these
+            sections: {changed}.
+            
+            Updated Candidate Information:
+            {candidate}
+            
+            Job Analysis:
+            {analysis}
+            
+            Existing Resume:
+            {previous_resume}
+            
+            Requirements:
+            1. Rewrite only the changed sections from the updated information
+            2. Keep job-specific keywords from the analysis in the rewritten sections
+            3. Leave every other section exactly as it is
+            4. Keep the ATS-friendly formatting of the existing resume
+            5. Return the complete, final resume
+            """,
+                budget=budget,
+                weight=prompts.RESUME_WEIGHT,
+                changed=', '.join(changed),
+                candidate=prompts.Part(
+                    prompts.changed_inputs(stages.section_inputs(user_data, changed)), min_tokens=200
+                ),
+                analysis=prompts.Part(prompts.analysis(analysis)),
+                previous_resume=prompts.Part(previous_resume, min_tokens=2000),
+            ),
+            agent=self.content_writer,
+            expected_output="The complete resume with only the changed sections revised"
+        )
+        
+        return Crew(
+            agents=[self.content_writer],
+            tasks=[tweak_task],
+            verbose=crew_verbose()
+        )
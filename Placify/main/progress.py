@@ -0,0 +1,134 @@
+"""Progress events for resume generation jobs, streamed to the browser.
+
+Workers ``emit`` events (stage finished, LLM tokens, job done) for the job they
+are running; ``resume_stream`` relays them as server-sent events. Events are
+stored in the ``RESUME_PROGRESS_CACHE_ALIAS`` cache under a per-job sequence
+number, so the stream only needs a cache that is shared between the web and
+worker processes. LLM tokens are buffered and published as one ``token`` event
+per ``RESUME_PROGRESS_TOKEN_INTERVAL``, which keeps a generation to a few
+hundred keys however long its output.
+"""
+import asyncio
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+EVENT_TTL = 60 * 60
+TERMINAL_EVENTS = ('done', 'failed')
+
+_local = threading.local()
+
+
+def _cache():
+    return caches[getattr(settings, 'RESUME_PROGRESS_CACHE_ALIAS', 'default')]
+
+
+def publish(job_id, event, data=None):
+    """Append an event to a job's stream"""
+    cache = _cache()
+    seq_key = f'progress:{job_id}:seq'
+    cache.add(seq_key, 0, timeout=EVENT_TTL)
+    try:
+        seq = cache.incr(seq_key)
+    except ValueError:
+        cache.set(seq_key, 1, timeout=EVENT_TTL)
+        seq = 1
+    cache.set(f'progress:{job_id}:{seq}', {'event': event, 'data': data}, timeout=EVENT_TTL)
+    return seq
+
+
+def read(job_id, after=0):
+    """Return ``[(seq, event), ...]`` published after sequence number ``after``"""
+    cache = _cache()
+    last = cache.get(f'progress:{job_id}:seq') or 0
+    if last <= after:
+        return []
+    keys = [f'progress:{job_id}:{seq}' for seq in range(after + 1, last + 1)]
+    found = cache.get_many(keys)
+    return [(seq, found[key]) for seq, key in zip(range(after + 1, last + 1), keys) if key in found]
+
+
+@contextmanager
+def bind(job_id):
+    """Route ``emit`` calls made by this thread to ``job_id``"""
+    _local.job_id = job_id
+    _local.stream_tokens = False
+    _local.tokens = []
+    _local.tokens_since = time.monotonic()
+    try:
+        yield
+    finally:
+        _flush_tokens()
+        _local.job_id = None
+        _local.stream_tokens = False
+
+
+def _flush_tokens():
+    tokens = getattr(_local, 'tokens', None)
+    if tokens:
+        publish(_local.job_id, 'token', ''.join(tokens))
+        tokens.clear()
+    _local.tokens_since = time.monotonic()
+
+
+def emit(event, data=None):
+    if getattr(_local, 'job_id', None) is not None:
+        # Tokens still buffered came before this event
+        _flush_tokens()
+        publish(_local.job_id, event, data)
+
+
+def stream_tokens(enabled=True):
+    """Start (or stop) forwarding LLM tokens for the bound job"""
+    if not enabled and getattr(_local, 'job_id', None) is not None:
+        _flush_tokens()
+    _local.stream_tokens = enabled
+
+
+def emit_token(text):
+    if not getattr(_local, 'stream_tokens', False) or getattr(_local, 'job_id', None) is None:
+        return
+    _local.tokens.append(text)
+    if time.monotonic() - _local.tokens_since >= getattr(settings, 'RESUME_PROGRESS_TOKEN_INTERVAL', 0.25):
+        _flush_tokens()
+
+
+def format_sse(seq, event, data):
+    return f'id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+async def event_stream(job_id, initial=None, after=0):
+    """Async generator of SSE frames for a job until it finishes
+
+    ``initial`` is a ``(event, data)`` pair describing the job's current state,
+    sent immediately so the browser gets its first byte without waiting on the
+    pipeline.
+    """
+    poll_interval = getattr(settings, 'RESUME_PROGRESS_POLL_INTERVAL', 0.25)
+    keepalive = getattr(settings, 'RESUME_PROGRESS_KEEPALIVE', 15)
+
+    if initial is not None:
+        event, data = initial
+        yield format_sse(after, event, data)
+        if event in TERMINAL_EVENTS:
+            return
+
+    last_sent = time.monotonic()
+    while True:
+        events = await sync_to_async(read, thread_sensitive=False)(job_id, after)
+        for seq, item in events:
+            after = seq
+            yield format_sse(seq, item['event'], item['data'])
+            if item['event'] in TERMINAL_EVENTS:
+                return
+        if events:
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent > keepalive:
+            yield ': keepalive\n\n'
+            last_sent = time.monotonic()
+        await asyncio.sleep(poll_interval)
@@ -0,0 +1,298 @@
+"""Compact task prompts for the resume crews, under a token budget.
+
+The task descriptions used to interpolate Python reprs of the form data, every
+free-text field (empty ones included) and the full job description and
+analysis, indented by the source code. The helpers here build those inputs
+compactly instead:
+
+* ``candidate``, ``entries`` and ``fields`` write the form data as short
+  labelled lines and leave out empty fields;
+* ``posting`` keeps an oversized job description to its requirement and skill
+  lines and the terms ``ATSAnalyzerTool`` extracts from it;
+* ``keyword_brief`` replaces the full analysis for the review task, which
+  already receives the draft written from it;
+* ``render`` dedents a task template and fits it into its share of the
+  generation's ``Budget``: ``RESUME_PROMPT_TOKEN_BUDGET`` tokens for every
+  task description of one generation, fan-out sections included. It cuts the
+  ``Part`` inputs, largest first, down to their ``min_tokens`` and then
+  further if that is not enough.
+
+Each helper that replaces an input of the old single-crew prompts adds the
+tokens it saves against what those prompts rendered to the current trace
+(``prompt.tokens_saved.<reason>`` in the job trace) and to
+``placify_prompt_tokens_saved_total``. The section and tweak inputs have no
+such predecessor and count nothing. Token counts use the same four
+characters per token estimate as the usage accounting in main/pipeline.py.
+"""
+import bisect
+import textwrap
+import threading
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from . import metrics, taxonomy, tracing
+from .resume_cache import normalize_text
+
+CHARS_PER_TOKEN = 4
+ELLIPSIS = ' [...]'
+# Budget weight of the tasks that carry a whole resume (review and tweak)
+RESUME_WEIGHT = 4
+
+LABELS = {
+    'full_name': 'Name',
+    'email': 'Email',
+    'phone': 'Phone',
+    'location': 'Location',
+    'linkedin': 'LinkedIn',
+    'portfolio': 'Portfolio',
+    'target_position': 'Target position',
+    'target_industry': 'Target industry',
+    'current_summary': 'Current summary',
+    'years_experience': 'Years of experience',
+    'career_level': 'Career level',
+    'technical_skills': 'Technical skills',
+    'soft_skills': 'Soft skills',
+    'certifications': 'Certifications',
+    'languages': 'Languages',
+    'achievements': 'Achievements',
+    'additional_info': 'Additional info',
+}
+CANDIDATE_FIELDS = [
+    'full_name', 'email', 'phone', 'location', 'linkedin', 'portfolio', 'years_experience',
+    'career_level', 'current_summary', 'technical_skills', 'soft_skills', 'certifications',
+    'languages', 'achievements', 'additional_info',
+]
+ENTRY_LISTS = {
+    'experience_data': 'Work experience',
+    'education_data': 'Education',
+    'projects_data': 'Projects',
+}
+
+
+def estimate_tokens(text):
+    return -(-len(text or '') // CHARS_PER_TOKEN)
+
+
+def _saved(reason, raw, compact):
+    saved = estimate_tokens(raw) - estimate_tokens(compact)
+    if saved > 0:
+        tracing.incr(f'prompt.tokens_saved.{reason}', saved)
+        metrics.PROMPT_TOKENS_SAVED.inc(saved, reason=reason)
+    return compact
+
+
+def truncate(text, max_tokens):
+    """Cut ``text`` to about ``max_tokens``, at a line or word boundary"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(max_tokens * CHARS_PER_TOKEN - len(ELLIPSIS), 0)
+    cut = text[:limit]
+    boundary = max(cut.rfind('\n'), cut.rfind(' '))
+    if boundary > limit // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + ELLIPSIS
+
+
+# --- candidate data ---------------------------------------------------------
+
+def _entry(kind, entry):
+    value = {key: normalize_text(entry.get(key)) for key in entry}
+    if kind == 'experience_data':
+        dates = ' - '.join(part for part in (value.get('start_date'), value.get('end_date') or 'Present') if part)
+        head = ', '.join(part for part in (value.get('title'), value.get('company')) if part)
+        body = value.get('description')
+        return f"{head} ({dates})" + (f": {body}" if body else '')
+    if kind == 'education_data':
+        line = ', '.join(part for part in (value.get('degree'), value.get('school'), value.get('year')) if part)
+        return line + (f", GPA {value['gpa']}" if value.get('gpa') else '')
+    head = value.get('name', '')
+    if value.get('technologies'):
+        head += f" [{value['technologies']}]"
+    if value.get('url'):
+        head += f" {value['url']}"
+    return head + (f": {value['description']}" if value.get('description') else '')
+
+
+def entries(kind, items):
+    """One line per experience, education or project entry"""
+    lines = [f'- {_entry(kind, item)}' for item in items or [] if any(normalize_text(v) for v in item.values())]
+    return '\n'.join(lines)
+
+
+def fields(data, names=None):
+    """``Label: value`` lines for the non-empty text fields in ``data``"""
+    names = names if names is not None else [name for name in LABELS if name in data]
+    lines = []
+    for name in names:
+        value = normalize_text(data.get(name))
+        if value:
+            lines.append(f"{LABELS.get(name, name.replace('_', ' ').capitalize())}: {value}")
+    return '\n'.join(lines)
+
+
+def _form_data(data, names):
+    blocks = [fields(data, [name for name in names if name in LABELS])]
+    for name, title in ENTRY_LISTS.items():
+        if name in names:
+            listed = entries(name, data.get(name))
+            if listed:
+                blocks.append(f'{title}:\n{listed}')
+    return '\n'.join(block for block in blocks if block)
+
+
+def candidate(user_data):
+    """The whole submission for the single-task writer"""
+    names = CANDIDATE_FIELDS + list(ENTRY_LISTS)
+    raw = '\n'.join(f'{name}: {user_data.get(name, "")}' for name in names)
+    return _saved('compact', raw, _form_data(user_data, names))
+
+
+def section_data(section):
+    """The inputs of one fan-out section (see main/sections.py)"""
+    data = section.data
+    if section.kind == 'experience':
+        return entries('experience_data', [data])
+    if section.kind == 'projects':
+        return entries('projects_data', data.get('projects'))
+    return fields(data)
+
+
+def changed_inputs(inputs):
+    """The changed form fields passed to the tweak task"""
+    return _form_data(inputs, list(inputs))
+
+
+# --- job description and analysis ---------------------------------------------
+
+def _lines(text):
+    return [line for line in (normalize_text(line) for line in (text or '').splitlines()) if line]
+
+
+def posting(job_description, max_tokens=None):
+    """The job description, condensed when it is longer than ``max_tokens``
+
+    Repeated lines are dropped. A long posting then keeps its requirement and
+    skill lines and every line that mentions a known term, followed by the
+    extracted terms, so boilerplate about the company and benefits is what
+    gets dropped.
+    """
+    max_tokens = max_tokens or getattr(settings, 'RESUME_PROMPT_POSTING_TOKENS', 600)
+    # Postings pasted from job boards often repeat paragraphs
+    lines = list(dict.fromkeys(_lines(job_description)))
+    text = '\n'.join(lines)
+    if estimate_tokens(text) > max_tokens:
+        # Same extraction as ATSAnalyzerTool, without a tool call
+        found = taxonomy.get_extractor().extract(text)
+        starts, offset = [], 0
+        for line in lines:
+            starts.append(offset)
+            offset += len(line) + 1
+        mentions = {bisect.bisect_right(starts, match.start) - 1 for match in found.matches}
+        keep = set(found.requirements) | set(found.skills)
+        kept = [line for index, line in enumerate(lines) if index in mentions or line.lower() in keep]
+        if found.matches:
+            kept.append('Key terms: ' + ', '.join(found.keywords()))
+        text = truncate('\n'.join(kept) or text, max_tokens)
+    return _saved('posting', job_description or '', text)
+
+
+def analysis(text, max_tokens=None):
+    """The job analysis for writing tasks, capped at ``max_tokens``"""
+    max_tokens = max_tokens or getattr(settings, 'RESUME_PROMPT_ANALYSIS_TOKENS', 500)
+    compact = truncate('\n'.join(_lines(text)), max_tokens)
+    return _saved('compact', text or '', compact)
+
+
+def keyword_brief(job_analysis, job_description=''):
+    """The terms a reviewer checks the draft for, instead of the full analysis"""
+    extractor = taxonomy.get_extractor()
+    keywords = extractor.analyze(job_description or '')['keywords'] + extractor.analyze(job_analysis or '')['keywords']
+    terms = list(dict.fromkeys(term.lower() for term in keywords))
+    brief = 'Target keywords: ' + ', '.join(terms) if terms else truncate('\n'.join(_lines(job_analysis)), 150)
+    return _saved('dedupe', job_analysis or '', brief)
+
+
+# --- rendering ----------------------------------------------------------------
+
+@dataclass
+class Part:
+    """A prompt input that ``render`` may cut, down to ``min_tokens`` before any other is cut further"""
+    text: str
+    min_tokens: int = 100
+
+
+class BudgetExceeded(ValueError):
+    """A prompt does not fit its budget even with every ``Part`` cut out"""
+
+
+class Budget:
+    """Prompt tokens for all the task descriptions of one generation
+
+    The pipeline plans the tasks it is going to render, each with a weight,
+    and every ``render`` gets its weighted share of the tokens left. A task
+    that uses less than its share leaves the rest to the tasks after it, and a
+    planned task whose output turns out to be reusable is skipped. Section
+    tasks render concurrently, so the counts are kept under a lock.
+    """
+
+    def __init__(self, total=None):
+        self.total = total or getattr(settings, 'RESUME_PROMPT_TOKEN_BUDGET', 12000)
+        self.spent = 0
+        self.planned = 0
+        self._lock = threading.Lock()
+
+    def plan(self, weight=1):
+        with self._lock:
+            self.planned += weight
+
+    def skip(self, weight=1):
+        with self._lock:
+            self.planned = max(self.planned - weight, 0)
+
+    def allowance(self, weight=1):
+        with self._lock:
+            return (self.total - self.spent) * weight // max(self.planned, weight)
+
+    def spend(self, tokens, weight=1):
+        with self._lock:
+            self.spent += tokens
+            self.planned = max(self.planned - weight, 0)
+
+
+def _fit(template, values, limit):
+    texts = {name: value.text if isinstance(value, Part) else str(value) for name, value in values.items()}
+    parts = [name for name, value in values.items() if isinstance(value, Part)]
+    # Down to each part's minimum first, then below it
+    for floor in (True, False):
+        for name in sorted(parts, key=lambda name: -estimate_tokens(texts[name])):
+            over = estimate_tokens(template.format(**texts)) - limit
+            if over <= 0:
+                return texts
+            size = estimate_tokens(texts[name])
+            target = max(values[name].min_tokens if floor else 0, size - over)
+            if target < size:
+                cut = truncate(texts[name], target) if target else ''
+                _saved('budget', texts[name], cut)
+                texts[name] = cut
+    return texts
+
+
+def render(template, budget=None, weight=1, **values):
+    """Dedent ``template`` and fill it in, cutting ``Part`` values to fit ``budget``
+
+    ``budget`` is the generation's ``Budget``, of which this task takes its
+    share for ``weight``, or a number of tokens for this prompt alone.
+    """
+    template = _saved('whitespace', template, textwrap.dedent(template).strip('\n'))
+    if isinstance(budget, Budget):
+        limit = budget.allowance(weight)
+    else:
+        limit = budget or getattr(settings, 'RESUME_PROMPT_TOKEN_BUDGET', 12000)
+    text = template.format(**_fit(template, values, limit))
+    tokens = estimate_tokens(text)
+    if tokens > limit:
+        raise BudgetExceeded(f'The task needs {tokens} prompt tokens with its inputs cut; its budget is {limit}')
+    if isinstance(budget, Budget):
+        budget.spend(tokens, weight)
+    return text
@@ -0,0 +1,146 @@
+"""Rate limiting and admission control for the generation and analysis endpoints.
+
+``check(request, name)`` applies the token buckets configured in
+``RATELIMITS[name]``. Each bucket has a scope:
+
+* ``user``: the signed-in user;
+* ``session``: the visitor's session, when the request carries one;
+* ``ip``: the client address, which catches clients that send no cookies;
+* ``global``: every request to the endpoint.
+
+A rate such as ``'10/m'`` allows a burst of 10 requests that refills at 10 per
+minute. Buckets are stored in the ``RATELIMIT_CACHE`` cache as one theoretical
+arrival time each (GCRA, which behaves like a token bucket). A request is
+admitted only when every applicable bucket has room. Otherwise none is
+charged and the caller answers 429 with the longest wait as ``Retry-After``.
+Updates are serialized within a process. Across processes sharing a cache, a
+race can let a request or two through at the limit. Async views call
+``acheck``, which runs ``check`` in a worker thread so the lock and the cache
+round trips do not block the event loop.
+
+``admit_generation`` is the second gate, for new resume generations, and
+runs first so a rejected submission is not charged to the buckets. It counts
+the pending and running jobs in the database, which covers workers in every
+process. Submissions are rejected once ``RESUME_ADMISSION_MAX_QUEUE`` jobs
+wait. In ``'reject'`` mode they are also rejected while
+``RESUME_ADMISSION_MAX_RUNNING`` jobs run (by default
+``RESUME_WORKER_CONCURRENCY``, the worker threads of one process), that is,
+whenever a new job would have to wait for a worker.
+"""
+import math
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+from . import metrics
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _cache():
+    return caches[_setting('RATELIMIT_CACHE', 'default')]
+
+
+def parse_rate(rate):
+    """``'10/m'`` -> ``(10, 60)``: requests allowed per period in seconds"""
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period.strip()[:1]]
+
+
+def _identity(request, scope):
+    if scope == 'user':
+        return request.user.pk if request.user.is_authenticated else None
+    if scope == 'session':
+        return getattr(request, 'session', None) and request.session.session_key
+    if scope == 'ip':
+        return request.META.get('REMOTE_ADDR')
+    return 'all'
+
+
+def check(request, name):
+    """Charge ``request`` to the ``name`` buckets; the seconds to wait if it is over a limit"""
+    if not _setting('RATELIMIT_ENABLED', True):
+        return None
+    buckets = []
+    for scope, rate in _setting('RATELIMITS', {}).get(name, {}).items():
+        identity = _identity(request, scope)
+        if identity:
+            buckets.append((scope, f'ratelimit:{name}:{scope}:{identity}', *parse_rate(rate)))
+    if not buckets:
+        return None
+
+    cache = _cache()
+    with _lock:
+        now = time.time()
+        arrivals = cache.get_many([key for _, key, _, _ in buckets])
+        updates, waits = {}, []
+        for scope, key, count, period in buckets:
+            interval = period / count
+            arrival = max(arrivals.get(key, now), now)
+            # Up to ``count`` requests may arrive ahead of their schedule
+            wait = arrival - interval * (count - 1) - now
+            if wait > 0:
+                waits.append((wait, scope))
+            updates[key] = arrival + interval
+        if waits:
+            wait, scope = max(waits)
+            metrics.REQUESTS_REJECTED.inc(endpoint=name, reason=scope)
+            return max(math.ceil(wait), 1)
+        timeout = math.ceil(max(updates.values()) - now) + 1
+        cache.set_many(updates, timeout=timeout)
+    return None
+
+
+# Only the cache is touched, not the database, so any worker thread will do
+acheck = sync_to_async(check, thread_sensitive=False)
+
+
+def _queue_load():
+    """``(pending, running)`` job counts, cached briefly so a burst of submissions costs one query"""
+    from django.db.models import Count, Q
+
+    from .models import ResumeGeneration
+
+    cache = _cache()
+    load = cache.get('ratelimit:queue_load')
+    if load is None:
+        counts = ResumeGeneration.objects.filter(
+            status__in=[ResumeGeneration.STATUS_PENDING, ResumeGeneration.STATUS_RUNNING],
+        ).aggregate(
+            pending=Count('id', filter=Q(status=ResumeGeneration.STATUS_PENDING)),
+            running=Count('id', filter=Q(status=ResumeGeneration.STATUS_RUNNING)),
+        )
+        load = (counts['pending'], counts['running'])
+        cache.set('ratelimit:queue_load', load, timeout=_setting('RESUME_ADMISSION_QUEUE_CHECK_INTERVAL', 2))
+    return load
+
+
+def admit_generation():
+    """The seconds to wait before retrying, or None when a new generation may be queued"""
+    pending, running = _queue_load()
+    if pending >= _setting('RESUME_ADMISSION_MAX_QUEUE', 50):
+        reason = 'queue'
+    elif _setting('RESUME_ADMISSION_MODE', 'queue') == 'reject' and running >= (
+        _setting('RESUME_ADMISSION_MAX_RUNNING', None) or _setting('RESUME_WORKER_CONCURRENCY', 2)
+    ):
+        reason = 'admission'
+    else:
+        return None
+    metrics.REQUESTS_REJECTED.inc(endpoint='generate', reason=reason)
+    return _setting('RESUME_ADMISSION_RETRY_AFTER', 30)
+
+
+def too_many_requests(retry_after, message='Too many requests, please try again later.'):
+    response = JsonResponse({'error': message, 'retry_after': retry_after}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
@@ -0,0 +1,140 @@
+"""Content-addressed cache for generated resumes and job-description analyses.
+
+Students often resubmit the same form, or many candidates apply to the same
+posting. Entries are keyed by a hash of the normalized submission, so these
+cases skip the LLM pipeline:
+
+* the job analysis is keyed on the job description, position and industry only,
+  so every candidate applying to one posting shares a single analysis;
+* the final resume is keyed on the whole canonicalized ``user_data``.
+
+Storage is Django's cache framework (the ``RESUME_CACHE_ALIAS`` cache). The
+default local-memory backend evicts least-recently-used entries once
+``MAX_ENTRIES`` is reached, and entries expire after ``RESUME_CACHE_TIMEOUT``.
+"""
+import hashlib
+import json
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics, tracing
+
+# Fields that make up a submission. Anything else in user_data (such as the
+# bypass flag) does not change the generated resume and is left out of the key.
+TEXT_FIELDS = [
+    'full_name', 'email', 'phone', 'location', 'linkedin', 'portfolio',
+    'target_position', 'target_industry', 'current_summary', 'years_experience',
+    'career_level', 'technical_skills', 'soft_skills', 'certifications',
+    'languages', 'achievements', 'additional_info',
+]
+LIST_FIELDS = ['experience_data', 'education_data', 'projects_data']
+
+_whitespace = re.compile(r'\s+')
+
+
+def normalize_text(value, lower=False):
+    value = _whitespace.sub(' ', str(value or '')).strip()
+    return value.lower() if lower else value
+
+
+def _canonical_entries(entries):
+    canonical = []
+    for entry in entries or []:
+        item = {key: normalize_text(value) for key, value in sorted(entry.items())}
+        if any(item.values()):
+            canonical.append(item)
+    return canonical
+
+
+def digest(payload):
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def canonical_posting(user_data):
+    """Normalized form of the fields the job analysis depends on"""
+    return [
+        normalize_text(user_data.get('job_description'), lower=True),
+        normalize_text(user_data.get('target_position'), lower=True),
+        normalize_text(user_data.get('target_industry'), lower=True),
+    ]
+
+
+def analysis_key(user_data):
+    """Cache key for the job analysis stage (depends only on the posting)"""
+    return 'analysis:' + digest(canonical_posting(user_data))
+
+
+def canonical_submission(user_data):
+    """Normalized form of every field that affects the generated resume"""
+    payload = {field: normalize_text(user_data.get(field)) for field in TEXT_FIELDS}
+    payload['job_description'] = normalize_text(user_data.get('job_description'), lower=True)
+    for field in LIST_FIELDS:
+        payload[field] = _canonical_entries(user_data.get(field))
+    return payload
+
+
+def resume_key(user_data):
+    """Cache key for a complete generated resume"""
+    return 'resume:' + digest(canonical_submission(user_data))
+
+
+def _cache():
+    return caches[getattr(settings, 'RESUME_CACHE_ALIAS', 'default')]
+
+
+def _enabled(user_data):
+    return getattr(settings, 'RESUME_CACHE_ENABLED', True) and not user_data.get('bypass_cache')
+
+
+def _count(kind, outcome):
+    metrics.CACHE_LOOKUPS.inc(kind=kind, outcome=outcome)
+    tracing.incr(f'cache.{kind}.{outcome}')
+    cache = _cache()
+    key = f'stats:{kind}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        # incr() raises when the counter does not exist (or was evicted)
+        cache.add(key, 1, timeout=None)
+
+
+def _get(kind, key, user_data):
+    if not _enabled(user_data):
+        _count(kind, 'bypass')
+        return None
+    value = _cache().get(key)
+    _count(kind, 'miss' if value is None else 'hit')
+    return value
+
+
+def _set(key, value):
+    if getattr(settings, 'RESUME_CACHE_ENABLED', True):
+        _cache().set(key, value, timeout=getattr(settings, 'RESUME_CACHE_TIMEOUT', None))
+
+
+def get_analysis(user_data):
+    return _get('analysis', analysis_key(user_data), user_data)
+
+
+def set_analysis(user_data, analysis):
+    _set(analysis_key(user_data), analysis)
+
+
+def get_resume(user_data):
+    """Return ``{'resume': ..., 'analysis': ...}`` for this submission, or None"""
+    return _get('resume', resume_key(user_data), user_data)
+
+
+def set_resume(user_data, resume, analysis):
+    _set(resume_key(user_data), {'resume': resume, 'analysis': analysis})
+
+
+def cache_stats():
+    """Hit/miss/bypass counters for both stages"""
+    cache = _cache()
+    keys = [f'stats:{kind}:{outcome}' for kind in ('analysis', 'resume') for outcome in ('hit', 'miss', 'bypass')]
+    values = cache.get_many(keys)
+    return {key.split(':', 1)[1].replace(':', '_'): values.get(key, 0) for key in keys}
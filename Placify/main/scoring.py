@@ -0,0 +1,250 @@
+"""Deterministic ATS scoring for generated resumes.
+
+Everything here is plain Python and runs in milliseconds, so every resume gets
+a score without spending LLM tokens:
+
+* keyword coverage: share of the posting's technologies (by canonical skill,
+  so "JS" satisfies "JavaScript") and degree terms that the resume mentions;
+* keyword density: occurrences of matched keywords per 100 resume words;
+* structure: presence of the standard resume sections and contact details;
+* readability: Flesch reading ease of the resume text.
+
+``JobRequirements`` extracts a posting once and then scores any number of
+resumes against it, one extraction pass per resume. ``score_many`` stacks the
+keyword counts of a batch of resumes into a SciPy CSR matrix and computes
+coverage and density for all of them with two products against the posting's
+requirement vector. Ranking many stored resumes by similarity is done by
+``main/matching.py`` over cached vectors.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from . import taxonomy
+from .keywords import DEGREE, TECH
+from .models import ATSAnalysis
+
+SECTIONS = {
+    'summary': ('summary', 'profile', 'objective'),
+    'experience': ('experience', 'employment', 'work history'),
+    'education': ('education', 'academic'),
+    'skills': ('skills', 'technical skills', 'competencies'),
+    'projects': ('projects',),
+    'certifications': ('certifications', 'certificates', 'licenses'),
+}
+REQUIRED_SECTIONS = ('summary', 'experience', 'education', 'skills')
+
+# Keyword density (per 100 words) considered natural; above the upper bound
+# the resume starts to look keyword-stuffed.
+DENSITY_RANGE = (2.0, 10.0)
+
+WEIGHTS = {'coverage': 0.6, 'structure': 0.2, 'density': 0.1, 'readability': 0.1}
+
+_email = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+_phone = re.compile(r'\+?\d[\d\s().-]{7,}\d')
+_sentence_end = re.compile(r'[.!?]+|\n\s*\n|\n\s*[-•*]')
+_word = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+_vowel_groups = re.compile(r'[aeiouy]+')
+_header_prefix = re.compile(r'^[#*\s]*')
+
+
+def _match_key(match):
+    # Technologies compare by canonical skill; degree terms by dictionary term.
+    if match.kind == TECH and match.skill_id is not None:
+        return (TECH, match.skill_id)
+    return (match.kind, match.term.lower())
+
+
+def _label(match):
+    return match.term if match.kind == TECH else match.text
+
+
+def count_syllables(word):
+    word = word.lower()
+    count = len(_vowel_groups.findall(word))
+    if word.endswith('e') and not word.endswith(('le', 'ee')) and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+def flesch_reading_ease(text):
+    """Flesch reading ease (higher is easier), clamped to 0-100"""
+    words = _word.findall(text)
+    if not words:
+        return 0.0
+    sentences = max(len([s for s in _sentence_end.split(text) if s.strip()]), 1)
+    syllables = sum(count_syllables(word) for word in words)
+    score = 206.835 - 1.015 * (len(words) / sentences) - 84.6 * (syllables / len(words))
+    return max(0.0, min(100.0, score))
+
+
+def find_sections(text):
+    """Names of the standard sections whose header appears on its own line"""
+    found = set()
+    for line in text.splitlines():
+        line = _header_prefix.sub('', line).strip().rstrip(':').strip('*# ').lower()
+        if not line or len(line) > 40:
+            continue
+        for section, headers in SECTIONS.items():
+            if any(line == header or line.startswith(header + ' ') or line.endswith(' ' + header)
+                   for header in headers):
+                found.add(section)
+    return found
+
+
+def _density_score(density):
+    low, high = DENSITY_RANGE
+    if density < low:
+        return density / low
+    if density <= high:
+        return 1.0
+    return max(0.0, 1.0 - (density - high) / high)
+
+
+@dataclass
+class ResumeScore:
+    keywords_matched: int
+    keywords_required: int
+    coverage: float
+    keyword_density: float
+    readability: float
+    sections: List[str]
+    structure: float
+    has_email: bool
+    has_phone: bool
+    ats_score: int
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def recommendations(self) -> List[str]:
+        tips = [f'Add "{label}" to your resume if it reflects your experience' for label in self.missing]
+        tips += [f'Add a clearly labelled {name.title()} section'
+                 for name in REQUIRED_SECTIONS if name not in self.sections]
+        if not self.has_email or not self.has_phone:
+            tips.append('Include an email address and phone number at the top')
+        if self.keyword_density > DENSITY_RANGE[1]:
+            tips.append('Reduce keyword repetition; the resume may look keyword-stuffed')
+        return tips
+
+
+class JobRequirements:
+    """Keywords extracted once from a posting, reusable across many resumes"""
+
+    def __init__(self, job_description, extractor=None):
+        self.extractor = extractor or taxonomy.get_extractor()
+        self.required: Dict[tuple, object] = {}
+        for match in self.extractor.extract(job_description).matches:
+            if match.kind in (TECH, DEGREE):
+                self.required.setdefault(_match_key(match), match)
+
+    @property
+    def keywords(self) -> List[str]:
+        return [_label(m) for m in self.required.values()]
+
+    @property
+    def skill_ids(self) -> List[int]:
+        return [m.skill_id for m in self.required.values() if m.skill_id is not None]
+
+    def _keywords(self, resume):
+        return Counter(_match_key(m) for m in self.extractor.extract(resume).matches if m.kind in (TECH, DEGREE))
+
+    def score(self, resume) -> ResumeScore:
+        present = self._keywords(resume)
+        matched = [key for key in self.required if key in present]
+        missing = [key for key in self.required if key not in present]
+        return self._result(resume, len(matched), sum(present[key] for key in matched), missing)
+
+    def score_many(self, resumes) -> List[ResumeScore]:
+        """``score`` for a batch of resumes, with the keyword figures computed as matrix products
+
+        Row i of the term-count matrix holds the keyword occurrences of resume
+        i; the 0/1 requirement vector picks the posting's keywords out of it.
+        """
+        import numpy as np
+        from scipy import sparse
+
+        columns = {key: column for column, key in enumerate(self.required)}
+        data, indices, indptr = [], [], [0]
+        for resume in resumes:
+            for key, count in self._keywords(resume).items():
+                data.append(count)
+                indices.append(columns.setdefault(key, len(columns)))
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(resumes), len(columns)),
+        )
+        requirement = np.zeros(len(columns))
+        requirement[:len(self.required)] = 1.0
+        mentions = counts @ requirement
+        matched = (counts > 0).astype(np.float64) @ requirement
+
+        keys = list(self.required)
+        results = []
+        for row, resume in enumerate(resumes):
+            present = set(counts.indices[counts.indptr[row]:counts.indptr[row + 1]].tolist())
+            missing = [key for column, key in enumerate(keys) if column not in present]
+            results.append(self._result(resume, int(matched[row]), float(mentions[row]), missing))
+        return results
+
+    def _result(self, resume, matched, mentions, missing) -> ResumeScore:
+        words = len(resume.split())
+        coverage = matched / len(self.required) if self.required else 1.0
+        density = 100.0 * mentions / words if words else 0.0
+        sections = find_sections(resume)
+        has_email = bool(_email.search(resume))
+        has_phone = bool(_phone.search(resume))
+        structure = (
+            sum(name in sections for name in REQUIRED_SECTIONS) + has_email + has_phone
+        ) / (len(REQUIRED_SECTIONS) + 2)
+        readability = flesch_reading_ease(resume)
+
+        total = (
+            WEIGHTS['coverage'] * coverage
+            + WEIGHTS['structure'] * structure
+            + WEIGHTS['density'] * _density_score(density)
+            + WEIGHTS['readability'] * readability / 100.0
+        )
+        return ResumeScore(
+            keywords_matched=matched,
+            keywords_required=len(self.required),
+            coverage=round(coverage, 4),
+            keyword_density=round(density, 2),
+            readability=round(readability, 1),
+            sections=sorted(sections),
+            structure=round(structure, 4),
+            has_email=has_email,
+            has_phone=has_phone,
+            ats_score=round(total * 100),
+            missing=[_label(self.required[key]) for key in missing],
+        )
+
+
+def score_resume(job_description, resume, extractor=None) -> ResumeScore:
+    return JobRequirements(job_description, extractor).score(resume)
+
+
+def score_resumes(job_description, resumes, extractor=None) -> List[ResumeScore]:
+    """``score_resume`` for each resume, extracting the posting only once"""
+    return JobRequirements(job_description, extractor).score_many(list(resumes))
+
+
+def record_ats_analysis(generation):
+    """Compute and persist the ATS metrics for a finished ``ResumeGeneration``"""
+    requirements = JobRequirements(generation.job_description)
+    result = requirements.score(generation.generated_resume)
+    analysis, _ = ATSAnalysis.objects.update_or_create(
+        resume_generation=generation,
+        defaults={
+            'extracted_keywords': requirements.keywords,
+            'required_skills': taxonomy.skill_names(requirements.skill_ids),
+            'recommendations': result.recommendations,
+            'keyword_density': result.keyword_density,
+            'readability_score': round(result.readability),
+        },
+    )
+    generation.estimated_ats_score = result.ats_score
+    generation.keywords_matched = result.keywords_matched
+    generation.save(update_fields=['estimated_ats_score', 'keywords_matched', 'updated_at'])
+    return analysis
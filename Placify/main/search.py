@@ -0,0 +1,225 @@
+"""Full-text search over stored resumes and job descriptions.
+
+The index lives next to ``main_resumegeneration`` and the database keeps it in
+sync with triggers, so ``bulk_create``, ``QuerySet.update`` and the job queue's
+raw updates are indexed too:
+
+* SQLite: an external-content FTS5 table (``porter unicode61`` tokenizer,
+  prefix indexes) ranked with ``bm25``;
+* PostgreSQL: a table of weighted ``tsvector`` documents with a GIN index,
+  ranked with ``ts_rank_cd``.
+
+Only updates to the indexed columns touch the index, not the status and
+trace updates of a running job. Other backends fall back to ``icontains``
+filters, ordered newest first.
+
+Queries are typed by people, not written in a query language. Every word
+becomes a quoted prefix term and the terms are ANDed, so ``pyth djan``
+matches "Python/Django" and punctuation cannot break the query syntax.
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+
+TABLE = 'main_resumesearch'
+SOURCE = 'main_resumegeneration'
+COLUMNS = ('full_name', 'email', 'target_position', 'job_description', 'generated_resume')
+# bm25 weights in COLUMNS order: who and what the resume is for rank above
+# words that only appear in the body or the posting
+BM25_WEIGHTS = (10.0, 10.0, 8.0, 1.0, 2.0)
+PG_WEIGHTS = {'full_name': 'A', 'email': 'A', 'target_position': 'A', 'generated_resume': 'B', 'job_description': 'C'}
+MAX_TERMS = 8
+
+_index_ready = {}
+
+
+@dataclass
+class Hit:
+    pk: int
+    rank: float
+    snippet: str = ''
+
+
+def terms(query):
+    """The words of a typed query, at most ``MAX_TERMS`` of them"""
+    words = [word for word in re.findall(r'[^\s"\'\\]+', query or '') if re.search(r'\w', word)]
+    return words[:MAX_TERMS]
+
+
+def match_expression(words):
+    """An FTS5 MATCH expression: every word as an ANDed prefix phrase"""
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def tsquery_expression(words):
+    """A ``to_tsquery`` expression: every word as an ANDed prefix lexeme"""
+    return ' & '.join("'{}':*".format(word.replace("'", '')) for word in words)
+
+
+# --- schema ------------------------------------------------------------------
+
+def _sqlite_schema():
+    columns = ', '.join(COLUMNS)
+    new = ', '.join(f'new.{column}' for column in COLUMNS)
+    old = ', '.join(f'old.{column}' for column in COLUMNS)
+    delete = f"INSERT INTO {TABLE}({TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old});"
+    insert = f'INSERT INTO {TABLE}(rowid, {columns}) VALUES (new.id, {new});'
+    return [
+        f"CREATE VIRTUAL TABLE {TABLE} USING fts5({columns}, content='{SOURCE}', content_rowid='id', "
+        f"tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')",
+        f'CREATE TRIGGER {TABLE}_insert AFTER INSERT ON {SOURCE} BEGIN {insert} END',
+        f'CREATE TRIGGER {TABLE}_delete AFTER DELETE ON {SOURCE} BEGIN {delete} END',
+        f'CREATE TRIGGER {TABLE}_update AFTER UPDATE OF {columns} ON {SOURCE} BEGIN {delete} {insert} END',
+    ]
+
+
+def _pg_document(row):
+    parts = []
+    for column, weight in PG_WEIGHTS.items():
+        # Addresses are kept whole rather than stemmed
+        config = 'simple' if column == 'email' else 'english'
+        parts.append(f"setweight(to_tsvector('{config}', coalesce({row}.{column}, '')), '{weight}')")
+    return ' || '.join(parts)
+
+
+def _pg_schema():
+    return [
+        f'CREATE TABLE {TABLE} (resume_id bigint PRIMARY KEY REFERENCES {SOURCE}(id) '
+        f'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, document tsvector NOT NULL)',
+        f'CREATE INDEX {TABLE}_document_idx ON {TABLE} USING gin(document)',
+        f'CREATE FUNCTION {TABLE}_sync() RETURNS trigger AS $$ BEGIN '
+        f'INSERT INTO {TABLE}(resume_id, document) VALUES (NEW.id, {_pg_document("NEW")}) '
+        f'ON CONFLICT (resume_id) DO UPDATE SET document = EXCLUDED.document; '
+        f'RETURN NULL; END $$ LANGUAGE plpgsql',
+        f"CREATE TRIGGER {TABLE}_sync AFTER INSERT OR UPDATE OF {', '.join(COLUMNS)} ON {SOURCE} "
+        f'FOR EACH ROW EXECUTE FUNCTION {TABLE}_sync()',
+    ]
+
+
+def install(schema_editor):
+    """Create the index and its triggers, then index the existing rows"""
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': _sqlite_schema, 'postgresql': _pg_schema}.get(vendor)
+    if statements is None:
+        return
+    for statement in statements():
+        schema_editor.execute(statement)
+    rebuild(schema_editor.connection)
+
+
+def uninstall(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for suffix in ('insert', 'delete', 'update'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {TABLE}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {TABLE}_sync ON {SOURCE}')
+        schema_editor.execute(f'DROP FUNCTION IF EXISTS {TABLE}_sync()')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+def rebuild(using=connection):
+    """Reindex every resume, e.g. after restoring a dump without the index"""
+    with using.cursor() as cursor:
+        if using.vendor == 'sqlite':
+            cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('rebuild')")
+            cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+        elif using.vendor == 'postgresql':
+            cursor.execute(
+                f'INSERT INTO {TABLE}(resume_id, document) SELECT r.id, {_pg_document("r")} FROM {SOURCE} r '
+                f'ON CONFLICT (resume_id) DO UPDATE SET document = EXCLUDED.document'
+            )
+
+
+def enabled(using=connection):
+    """Whether this database has the search index (the migration skips other backends)"""
+    key = (using.alias, using.settings_dict['NAME'])
+    if key not in _index_ready:
+        _index_ready[key] = (
+            using.vendor in ('sqlite', 'postgresql') and TABLE in using.introspection.table_names()
+        )
+    return _index_ready[key]
+
+
+# --- queries -----------------------------------------------------------------
+
+def _scope(user=None, ids=None):
+    clauses, params = [], []
+    if user is not None:
+        clauses.append('r.user_id = %s')
+        params.append(user.pk)
+    if ids is not None:
+        clauses.append('r.id IN ({})'.format(', '.join(['%s'] * len(ids)) or 'NULL'))
+        params.extend(ids)
+    return ''.join(f' AND {clause}' for clause in clauses), params
+
+
+def _sqlite_search(words, scope, params, limit, snippets):
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    # Column -1: the snippet comes from whichever column matches best. It is
+    # only computed for the rows returned, while bm25 scores every match.
+    snippet = f"snippet({TABLE}, -1, '[', ']', ' ... ', 12)" if snippets else "''"
+    # The rowid is the resume id, so an unscoped search needs no join, which
+    # would cost a lookup per match
+    join = f' JOIN {SOURCE} r ON r.id = {TABLE}.rowid' if scope else ''
+    sql = (
+        f'SELECT {TABLE}.rowid, bm25({TABLE}, {weights}) AS rank, {snippet} FROM {TABLE}{join} '
+        f'WHERE {TABLE} MATCH %s{scope} ORDER BY rank LIMIT %s'
+    )
+    return sql, [match_expression(words), *params, limit]
+
+
+def _pg_search(words, scope, params, limit, snippets):
+    snippet = (
+        "ts_headline('english', hits.generated_resume || ' ' || hits.job_description, hits.q, "
+        "'StartSel=[, StopSel=], MaxWords=20, MinWords=8')" if snippets else "''"
+    )
+    # Rank in a subquery so ts_headline only runs for the rows returned
+    sql = (
+        f'SELECT hits.id, hits.rank, {snippet} FROM ('
+        f'SELECT r.id, r.generated_resume, r.job_description, ts_rank_cd(s.document, q) AS rank, q '
+        f'FROM {TABLE} s JOIN {SOURCE} r ON r.id = s.resume_id '
+        f"CROSS JOIN to_tsquery('english', %s) q "
+        f'WHERE s.document @@ q{scope} ORDER BY rank DESC LIMIT %s'
+        f') hits ORDER BY hits.rank DESC'
+    )
+    return sql, [tsquery_expression(words), *params, limit]
+
+
+def _fallback(words, user, ids, limit):
+    from django.db.models import Q
+
+    from .models import ResumeGeneration
+
+    queryset = ResumeGeneration.objects.all()
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    for word in words:
+        match = Q()
+        for column in COLUMNS:
+            match |= Q(**{f'{column}__icontains': word})
+        queryset = queryset.filter(match)
+    return [Hit(pk, 0.0) for pk in queryset.order_by('-created_at').values_list('pk', flat=True)[:limit]]
+
+
+def search(query, user=None, ids=None, limit=20, snippets=True):
+    """The best ``limit`` resumes matching ``query``, best first
+
+    ``user`` and ``ids`` narrow the search to one user's resumes or to the
+    given ids. Snippets quote the matching text with the terms in brackets.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    if not enabled():
+        return _fallback(words, user, ids, limit)
+    scope, params = _scope(user, ids)
+    build = _sqlite_search if connection.vendor == 'sqlite' else _pg_search
+    sql, params = build(words, scope, params, limit, snippets)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [Hit(pk, rank, snippet) for pk, rank, snippet in cursor.fetchall()]
@@ -0,0 +1,168 @@
+"""Section-level fan-out of resume writing.
+
+Writing the whole resume in one long generation makes latency grow with its
+length. Once the job analysis is available, the sections do not depend on one
+another. ``plan_sections`` therefore splits a submission into independent LLM
+sections: the summary, the skills, one per experience entry, and the
+projects. ``run_sections`` generates them concurrently and ``merge_sections``
+assembles the draft for a single review pass. Contact details, education and
+other plain lists are formatted directly from the form. Wall-clock time is
+then bounded by the slowest section rather than the total length.
+
+Concurrency is capped twice:
+
+* ``RESUME_SECTION_CONCURRENCY``: sections in flight for one generation job;
+* ``RESUME_LLM_KEY_CONCURRENCY``: LLM calls in flight per API key across every
+  job in the process (see ``llm_slot``), so several workers fanning out at
+  once stay under the provider's rate limit.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from django.conf import settings
+
+from . import resume_cache, tracing
+
+INSTRUCTIONS = {
+    'summary': (
+        'Write the PROFESSIONAL SUMMARY: 3-4 sentences that position the candidate for the target '
+        'position and weave in the most important keywords from the job analysis.'
+    ),
+    'skills': (
+        'Write the SKILLS section: group the candidate\'s skills by category, list skills the job '
+        'analysis asks for first, and use the exact spelling from the job description.'
+    ),
+    'experience': (
+        'Write the entry for this one position: title, company and dates on the first line, then '
+        '3-5 bullet points that start with action verbs, quantify achievements and use keywords '
+        'from the job analysis where they are truthful.'
+    ),
+    'projects': (
+        'Write the PROJECTS section: for each project one line with its name and technologies, '
+        'then 1-2 bullet points on the candidate\'s contribution and impact.'
+    ),
+}
+
+
+@dataclass
+class Section:
+    name: str  # stage name, e.g. "experience.0"
+    kind: str  # key into INSTRUCTIONS
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def digest(self, analysis_digest):
+        return resume_cache.digest([analysis_digest, self.name, self.data])
+
+
+def plan_sections(user_data) -> List[Section]:
+    """The independent LLM sections for a submission, in resume order"""
+    submission = resume_cache.canonical_submission(user_data)
+    sections = [
+        Section('summary', 'summary', {
+            key: submission[key] for key in (
+                'full_name', 'target_position', 'target_industry', 'years_experience',
+                'career_level', 'current_summary', 'achievements', 'additional_info',
+            )
+        }),
+        Section('skills', 'skills', {key: submission[key] for key in ('technical_skills', 'soft_skills')}),
+    ]
+    for index, entry in enumerate(submission['experience_data']):
+        sections.append(Section(f'experience.{index}', 'experience', entry))
+    if submission['projects_data']:
+        sections.append(Section('projects', 'projects', {'projects': submission['projects_data']}))
+    return sections
+
+
+def _heading(title, body):
+    return f'{title}\n{body.strip()}' if body and body.strip() else ''
+
+
+def merge_sections(user_data, sections, outputs):
+    """Assemble generated sections and form-only sections into one draft"""
+    data = resume_cache.canonical_submission(user_data)
+    contact = ' | '.join(data[key] for key in ('email', 'phone', 'location', 'linkedin', 'portfolio') if data[key])
+    education = '\n'.join(
+        ', '.join(part for part in (entry.get('degree'), entry.get('school'), entry.get('year')) if part)
+        + (f" (GPA {entry['gpa']})" if entry.get('gpa') else '')
+        for entry in data['education_data']
+    )
+    experience = '\n\n'.join(outputs[s.name].strip() for s in sections if s.kind == 'experience')
+
+    parts = [
+        '\n'.join(part for part in (data['full_name'], contact) if part),
+        _heading('PROFESSIONAL SUMMARY', outputs.get('summary', '')),
+        _heading('SKILLS', outputs.get('skills', '')),
+        _heading('EXPERIENCE', experience),
+        _heading('PROJECTS', outputs.get('projects', '')),
+        _heading('EDUCATION', education),
+        _heading('CERTIFICATIONS', data['certifications']),
+        _heading('LANGUAGES', data['languages']),
+        _heading('ACHIEVEMENTS', data['achievements']),
+    ]
+    return '\n\n'.join(part for part in parts if part)
+
+
+# --- concurrency -----------------------------------------------------------
+
+_key_slots = {}
+_key_slots_lock = threading.Lock()
+# LLM calls running or waiting for a slot in this process, for admission
+# control (see main/ratelimit.py)
+_in_flight = 0
+
+
+def in_flight_calls():
+    return _in_flight
+
+
+@contextmanager
+def llm_slot(api_key=None):
+    """Hold one of the ``RESUME_LLM_KEY_CONCURRENCY`` call slots for an API key"""
+    global _in_flight
+    api_key = api_key if api_key is not None else getattr(settings, 'OPENAI_API_KEY', '')
+    with _key_slots_lock:
+        slot = _key_slots.get(api_key)
+        if slot is None:
+            slot = _key_slots[api_key] = threading.BoundedSemaphore(
+                getattr(settings, 'RESUME_LLM_KEY_CONCURRENCY', 8)
+            )
+        _in_flight += 1
+    try:
+        with slot:
+            yield
+    finally:
+        with _key_slots_lock:
+            _in_flight -= 1
+
+
+def run_sections(sections, generate, max_workers=None):
+    """Yield ``(section, output)`` for each section as soon as it is generated
+
+    ``generate(section)`` runs in a thread pool of at most ``max_workers``
+    (default ``RESUME_SECTION_CONCURRENCY``) threads, each call holding an LLM
+    key slot. If a section fails, sections not yet started are cancelled and
+    the error is raised once running ones have finished.
+    """
+    if not sections:
+        return
+    max_workers = max_workers or getattr(settings, 'RESUME_SECTION_CONCURRENCY', 4)
+
+    # Section threads account their spans and LLM usage to the job's trace
+    trace = tracing.current()
+
+    def call(section):
+        with tracing.bind(trace), llm_slot(), tracing.span(f'section.{section.kind}'):
+            return generate(section)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sections)),
+                            thread_name_prefix='resume-section') as executor:
+        futures = {executor.submit(call, section): section for section in sections}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()
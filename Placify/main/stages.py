@@ -0,0 +1,153 @@
+"""Stage records for incremental resume regeneration.
+
+The resume pipeline has two stages:
+
+* ``analysis``: the job description analysis (one LLM call);
+* ``resume``: writing and reviewing the resume. By default the sections are
+  written concurrently, each recorded as a stage of its own (see
+  main/sections.py), and merged for one review call. In tweak mode a single
+  call revises only the changed sections of the previous resume.
+
+Each stage a generation runs is stored as a ``PipelineStage`` row, holding a
+digest of the inputs the stage depends on and its output. A resubmission from
+the result page points at the generation it edits (``ResumeGeneration.parent``).
+Any stage whose input digest is unchanged reuses the recorded output instead
+of calling the LLM. Editing only the skills or one experience entry therefore
+skips the analysis and regenerates only that section.
+"""
+import time
+
+from django.db.models import Count, Q, Sum
+
+from . import resume_cache, tracing
+from .models import PipelineStage, ResumeGeneration
+
+STAGE_ANALYSIS = 'analysis'
+STAGE_RESUME = 'resume'
+
+# Form fields grouped by the resume section they feed. The job target fields
+# are not listed: changing them changes the analysis, so the resume is then
+# rewritten in full even in tweak mode.
+SECTIONS = {
+    'contact': ['full_name', 'email', 'phone', 'location', 'linkedin', 'portfolio'],
+    'summary': ['current_summary', 'years_experience', 'career_level'],
+    'experience': ['experience_data'],
+    'education': ['education_data'],
+    'skills': ['technical_skills', 'soft_skills'],
+    'projects': ['projects_data'],
+    'certifications': ['certifications'],
+    'additional': ['languages', 'achievements', 'additional_info'],
+}
+TARGET_FIELDS = ['job_description', 'target_position', 'target_industry']
+
+
+def analysis_digest(user_data):
+    return resume_cache.digest(resume_cache.canonical_posting(user_data))
+
+
+def resume_digest(user_data):
+    return resume_cache.digest(resume_cache.canonical_submission(user_data))
+
+
+def changed_sections(previous_data, user_data):
+    """Sections whose fields differ between two submissions
+
+    Returns None when the job target changed, since every section then has to
+    be rewritten against the new analysis.
+    """
+    old = resume_cache.canonical_submission(previous_data)
+    new = resume_cache.canonical_submission(user_data)
+    if any(old[field] != new[field] for field in TARGET_FIELDS):
+        return None
+    return [name for name, fields in SECTIONS.items() if any(old[f] != new[f] for f in fields)]
+
+
+def section_inputs(user_data, sections):
+    """The form fields behind ``sections``, for the tweak prompt"""
+    return {field: user_data.get(field) for name in sections for field in SECTIONS[name]}
+
+
+class StageRecorder:
+    """Looks up reusable stage outputs for a generation and records new ones
+
+    Outputs are reused from an earlier attempt of the same generation and,
+    unless the user asked to regenerate from scratch, from its parent. A
+    recorder without a generation reuses and records nothing.
+    """
+
+    def __init__(self, generation=None):
+        self.generation = generation
+        self.parent = None
+        if generation is not None and generation.parent_id and not generation.form_data.get('bypass_cache'):
+            parent = generation.parent
+            if parent.status == ResumeGeneration.STATUS_DONE:
+                self.parent = parent
+
+    def reusable(self, name, input_digest):
+        """Output previously recorded for this stage with the same inputs, or None"""
+        if self.generation is None:
+            return None
+        sources = [self.generation.pk] + ([self.parent.pk] if self.parent else [])
+        stage = (
+            PipelineStage.objects
+            .filter(resume_generation_id__in=sources, name=name, input_digest=input_digest)
+            .only('output')
+            .first()
+        )
+        return stage.output if stage else None
+
+    def record(self, name, input_digest, output, llm_calls=0, reused=False, sections=(), duration=0.0):
+        if self.generation is None:
+            return
+        PipelineStage.objects.update_or_create(
+            resume_generation=self.generation,
+            name=name,
+            defaults={
+                'input_digest': input_digest,
+                'output': output,
+                'sections': list(sections),
+                'llm_calls': llm_calls,
+                'reused': reused,
+                'duration': duration,
+            },
+        )
+
+    def run(self, name, input_digest, compute, sections=()):
+        """Reuse the recorded output for ``input_digest``, or record ``compute()``
+
+        ``compute`` returns ``(output, llm_calls)``. Returns ``(output, reused)``.
+        """
+        started = time.perf_counter()
+        with tracing.span(f'stage.{name}'):
+            output = self.reusable(name, input_digest)
+            reused = output is not None
+            llm_calls = 0
+            if not reused:
+                output, llm_calls = compute()
+        self.record(name, input_digest, output, llm_calls=llm_calls, reused=reused,
+                    sections=sections, duration=time.perf_counter() - started)
+        return output, reused
+
+    def tweak_sections(self, user_data):
+        """Sections to revise in tweak mode, or None when a full rewrite is needed"""
+        if self.parent is None or not user_data.get('tweak') or not self.parent.generated_resume:
+            return None
+        sections = changed_sections(self.parent.form_data, user_data)
+        return sections or None
+
+    def record_cached(self, user_data, analysis, resume):
+        """Record both stages for a generation answered from the resume cache"""
+        self.record(STAGE_ANALYSIS, analysis_digest(user_data), analysis, reused=True)
+        self.record(STAGE_RESUME, resume_digest(user_data), resume, reused=True)
+
+
+def stage_stats():
+    """LLM calls made and stage runs avoided, across all recorded stages"""
+    totals = PipelineStage.objects.aggregate(
+        runs=Count('id'),
+        reused=Count('id', filter=Q(reused=True)),
+        tweaks=Count('id', filter=~Q(sections=[])),
+        llm_calls=Sum('llm_calls'),
+    )
+    totals['llm_calls'] = totals['llm_calls'] or 0
+    return totals
@@ -0,0 +1,94 @@
+// Live job description analysis. Requests wait for a pause in typing, and
+// after the first one carry only the lines changed since the text the
+// server last analysed (see main/live_analysis.py).
+(function () {
+    const textarea = document.getElementById('job_description');
+    const panel = document.getElementById('jd-analysis');
+    const url = textarea.dataset.analyzeUrl;
+    const DEBOUNCE_MS = 600;
+    const doc = Array.from(crypto.getRandomValues(new Uint32Array(4)), n => n.toString(16)).join('-');
+    const CRC_TABLE = Array.from({length: 256}, (_, n) => {
+        for (let k = 0; k < 8; k++) n = n & 1 ? 0xedb88320 ^ (n >>> 1) : n >>> 1;
+        return n >>> 0;
+    });
+    let analysed = null;  // the text the server holds, and its hash
+    let analysedHash = null;
+    let timer = null;
+    let busy = false;
+
+    function crc32(text) {
+        let crc = 0xffffffff;
+        for (const byte of new TextEncoder().encode(text)) crc = CRC_TABLE[(crc ^ byte) & 0xff] ^ (crc >>> 8);
+        return (crc ^ 0xffffffff) >>> 0;
+    }
+
+    function changedLines(before, after) {
+        // One range of lines covering every difference between the texts
+        const old = before.split('\n'), lines = after.split('\n');
+        let start = 0, end = old.length, stop = lines.length;
+        while (start < end && start < stop && old[start] === lines[start]) start++;
+        while (end > start && stop > start && old[end - 1] === lines[stop - 1]) { end--; stop--; }
+        return {start: start, end: end, lines: lines.slice(start, stop)};
+    }
+
+    function schedule(delay) {
+        clearTimeout(timer);
+        timer = setTimeout(analyse, delay);
+    }
+
+    function show(data) {
+        document.getElementById('jd-score').textContent = data.estimated_score;
+        document.getElementById('jd-keyword-count').textContent = data.estimated_keywords;
+        const list = document.getElementById('jd-keywords');
+        list.replaceChildren(...data.analysis.keywords.map(keyword => {
+            const item = document.createElement('span');
+            item.textContent = keyword;
+            return item;
+        }));
+        panel.hidden = false;
+    }
+
+    async function analyse() {
+        const text = textarea.value;
+        if (busy || text === analysed) {
+            if (busy) schedule(DEBOUNCE_MS);
+            return;
+        }
+        if (!text.trim()) {
+            panel.hidden = true;
+            return;
+        }
+        const body = analysed === null
+            ? {doc: doc, job_description: text}
+            : {doc: doc, base: analysedHash, hash: crc32(text), changes: [changedLines(analysed, text)]};
+        busy = true;
+        try {
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify(body),
+            });
+            if (response.status === 409) {
+                // The server lost track of the text; send all of it
+                analysed = null;
+                schedule(0);
+            } else if (response.status === 429) {
+                schedule(1000 * (parseInt(response.headers.get('Retry-After'), 10) || 5));
+            } else {
+                const data = await response.json();
+                if (data.success) {
+                    analysed = text;
+                    analysedHash = data.hash;
+                    show(data);
+                }
+            }
+        } catch (error) {
+            // Offline or failed: the next edit tries again
+        } finally {
+            busy = false;
+        }
+    }
+
+    textarea.addEventListener('input', () => schedule(DEBOUNCE_MS));
+    if (textarea.value.trim()) schedule(0);
+})();
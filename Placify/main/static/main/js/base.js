@@ -0,0 +1,90 @@
+function toggleUserDropdown() {
+    const dropdown = document.getElementById('userDropdown');
+    dropdown.classList.toggle('open');
+}
+
+function toggleMobileMenu() {
+    const overlay = document.getElementById('mobileNavOverlay');
+    const icon = document.querySelector('.mobile-menu i');
+
+    overlay.classList.toggle('open');
+
+    if (overlay.classList.contains('open')) {
+        icon.classList.remove('fa-bars');
+        icon.classList.add('fa-times');
+        document.body.style.overflow = 'hidden';
+    } else {
+        icon.classList.remove('fa-times');
+        icon.classList.add('fa-bars');
+        document.body.style.overflow = '';
+    }
+}
+
+function closeMobileMenu() {
+    const overlay = document.getElementById('mobileNavOverlay');
+    const icon = document.querySelector('.mobile-menu i');
+
+    overlay.classList.remove('open');
+    icon.classList.remove('fa-times');
+    icon.classList.add('fa-bars');
+    document.body.style.overflow = '';
+}
+
+// Close dropdown when clicking outside
+document.addEventListener('click', function(event) {
+    const dropdown = document.getElementById('userDropdown');
+    const mobileOverlay = document.getElementById('mobileNavOverlay');
+
+    // Close user dropdown if clicking outside
+    if (dropdown) {
+        const isClickInsideDropdown = dropdown.contains(event.target);
+        if (!isClickInsideDropdown && dropdown.classList.contains('open')) {
+            dropdown.classList.remove('open');
+        }
+    }
+
+    // Close mobile menu if clicking outside
+    if (mobileOverlay && mobileOverlay.classList.contains('open')) {
+        const isClickInsideMobileMenu = event.target.closest('.mobile-menu') || 
+                                      event.target.closest('.mobile-nav-overlay');
+        if (!isClickInsideMobileMenu) {
+            closeMobileMenu();
+        }
+    }
+});
+
+// Close dropdown and mobile menu on escape key
+document.addEventListener('keydown', function(event) {
+    if (event.key === 'Escape') {
+        const dropdown = document.getElementById('userDropdown');
+        const mobileOverlay = document.getElementById('mobileNavOverlay');
+
+        if (dropdown && dropdown.classList.contains('open')) {
+            dropdown.classList.remove('open');
+        }
+
+        if (mobileOverlay && mobileOverlay.classList.contains('open')) {
+            closeMobileMenu();
+        }
+    }
+});
+
+// Handle window resize
+window.addEventListener('resize', function() {
+    const mobileOverlay = document.getElementById('mobileNavOverlay');
+
+    // Close mobile menu if window is resized to desktop view
+    if (window.innerWidth > 768 && mobileOverlay.classList.contains('open')) {
+        closeMobileMenu();
+    }
+});
+
+// Prevent body scroll when mobile menu is open
+document.addEventListener('touchmove', function(event) {
+    const mobileOverlay = document.getElementById('mobileNavOverlay');
+    if (mobileOverlay && mobileOverlay.classList.contains('open')) {
+        if (!event.target.closest('.mobile-nav-overlay')) {
+            event.preventDefault();
+        }
+    }
+}, { passive: false });
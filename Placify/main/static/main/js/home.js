@@ -0,0 +1,251 @@
+// Enhanced notification system
+function showNotification(message, type = 'info') {
+    const notification = document.getElementById('notification');
+    const title = document.getElementById('notificationTitle');
+    const text = document.getElementById('notificationText');
+
+    const titles = {
+        success: 'Success',
+        info: 'Information',
+        warning: 'Alert',
+        error: 'Error'
+    };
+
+    const colors = {
+        success: '#10b981',
+        info: '#8b5cf6',
+        warning: '#f59e0b',
+        error: '#ef4444'
+    };
+
+    title.textContent = titles[type] || 'Notification';
+    text.textContent = message;
+    notification.querySelector('i').style.color = colors[type] || '#8b5cf6';
+    notification.classList.add('show');
+
+    setTimeout(() => {
+        notification.classList.remove('show');
+    }, 4000);
+}
+
+// Enhanced chat function
+function openChat() {
+    showNotification('AI Assistant ready to help! Connect with our career experts.', 'success');
+}
+
+// Smooth scrolling for navigation
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+    anchor.addEventListener('click', function (e) {
+        e.preventDefault();
+        const target = document.querySelector(this.getAttribute('href'));
+        if (target) {
+            target.scrollIntoView({
+                behavior: 'smooth',
+                block: 'start'
+            });
+        }
+    });
+});
+
+// Enhanced navbar scroll effect
+window.addEventListener('scroll', function() {
+    const navbar = document.querySelector('.navbar');
+    const scrolled = window.pageYOffset;
+
+    if (scrolled > 50) {
+        navbar.style.background = 'rgba(10, 10, 15, 0.98)';
+        navbar.style.borderBottom = '1px solid rgba(139, 92, 246, 0.3)';
+    } else {
+        navbar.style.background = 'rgba(10, 10, 15, 0.95)';
+        navbar.style.borderBottom = '1px solid rgba(139, 92, 246, 0.1)';
+    }
+});
+
+// Animate stats on scroll
+const animateStats = () => {
+    const stats = document.querySelectorAll('.stat-item h3');
+    stats.forEach(stat => {
+        const finalValue = stat.textContent;
+        const numValue = parseInt(finalValue.replace(/[^\d]/g, ''));
+        let currentValue = 0;
+        const increment = numValue / 80;
+
+        const timer = setInterval(() => {
+            currentValue += increment;
+            if (currentValue >= numValue) {
+                currentValue = numValue;
+                clearInterval(timer);
+            }
+
+            if (finalValue.includes('%')) {
+                stat.textContent = Math.floor(currentValue) + '%';
+            } else if (finalValue.includes('+')) {
+                stat.textContent = Math.floor(currentValue).toLocaleString() + '+';
+            } else {
+                stat.textContent = Math.floor(currentValue).toLocaleString();
+            }
+        }, 30);
+    });
+};
+
+// Advanced scroll animations
+const observerOptions = {
+    threshold: 0.1,
+    rootMargin: '0px 0px -50px 0px'
+};
+
+const observer = new IntersectionObserver((entries) => {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) {
+            if (entry.target.classList.contains('stats')) {
+                animateStats();
+            }
+
+            if (entry.target.classList.contains('animate-on-scroll')) {
+                entry.target.classList.add('animated');
+            }
+        }
+    });
+}, observerOptions);
+
+// Observe all animated elements
+document.querySelectorAll('.animate-on-scroll, .stats').forEach(element => {
+    observer.observe(element);
+});
+
+// Mobile menu functionality
+const mobileMenu = document.querySelector('.mobile-menu');
+const navLinks = document.querySelector('.nav-links');
+
+mobileMenu.addEventListener('click', () => {
+    const isVisible = navLinks.style.display === 'flex';
+    navLinks.style.display = isVisible ? 'none' : 'flex';
+
+    if (!isVisible) {
+        navLinks.style.position = 'fixed';
+        navLinks.style.top = '80px';
+        navLinks.style.left = '0';
+        navLinks.style.width = '100%';
+        navLinks.style.background = 'rgba(10, 10, 15, 0.98)';
+        navLinks.style.flexDirection = 'column';
+        navLinks.style.padding = '2rem';
+        navLinks.style.backdropFilter = 'blur(20px)';
+        navLinks.style.border = '1px solid rgba(139, 92, 246, 0.2)';
+    } else {
+        navLinks.style.position = '';
+        navLinks.style.top = '';
+        navLinks.style.left = '';
+        navLinks.style.width = '';
+        navLinks.style.background = '';
+        navLinks.style.flexDirection = '';
+        navLinks.style.padding = '';
+        navLinks.style.backdropFilter = '';
+        navLinks.style.border = '';
+    }
+});
+
+// Enhanced parallax effects
+window.addEventListener('scroll', () => {
+    const scrolled = window.pageYOffset;
+    const parallaxElements = document.querySelectorAll('.floating-orbs');
+
+    parallaxElements.forEach(element => {
+        const speed = element.dataset.speed || 0.5;
+        element.style.transform = `translateY(${scrolled * speed}px)`;
+    });
+});
+
+// Interactive card effects
+document.querySelectorAll('.preview-card, .feature-card, .tool-card').forEach(card => {
+    card.addEventListener('mouseenter', function() {
+        this.style.transform = 'translateY(-8px) scale(1.02)';
+    });
+
+    card.addEventListener('mouseleave', function() {
+        this.style.transform = 'translateY(0) scale(1)';
+    });
+});
+
+// Welcome sequence
+window.addEventListener('load', () => {
+    setTimeout(() => {
+        showNotification('Welcome to the future of career development!', 'success');
+    }, 1500);
+
+    // Add staggered animations to hero elements
+    const heroElements = document.querySelectorAll('.hero-text > *');
+    heroElements.forEach((element, index) => {
+        element.style.opacity = '0';
+        element.style.transform = 'translateY(30px)';
+
+        setTimeout(() => {
+            element.style.transition = 'all 0.6s ease';
+            element.style.opacity = '1';
+            element.style.transform = 'translateY(0)';
+        }, index * 200);
+    });
+});
+
+// Dynamic background effects
+function createFloatingParticles() {
+    const hero = document.querySelector('.hero');
+    for (let i = 0; i < 5; i++) {
+        const particle = document.createElement('div');
+        particle.style.position = 'absolute';
+        particle.style.width = Math.random() * 4 + 2 + 'px';
+        particle.style.height = particle.style.width;
+        particle.style.background = 'rgba(139, 92, 246, 0.3)';
+        particle.style.borderRadius = '50%';
+        particle.style.top = Math.random() * 100 + '%';
+        particle.style.left = Math.random() * 100 + '%';
+        particle.style.animation = `float ${Math.random() * 3 + 4}s ease-in-out infinite`;
+        particle.style.animationDelay = Math.random() * 2 + 's';
+        hero.appendChild(particle);
+    }
+}
+
+createFloatingParticles();
+
+// Enhanced tool interactions
+document.querySelectorAll('.tool-btn').forEach(btn => {
+    btn.addEventListener('click', function() {
+        // Add ripple effect
+        const ripple = document.createElement('span');
+        const rect = this.getBoundingClientRect();
+        const size = Math.max(rect.width, rect.height);
+        const x = event.clientX - rect.left - size / 2;
+        const y = event.clientY - rect.top - size / 2;
+
+        ripple.style.width = ripple.style.height = size + 'px';
+        ripple.style.left = x + 'px';
+        ripple.style.top = y + 'px';
+        ripple.style.position = 'absolute';
+        ripple.style.borderRadius = '50%';
+        ripple.style.background = 'rgba(255, 255, 255, 0.3)';
+        ripple.style.transform = 'scale(0)';
+        ripple.style.animation = 'ripple 0.6s linear';
+        ripple.style.pointerEvents = 'none';
+
+        this.style.position = 'relative';
+        this.style.overflow = 'hidden';
+        this.appendChild(ripple);
+
+        setTimeout(() => {
+            ripple.remove();
+        }, 600);
+    });
+});
+
+// Add ripple animation
+const style = document.createElement('style');
+style.textContent = `
+    @keyframes ripple {
+        to {
+            transform: scale(4);
+            opacity: 0;
+        }
+    }
+`;
+document.head.appendChild(style);
+
+console.log('Placify Modern UI Loaded Successfully! 🚀');
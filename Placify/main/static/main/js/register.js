@@ -0,0 +1,100 @@
+function togglePassword(inputId, eyeId) {
+    const passwordInput = document.getElementById(inputId);
+    const passwordEye = document.getElementById(eyeId);
+
+    if (passwordInput.type === 'password') {
+        passwordInput.type = 'text';
+        passwordEye.className = 'fas fa-eye-slash';
+    } else {
+        passwordInput.type = 'password';
+        passwordEye.className = 'fas fa-eye';
+    }
+}
+
+// Password strength checker
+function checkPasswordStrength(password) {
+    let strength = 0;
+    let feedback = [];
+
+    if (password.length >= 8) strength += 1;
+    else feedback.push('At least 8 characters');
+
+    if (password.match(/[a-z]/)) strength += 1;
+    else feedback.push('Lowercase letter');
+
+    if (password.match(/[A-Z]/)) strength += 1;
+    else feedback.push('Uppercase letter');
+
+    if (password.match(/[0-9]/)) strength += 1;
+    else feedback.push('Number');
+
+    if (password.match(/[^a-zA-Z0-9]/)) strength += 1;
+    else feedback.push('Special character');
+
+    return { strength, feedback };
+}
+
+// Username validation
+function validateUsername(username) {
+    const regex = /^[a-zA-Z0-9_]{3,20}$/;
+    return regex.test(username);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const passwordInput = document.getElementById('password');
+    const strengthFill = document.getElementById('strength-fill');
+    const strengthText = document.getElementById('strength-text');
+    const usernameInput = document.getElementById('username');
+    const usernameValidation = document.getElementById('username-validation');
+
+    // Password strength indicator
+    passwordInput.addEventListener('input', function() {
+        const password = this.value;
+        const { strength, feedback } = checkPasswordStrength(password);
+
+        const percentage = (strength / 5) * 100;
+        strengthFill.style.width = percentage + '%';
+
+        let color = '#ef4444';
+        let text = 'Weak';
+
+        if (strength >= 4) {
+            color = '#10b981';
+            text = 'Strong';
+        } else if (strength >= 3) {
+            color = '#f59e0b';
+            text = 'Good';
+        } else if (strength >= 2) {
+            color = '#f97316';
+            text = 'Fair';
+        }
+
+        strengthFill.style.background = `linear-gradient(90deg, ${color}, ${color}dd)`;
+        strengthText.textContent = password.length > 0 ? `${text} password` : 'Password strength';
+        strengthText.style.color = color;
+    });
+
+    // Username validation
+    usernameInput.addEventListener('input', function() {
+        const username = this.value;
+        const validation = document.querySelector('#username-validation');
+
+        if (username.length > 0 && validateUsername(username)) {
+            validation.classList.add('show');
+        } else {
+            validation.classList.remove('show');
+        }
+    });
+
+    // Add focus effects to inputs
+    const inputs = document.querySelectorAll('.form-input');
+    inputs.forEach(input => {
+        input.addEventListener('focus', function() {
+            this.parentElement.parentElement.classList.add('focused');
+        });
+
+        input.addEventListener('blur', function() {
+            this.parentElement.parentElement.classList.remove('focused');
+        });
+    });
+});
@@ -0,0 +1,105 @@
+function copyResumeText() {
+    const resumeText = document.getElementById('resumeText').textContent;
+
+    // Create a temporary textarea element
+    const tempTextArea = document.createElement('textarea');
+    tempTextArea.value = resumeText;
+    document.body.appendChild(tempTextArea);
+
+    // Select and copy the text
+    tempTextArea.select();
+    tempTextArea.setSelectionRange(0, 99999); // For mobile devices
+
+    try {
+        document.execCommand('copy');
+
+        // Show success feedback
+        const copyButtons = document.querySelectorAll('.copy-btn');
+        copyButtons.forEach(btn => {
+            const originalText = btn.innerHTML;
+            btn.innerHTML = '<i class="fas fa-check"></i> Copied!';
+            btn.style.background = '#27ae60';
+
+            setTimeout(() => {
+                btn.innerHTML = originalText;
+                btn.style.background = '#f39c12';
+            }, 2000);
+        });
+
+    } catch (err) {
+        console.error('Failed to copy text: ', err);
+        alert('Failed to copy text. Please select and copy manually.');
+    }
+
+    // Remove the temporary element
+    document.body.removeChild(tempTextArea);
+}
+
+// Calculate actual word count on page load
+document.addEventListener('DOMContentLoaded', function() {
+    const resumeText = document.getElementById('resumeText').textContent;
+    const wordCount = resumeText.trim().split(/\s+/).length;
+    document.getElementById('wordCount').textContent = wordCount;
+
+    // Count sections (basic estimation)
+    const sectionKeywords = ['EXPERIENCE', 'EDUCATION', 'SKILLS', 'SUMMARY', 'PROJECTS', 'CERTIFICATIONS'];
+    let sectionCount = 0;
+    sectionKeywords.forEach(keyword => {
+        if (resumeText.toUpperCase().includes(keyword)) {
+            sectionCount++;
+        }
+    });
+    document.getElementById('sectionCount').textContent = Math.max(sectionCount, 5);
+});
+
+// Print functionality
+function printResume() {
+    window.print();
+}
+
+// Add print button if needed
+const actionButtons = document.querySelector('.action-buttons div:first-child');
+if (actionButtons) {
+    const printBtn = document.createElement('button');
+    printBtn.className = 'btn btn-secondary';
+    printBtn.innerHTML = '<i class="fas fa-print"></i> Print Resume';
+    printBtn.onclick = printResume;
+    actionButtons.appendChild(printBtn);
+}
+
+
+
+try {
+    localStorage.setItem('lastGeneratedResume', JSON.stringify({
+        content: resumeContent,
+        userData: userData,
+        timestamp: new Date().toISOString()
+    }));
+} catch (e) {
+    console.warn('Could not save to localStorage:', e);
+}
+
+// Show tips based on resume length
+document.addEventListener('DOMContentLoaded', function() {
+    const wordCount = document.getElementById('wordCount').textContent;
+    const tipsSection = document.querySelector('.tips-section');
+
+    if (parseInt(wordCount) < 200) {
+        const shortResumeWarning = document.createElement('div');
+        shortResumeWarning.className = 'tips-section';
+        shortResumeWarning.style.background = '#fff3cd';
+        shortResumeWarning.style.borderLeftColor = '#ffc107';
+        shortResumeWarning.innerHTML = `
+            <div class="tips-title" style="color: #856404;">
+                <i class="fas fa-exclamation-triangle"></i> Resume Length Notice
+            </div>
+            <ul class="tips-list">
+                <li>Your resume appears shorter than typical</li>
+                <li>Consider adding more detail to experiences</li>
+                <li>Include quantified achievements</li>
+                <li>Add relevant projects or certifications</li>
+            </ul>
+        `;
+        tipsSection.parentNode.insertBefore(shortResumeWarning, tipsSection);
+    }
+});
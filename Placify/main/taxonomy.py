@@ -0,0 +1,128 @@
+"""Skill taxonomy compiled into the keyword extractor.
+
+Skills and their aliases live in the ``Skill`` model. Each process compiles
+them once into a ``KeywordExtractor`` whose technology matches carry the
+canonical ``Skill.pk``, so "JS" and "JavaScript" both report the same id.
+
+Edits are picked up without restarting workers: saving or deleting a ``Skill``
+marks this process's extractor stale, and other processes notice the change
+through a cheap version query (skill count and latest ``updated_at``, which
+``QuerySet.update`` stamps too) run at most every
+``SKILL_TAXONOMY_CHECK_INTERVAL`` seconds. The replacement is compiled in full
+before it is swapped in, and callers keep using the previous extractor until
+then.
+"""
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .keywords import KeywordExtractor, default_extractor
+from .models import Skill
+
+_extractor = None
+_version = None
+_stale = True
+_last_check = 0.0
+_rebuild_lock = threading.Lock()
+
+
+def _current_version():
+    stats = Skill.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+    return stats['count'], stats['latest']
+
+
+def build_extractor():
+    """Compile every skill name and alias into a fresh extractor"""
+    terms = []
+    term_ids = {}
+    for pk, name, aliases in Skill.objects.values_list('pk', 'name', 'aliases'):
+        for term in [name, *(aliases or [])]:
+            term = term.strip()
+            if term and term not in term_ids:
+                terms.append(term)
+                term_ids[term] = pk
+    return KeywordExtractor(tech_terms=terms, term_ids=term_ids)
+
+
+def skill_names(skill_ids):
+    """Canonical names for a list of skill ids, in the same order"""
+    names = dict(Skill.objects.filter(pk__in=skill_ids).values_list('pk', 'name'))
+    return [names[pk] for pk in skill_ids if pk in names]
+
+
+async def askill_names(skill_ids):
+    """``skill_names`` for async views"""
+    names = {pk: name async for pk, name in Skill.objects.filter(pk__in=skill_ids).values_list('pk', 'name')}
+    return [names[pk] for pk in skill_ids if pk in names]
+
+
+def _needs_rebuild():
+    global _last_check, _stale
+    if _stale or _extractor is None:
+        return True
+    interval = getattr(settings, 'SKILL_TAXONOMY_CHECK_INTERVAL', 30)
+    if time.monotonic() - _last_check < interval:
+        return False
+    _last_check = time.monotonic()
+    if _current_version() != _version:
+        _stale = True
+    return _stale
+
+
+def get_extractor() -> KeywordExtractor:
+    """The compiled taxonomy for this process, rebuilt if the skills changed"""
+    global _extractor, _version, _stale, _last_check
+    if not _needs_rebuild():
+        return _extractor
+
+    # One thread rebuilds while the others carry on with the current extractor.
+    if not _rebuild_lock.acquire(blocking=_extractor is None):
+        return _extractor
+    try:
+        if _stale or _extractor is None:
+            # Cleared before building so an edit made meanwhile is not lost.
+            _stale = False
+            try:
+                version = _current_version()
+                extractor = build_extractor() if version[0] else default_extractor()
+            except Exception:
+                _stale = True
+                raise
+            _extractor, _version = extractor, version
+            _last_check = time.monotonic()
+    finally:
+        _rebuild_lock.release()
+    return _extractor
+
+
+async def aget_extractor() -> KeywordExtractor:
+    """``get_extractor`` for async views
+
+    Between version checks the current extractor is returned straight away;
+    only a check or a rebuild runs in a thread.
+    """
+    interval = getattr(settings, 'SKILL_TAXONOMY_CHECK_INTERVAL', 30)
+    if not _stale and _extractor is not None and time.monotonic() - _last_check < interval:
+        return _extractor
+    return await sync_to_async(get_extractor)()
+
+
+def version():
+    """Skill count and last change the current extractor was compiled from"""
+    return _version
+
+
+def invalidate():
+    global _stale
+    _stale = True
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def _skill_changed(sender, **kwargs):
+    invalidate()
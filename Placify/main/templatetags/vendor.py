@@ -0,0 +1,28 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+register = template.Library()
+
+FONT_AWESOME = 'main/vendor/fontawesome/css/all.min.css'
+FONT_AWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css'
+
+
+@lru_cache(maxsize=None)
+def _vendored(path):
+    return finders.find(path) is not None
+
+
+@register.simple_tag
+def font_awesome():
+    """Stylesheet link to the copy ``manage.py vendor_assets`` keeps in main/static, falling back to the CDN"""
+    if not _vendored(FONT_AWESOME):
+        return format_html('<link href="{}" rel="stylesheet">', FONT_AWESOME_CDN)
+    # The browser switches to the CDN if the copy on this site fails to load
+    return format_html(
+        '<link href="{}" rel="stylesheet" onerror="this.onerror=null;this.href=\'{}\'">',
+        static(FONT_AWESOME), FONT_AWESOME_CDN,
+    )
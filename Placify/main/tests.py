@@ -1,3 +1,1488 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import os
+import pathlib
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from contextlib import contextmanager
+from datetime import timedelta
+from importlib.util import find_spec
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.auth.signals import user_login_failed
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import (agent_pool, batch_analysis, checks, export, jobs, live_analysis, matching, metrics, page_cache,
+               progress, prompts, ratelimit, resume_cache, scoring, search, sections, stages, taxonomy, tracing, views)
+from .keywords import DEFAULT_TECH_TERMS, LineIndex, default_extractor
+from .loadtest import LoadTest, format_report, percentile
+from .management.commands import bench_asgi, bench_keyword_extraction, bench_live_analysis, bench_startup
+from .models import ATSAnalysis, ResumeGeneration, Skill
+from .templatetags import vendor
+
+try:
+    from .mock_llm import MockLLM, MockLLMError, mock_response
+except ImportError:  # LangChain is only needed by the tests that drive the mock LLM
+    MockLLM = None
+
+FAST_MOCK = {'latency': 0.0, 'tokens_per_second': 0, 'response_tokens': 120, 'failure_rate': 0.0, 'seed': 0}
+
+
+class FailingAgent:
+    def create_optimized_resume(self, user_data, recorder):
+        raise RuntimeError('LLM unavailable')
+
+
+@contextmanager
+def failing_checkout():
+    yield FailingAgent()
+
+
+@override_settings(RESUME_WORKERS_IN_PROCESS=False, RESUME_JOB_MAX_ATTEMPTS=2, RESUME_JOB_RETRY_BACKOFF=5)
+class JobQueueTests(TestCase):
+    def _job(self, **fields):
+        return ResumeGeneration.objects.create(form_data={}, **fields)
+
+    def test_claims_the_oldest_runnable_job_once(self):
+        now = timezone.now()
+        newer = self._job(available_at=now - timedelta(seconds=10))
+        older = self._job(available_at=now - timedelta(seconds=20))
+        self._job(available_at=now + timedelta(minutes=5))
+
+        claimed = jobs.claim_next()
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (older.pk, ResumeGeneration.STATUS_RUNNING, 1))
+        self.assertEqual(jobs.claim_next().pk, newer.pk)
+        # The third job is not due yet
+        self.assertIsNone(jobs.claim_next())
+
+    def test_claim_skips_a_row_another_worker_took(self):
+        job = self._job()
+        queryset_class = type(ResumeGeneration.objects.all())
+        update = queryset_class.update
+
+        def claimed_elsewhere_first(queryset, **fields):
+            # Another worker's UPDATE lands between this worker's SELECT and UPDATE
+            update(ResumeGeneration.objects.filter(pk=job.pk), status=ResumeGeneration.STATUS_RUNNING)
+            return update(queryset, **fields)
+
+        with mock.patch.object(queryset_class, 'update', claimed_elsewhere_first):
+            self.assertIsNone(jobs.claim_next())
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 0)
+
+    def test_failures_back_off_then_fail(self):
+        self.assertEqual([jobs.retry_delay(attempts) for attempts in (1, 2, 3)], [5, 10, 20])
+        job = self._job()
+        with mock.patch.object(jobs.agent_pool, 'checkout', failing_checkout), self.assertLogs('main.jobs', 'ERROR'):
+            before = timezone.now()
+            self.assertFalse(jobs.run_job(jobs.claim_next()))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.error), (ResumeGeneration.STATUS_PENDING, 'LLM unavailable'))
+            self.assertGreaterEqual(job.available_at, before + timedelta(seconds=5))
+            self.assertIsNone(jobs.claim_next())
+
+            ResumeGeneration.objects.filter(pk=job.pk).update(available_at=timezone.now())
+            self.assertFalse(jobs.run_job(jobs.claim_next()))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ResumeGeneration.STATUS_FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_stale_jobs_are_requeued_until_out_of_attempts(self):
+        long_ago = timezone.now() - timedelta(hours=1)
+        crashed = self._job(status=ResumeGeneration.STATUS_RUNNING, started_at=long_ago, attempts=1)
+        crashing = self._job(status=ResumeGeneration.STATUS_RUNNING, started_at=long_ago, attempts=2)
+        running = self._job(status=ResumeGeneration.STATUS_RUNNING, started_at=timezone.now(), attempts=2)
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+        statuses = dict(ResumeGeneration.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {crashed.pk: ResumeGeneration.STATUS_PENDING,
+                                    crashing.pk: ResumeGeneration.STATUS_FAILED,
+                                    running.pk: ResumeGeneration.STATUS_RUNNING})
+        self.assertEqual([event['event'] for _, event in progress.read(crashing.pk)], ['failed'])
+
+    def test_long_jobs_with_a_heartbeat_are_not_requeued(self):
+        long_ago = timezone.now() - timedelta(hours=1)
+        job = self._job(status=ResumeGeneration.STATUS_RUNNING, started_at=long_ago, heartbeat_at=timezone.now(),
+                        attempts=1)
+
+        self.assertEqual(jobs.requeue_stale(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ResumeGeneration.STATUS_RUNNING)
+
+    def test_a_requeued_attempt_cannot_overwrite_its_successor(self):
+        job = self._job()
+
+        class OvertakenAgent:
+            def create_optimized_resume(self, user_data, recorder):
+                # The job is requeued and claimed again while this attempt runs
+                ResumeGeneration.objects.filter(pk=job.pk).update(attempts=F('attempts') + 1)
+                return 'Outdated resume'
+
+        @contextmanager
+        def overtaken_checkout():
+            yield OvertakenAgent()
+
+        with mock.patch.object(jobs.agent_pool, 'checkout', overtaken_checkout), self.assertLogs('main.jobs', 'WARNING'):
+            self.assertFalse(jobs.run_job(jobs.claim_next()))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.generated_resume), (ResumeGeneration.STATUS_RUNNING, 2, ''))
+        self.assertNotIn('done', [event['event'] for _, event in progress.read(job.pk)])
+
+
+@override_settings(RESUME_WORKERS_IN_PROCESS=False, RESUME_JOB_HEARTBEAT_INTERVAL=0.05)
+class JobHeartbeatTests(TransactionTestCase):
+    def test_running_jobs_keep_their_heartbeat_fresh(self):
+        job = ResumeGeneration.objects.create(form_data={})
+        claimed = jobs.claim_next()
+        beats = []
+
+        class SlowAgent:
+            def create_optimized_resume(self, user_data, recorder):
+                deadline = time.monotonic() + 5
+                while len(set(beats)) < 3 and time.monotonic() < deadline:
+                    beats.append(ResumeGeneration.objects.values_list('heartbeat_at', flat=True).get(pk=job.pk))
+                    time.sleep(0.02)
+                return 'Resume'
+
+        @contextmanager
+        def slow_checkout():
+            yield SlowAgent()
+
+        with mock.patch.object(jobs.agent_pool, 'checkout', slow_checkout):
+            self.assertTrue(jobs.run_job(claimed))
+        self.assertGreaterEqual(len(set(beats)), 3)
+        self.assertEqual(beats, sorted(beats))
+
+
+class AgentPoolTests(SimpleTestCase):
+    def test_reuses_instances_and_bounds_checkouts(self):
+        pool = agent_pool.AgentPool(object, 1)
+        with pool.checkout() as first:
+            pass
+        with pool.checkout() as second:
+            self.assertIs(second, first)
+            with self.assertRaises(TimeoutError), pool.checkout(timeout=0.01):
+                pass
+        self.assertEqual(pool.stats(), {'size': 1, 'idle': 1, 'created': 1, 'discarded': 0})
+
+    def test_an_error_discards_instances_sharing_the_client(self):
+        pool = agent_pool.AgentPool(object, 2)
+        with mock.patch.object(agent_pool, 'reset_llm') as reset_llm:
+            with pool.checkout() as healthy:
+                with self.assertRaises(RuntimeError), pool.checkout():
+                    raise RuntimeError('connection reset')
+            reset_llm.assert_called_once_with()
+        # Checked out before the error, so it holds the dropped client too
+        with pool.checkout() as fresh:
+            self.assertIsNot(fresh, healthy)
+        self.assertEqual(pool.stats(), {'size': 2, 'idle': 1, 'created': 3, 'discarded': 2})
+
+
+SUBMISSION = {
+    'full_name': 'Ann Lee', 'email': 'ann@example.com', 'target_position': 'Backend Engineer',
+    'job_description': 'Python and Django developer.\nDocker a plus.', 'technical_skills': 'Python, Django',
+    'experience_data': [{'title': 'Engineer', 'company': 'Acme', 'description': 'Built APIs'}],
+    'education_data': [], 'projects_data': [], 'bypass_cache': False,
+}
+
+
+@override_settings(RESUME_WORKERS_IN_PROCESS=False)
+class ResumeCacheTests(TestCase):
+    def setUp(self):
+        caches['resumes'].clear()
+
+    def test_keys_ignore_formatting_but_not_content(self):
+        reformatted = {
+            **SUBMISSION, 'full_name': ' Ann   Lee ', 'job_description': 'PYTHON and Django developer. Docker a plus.',
+            'experience_data': [{'description': 'Built  APIs', 'company': 'Acme', 'title': 'Engineer '},
+                                {'title': '', 'company': ''}],
+            'bypass_cache': True, 'unrelated': 'ignored',
+        }
+        self.assertEqual(resume_cache.resume_key(reformatted), resume_cache.resume_key(SUBMISSION))
+        self.assertNotEqual(resume_cache.resume_key({**SUBMISSION, 'technical_skills': 'Python'}),
+                            resume_cache.resume_key(SUBMISSION))
+        # Every candidate for the same posting shares its analysis
+        other_candidate = {'full_name': 'Bob Stone', 'job_description': SUBMISSION['job_description'],
+                           'target_position': 'backend engineer'}
+        self.assertEqual(resume_cache.analysis_key(other_candidate), resume_cache.analysis_key(SUBMISSION))
+        self.assertNotEqual(resume_cache.analysis_key({**SUBMISSION, 'target_industry': 'Finance'}),
+                            resume_cache.analysis_key(SUBMISSION))
+
+    def test_resubmission_is_answered_from_the_cache(self):
+        resume_cache.set_resume(SUBMISSION, SAMPLE_RESUME, 'Python, Django')
+        job = jobs.enqueue({**SUBMISSION, 'full_name': 'Ann  Lee'})
+        self.assertEqual((job.status, job.generated_resume), (ResumeGeneration.STATUS_DONE, SAMPLE_RESUME))
+
+        self.assertEqual(jobs.enqueue({**SUBMISSION, 'bypass_cache': True}).status, ResumeGeneration.STATUS_PENDING)
+        stats = resume_cache.cache_stats()
+        self.assertEqual((stats['resume_hit'], stats['resume_bypass']), (1, 1))
+
+
+class ProgressTests(SimpleTestCase):
+    def setUp(self):
+        caches['progress'].clear()
+
+    def events(self, job_id, after=0):
+        return [(event['event'], event['data']) for _, event in progress.read(job_id, after)]
+
+    @override_settings(RESUME_PROGRESS_TOKEN_INTERVAL=60)
+    def test_tokens_are_published_in_chunks_in_order(self):
+        with progress.bind(7):
+            progress.emit('stage', {'stage': 'analysis'})
+            progress.emit_token('not streamed yet')
+            progress.stream_tokens()
+            for token in ('Ann', ' Lee', '\n'):
+                progress.emit_token(token)
+            progress.emit('section', {'section': 'skills'})
+            progress.emit_token('Python')
+        self.assertEqual(self.events(7), [('stage', {'stage': 'analysis'}), ('token', 'Ann Lee\n'),
+                                          ('section', {'section': 'skills'}), ('token', 'Python')])
+        self.assertEqual(self.events(7, after=3), [('token', 'Python')])
+
+    @override_settings(RESUME_PROGRESS_TOKEN_INTERVAL=0)
+    def test_tokens_flush_every_interval(self):
+        with progress.bind(7):
+            progress.stream_tokens()
+            progress.emit_token('A')
+            progress.emit_token('B')
+        self.assertEqual(self.events(7), [('token', 'A'), ('token', 'B')])
+
+    def test_event_stream_relays_events_until_the_job_ends(self):
+        progress.publish(8, 'stage', {'stage': 'analysis'})
+        progress.publish(8, 'token', 'Ann')
+        progress.publish(8, 'done', {'status': 'done'})
+        progress.publish(8, 'token', 'after the end')
+
+        async def frames():
+            return [frame async for frame in progress.event_stream(8, initial=('running', {'attempt': 1}))]
+
+        self.assertEqual(async_to_sync(frames)(), [
+            progress.format_sse(0, 'running', {'attempt': 1}),
+            progress.format_sse(1, 'stage', {'stage': 'analysis'}),
+            progress.format_sse(2, 'token', 'Ann'),
+            progress.format_sse(3, 'done', {'status': 'done'}),
+        ])
+
+    @override_settings(RESUME_WORKERS_IN_PROCESS=False)
+    def test_out_of_process_workers_need_a_shared_cache(self):
+        self.assertEqual([error.id for error in checks.check_progress_cache(None)], ['main.E001'])
+        with tempfile.TemporaryDirectory() as directory, self.settings(CACHES={**settings.CACHES, 'progress': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory,
+        }}):
+            self.assertEqual(checks.check_progress_cache(None), [])
+        with self.settings(RESUME_WORKERS_IN_PROCESS=True):
+            self.assertEqual(checks.check_progress_cache(None), [])
+
+
+class KeywordExtractionTests(SimpleTestCase):
+    WORDS = ['Python', 'python_dev', 'Pythonic', 'Java', 'JavaScript', 'NoSQL', 'SQL', 'sql-server', 'Docker/AWS',
+             'Agile-Scrum', 'Bachelor', "Master's", 'PhD', 'degree', '5+ years', '5+years', '10 year', 'a5 years',
+             '3 yearsold', 'Requirements:', 'Skills', 'must have', 'experience with', 'and', '-', '\n', '\n', '.']
+
+    def assertMatchesRegexes(self, text):
+        expected = bench_keyword_extraction.legacy_analyze(text, DEFAULT_TECH_TERMS)
+        result = default_extractor().analyze(text)
+        self.assertEqual(set(result['keywords']), set(expected['keywords']), text)
+        self.assertEqual((result['skills'], result['requirements']), (expected['skills'], expected['requirements']), text)
+
+    def test_whole_words_overlaps_and_years(self):
+        text = ('Requirements:\n- 5+ years of Python, 3year JavaScript and NoSQL\n'
+                'Skills: Docker/Kubernetes, python_dev, Pythonic, Agile-Scrum\n'
+                '- Bachelor or Master degree (PhD welcome), 12 yearsold, a5 years')
+        result = default_extractor().extract(text)
+        self.assertEqual(result.keywords(), ['5+ years', 'Python', '3year', 'JavaScript', 'NoSQL', 'Docker',
+                                             'Kubernetes', 'Agile', 'Scrum', 'Bachelor', 'Master', 'degree', 'PhD'])
+        self.assertMatchesRegexes(text)
+
+    def test_random_postings_match_the_old_regexes(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            self.assertMatchesRegexes(' '.join(rng.choice(self.WORDS) for _ in range(rng.randint(1, 30))))
+
+
+class TaxonomyTests(TestCase):
+    def setUp(self):
+        taxonomy.invalidate()
+        self.addCleanup(taxonomy.invalidate)
+
+    def skills(self, text):
+        return taxonomy.skill_names(taxonomy.get_extractor().extract(text).skill_ids())
+
+    def test_aliases_resolve_to_the_canonical_skill(self):
+        self.assertEqual(self.skills('JS, ECMAScript and k8s; JavaScript too'), ['JavaScript', 'Kubernetes'])
+
+    @override_settings(SKILL_TAXONOMY_CHECK_INTERVAL=3600)
+    def test_saving_a_skill_reloads_this_process(self):
+        extractor = taxonomy.get_extractor()
+        self.assertEqual(self.skills('Rust and Python'), ['Python'])
+        Skill.objects.create(name='Rust', aliases=['rustlang'])
+        self.assertEqual(self.skills('rustlang and Python'), ['Rust', 'Python'])
+        self.assertIsNot(taxonomy.get_extractor(), extractor)
+
+    def test_edits_by_other_processes_are_noticed_at_the_next_check(self):
+        taxonomy.get_extractor()
+        # bulk_create and update send no signals, like saves in another process
+        Skill.objects.bulk_create([Skill(name='Go', aliases=['Golang'])])
+        with self.settings(SKILL_TAXONOMY_CHECK_INTERVAL=3600):
+            self.assertEqual(self.skills('Golang'), [])
+        with self.settings(SKILL_TAXONOMY_CHECK_INTERVAL=0):
+            self.assertEqual(self.skills('Golang'), ['Go'])
+            Skill.objects.filter(name='Go').update(aliases=['Golang', 'go-lang'])
+            self.assertEqual(self.skills('go-lang'), ['Go'])
+            go = Skill.objects.get(name='Go')
+            go.aliases = ['golang-dev']
+            Skill.objects.bulk_update([go], ['aliases'])
+            self.assertEqual(self.skills('golang-dev'), ['Go'])
+
+    def test_an_empty_table_falls_back_to_the_built_in_terms(self):
+        Skill.objects.all().delete()
+        self.assertEqual(taxonomy.get_extractor().tech_terms, DEFAULT_TECH_TERMS)
+
+
+class BatchAnalysisTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def post(self, body, content_type):
+        response = self.client.post(reverse('analyze_job_batch'), data=body, content_type=content_type)
+        if not response.streaming:
+            return response, None
+        return response, [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    @override_settings(ATS_BATCH_WORKERS=0)
+    def test_ndjson_streams_a_result_per_item_and_a_summary(self):
+        body = '\n'.join([json.dumps({'id': 'a', 'job_description': POSTING}), '{broken', '',
+                           json.dumps({'id': 'c', 'job_description': '  '}), json.dumps('Docker and AWS')])
+        response, lines = self.post(body, 'application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        results = {line['index']: line for line in lines[:-1]}
+        self.assertEqual(sorted(results), [0, 1, 2, 3])
+        self.assertEqual(results[0]['id'], 'a')
+        expected = batch_analysis.analysis_payload(taxonomy.get_extractor().extract(POSTING))
+        self.assertEqual(results[0]['analysis'], expected['analysis'])
+        self.assertEqual(results[0]['estimated_score'], expected['estimated_score'])
+        self.assertEqual([results[i]['error'] for i in (1, 2)], ['Job description is required'] * 2)
+        self.assertEqual(results[3]['analysis']['keywords'], ['Docker', 'AWS'])
+        self.assertEqual(lines[-1]['summary']['items'], 4)
+        self.assertEqual(lines[-1]['summary']['failed'], 2)
+
+    @override_settings(ATS_BATCH_WORKERS=2, ATS_BATCH_CHUNK_SIZE=2)
+    def test_large_batches_run_in_a_process_pool(self):
+        self.addCleanup(batch_analysis._reset_executor)
+        postings = [f'{POSTING}\n{n}+ years' for n in range(10, 15)]
+        _, lines = self.post(json.dumps(postings), 'application/json')
+        results = sorted(lines[:-1], key=lambda line: line['index'])
+        self.assertEqual([result['analysis']['keywords'][-1] for result in results],
+                         [f'{n}+ years' for n in range(10, 15)])
+
+    @override_settings(ATS_BATCH_MAX_ITEMS=2)
+    def test_oversized_and_malformed_batches_are_rejected(self):
+        self.assertEqual(self.post(json.dumps(['a', 'b', 'c']), 'application/json')[0].status_code, 413)
+        self.assertEqual(self.post('\n'.join(['"a"'] * 3), 'application/x-ndjson')[0].status_code, 413)
+        self.assertEqual(self.post(json.dumps({'job_description': 'a'}), 'application/json')[0].status_code, 400)
+
+
+@override_settings(RESUME_WORKERS_IN_PROCESS=False)
+class ResultTests(TestCase):
+    def setUp(self):
+        caches['resumes'].clear()
+
+    def test_results_are_addressed_by_id_and_private_to_their_session(self):
+        response = self.client.post(reverse('ai_resume'), {
+            'full_name': 'Ann Lee', 'email': 'ann@example.com', 'target_position': 'Backend Engineer',
+            'job_description': POSTING,
+        })
+        job = ResumeGeneration.objects.get()
+        self.assertRedirects(response, reverse('res_result', args=[job.pk]), fetch_redirect_response=False)
+        self.assertEqual(self.client.session['resume_history'], [job.pk])
+        self.assertRedirects(self.client.get(reverse('res_result')), reverse('res_result', args=[job.pk]),
+                             fetch_redirect_response=False)
+        self.assertEqual(self.client.get(reverse('resume_status', args=[job.pk])).json()['status'],
+                         ResumeGeneration.STATUS_PENDING)
+
+        stranger = Client()
+        self.assertEqual(stranger.get(reverse('resume_status', args=[job.pk])).status_code, 404)
+        self.assertRedirects(stranger.get(reverse('res_result', args=[job.pk])), reverse('ai_resume'),
+                             fetch_redirect_response=False)
+
+    def test_finished_generations_get_an_ats_analysis(self):
+        resume_cache.set_resume(SUBMISSION, SAMPLE_RESUME, 'Python, Django')
+        job = jobs.enqueue(SUBMISSION)
+        job.refresh_from_db()
+        analysis = ATSAnalysis.objects.get(resume_generation=job)
+        self.assertEqual(analysis.extracted_keywords, ['Python', 'Django', 'Docker'])
+        self.assertEqual(analysis.required_skills, ['Python', 'Django', 'Docker'])
+        self.assertEqual(job.keywords_matched, 3)
+        self.assertGreater(job.estimated_ats_score, 0)
+
+        session = self.client.session
+        session['resume_history'] = [job.pk]
+        session.save()
+        response = self.client.get(reverse('res_result', args=[job.pk]))
+        self.assertContains(response, f'<div class="score-number">{job.estimated_ats_score}</div>', html=True)
+        self.assertEqual(response.context['ats_analysis'], analysis)
+
+
+class ScoringTests(TestCase):
+    def test_coverage_counts_canonical_skills_and_lists_missing_terms(self):
+        requirements = scoring.JobRequirements('JavaScript and Docker developer. Bachelor degree required.')
+        self.assertEqual(requirements.keywords, ['JavaScript', 'Docker', 'Bachelor', 'degree'])
+        result = requirements.score('Jane Roe\njane@example.com | +1 555 0100\n\nSKILLS\nJS, docker, JS')
+        self.assertEqual((result.keywords_matched, result.keywords_required, result.coverage), (2, 4, 0.5))
+        self.assertEqual(result.missing, ['Bachelor', 'degree'])
+        # Three keyword mentions in eleven words
+        self.assertEqual(result.keyword_density, 27.27)
+        self.assertIn('Reduce keyword repetition; the resume may look keyword-stuffed', result.recommendations)
+        self.assertTrue(result.has_email and result.has_phone)
+
+    def test_structure_and_readability(self):
+        self.assertEqual(scoring.find_sections(SAMPLE_RESUME), {'summary', 'experience'})
+        self.assertEqual(scoring.find_sections('Skills: Python, Django, and a long line of other things'), set())
+        self.assertEqual(scoring.flesch_reading_ease(''), 0.0)
+        self.assertGreater(scoring.flesch_reading_ease('We ship code. It works.'),
+                           scoring.flesch_reading_ease('Architected comprehensive organizational infrastructure.'))
+
+    def test_scores_are_deterministic_and_bounded(self):
+        resumes = [SAMPLE_RESUME, '', 'Python ' * 200]
+        scores = scoring.score_resumes(POSTING, resumes)
+        self.assertEqual(scores, [scoring.score_resume(POSTING, resume) for resume in resumes])
+        self.assertTrue(all(0 <= score.ats_score <= 100 for score in scores))
+        self.assertGreater(scores[0].ats_score, scores[1].ats_score)
+
+    def test_batches_match_resume_by_resume_scores(self):
+        requirements = scoring.JobRequirements('JavaScript and Docker developer. Bachelor degree required.')
+        resumes = ['Jane Roe\njane@example.com | +1 555 0100\n\nSKILLS\nJS, docker, JS', '', 'Kotlin and Go',
+                   'Bachelor of Science. Docker, Docker, JavaScript and a degree']
+        self.assertEqual(requirements.score_many(resumes), [requirements.score(resume) for resume in resumes])
+        self.assertEqual(requirements.score_many([]), [])
+        self.assertEqual(scoring.JobRequirements('').score_many(['Python'])[0].coverage, 1.0)
+
+    def test_score_resumes_command_scores_in_batches(self):
+        for name, resume in (('a', SAMPLE_RESUME), ('b', 'Python and Django'), ('c', 'Pastry chef')):
+            ResumeGeneration.objects.create(full_name=name, form_data={}, generated_resume=resume,
+                                            status=ResumeGeneration.STATUS_DONE)
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as posting:
+            posting.write(POSTING)
+        self.addCleanup(os.unlink, posting.name)
+        out = io.StringIO()
+        with mock.patch.object(scoring.JobRequirements, 'score', side_effect=AssertionError('scored one by one')):
+            call_command('score_resumes', posting.name, '--batch-size', '2', stdout=out)
+        self.assertIn('Scored 3 resumes', out.getvalue())
+
+
+class MatchingTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        overrides = self.settings(RESUME_MATRIX_CACHE=pathlib.Path(directory) / 'matrix.npz')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.resumes = {}
+        for name, resume in (('python', 'Backend developer: Python, Django, Docker and AWS.'),
+                             ('java', 'Java developer building Spring services on AWS.'),
+                             ('chef', 'Pastry chef baking sourdough bread.')):
+            self.resumes[name] = ResumeGeneration.objects.create(
+                full_name=name, form_data={}, generated_resume=resume, status=ResumeGeneration.STATUS_DONE,
+            )
+
+    def test_rank_orders_resumes_by_similarity(self):
+        self.assertEqual(matching.ensure_vectors(), 3)
+        self.assertEqual(matching.missing_vectors(), 0)
+        ranked = matching.rank(['Python and Django developer with Docker', 'Bakery looking for a chef'], top=5)
+        self.assertEqual([pk for pk, _ in ranked[0]], [self.resumes['python'].pk, self.resumes['java'].pk])
+        self.assertEqual([pk for pk, _ in ranked[1]], [self.resumes['chef'].pk])
+        self.assertTrue(all(0 < score <= 1 for _, score in ranked[0]))
+        # Rebuilt only when a vector changes, and saved for other processes
+        matrix = matching.get_matrix()
+        self.assertIs(matching.get_matrix(), matrix)
+        matching.store_vector(self.resumes['chef'])
+        self.assertIsNot(matching.get_matrix(), matrix)
+        saved = matching.ResumeMatrix.from_file(settings.RESUME_MATRIX_CACHE, matching._signature())
+        self.assertEqual(list(saved.ids), sorted(resume.pk for resume in self.resumes.values()))
+
+    def test_admin_ranks_vectorized_resumes_without_vectorizing_in_the_request(self):
+        matching.store_vector(self.resumes['python'])
+        posting = ResumeGeneration.objects.create(full_name='Acme', form_data={}, job_description='Python developer')
+        User.objects.create_superuser('admin', password='secret')
+        self.client.login(username='admin', password='secret')
+        response = self.client.post(reverse('admin:main_resumegeneration_changelist'), {
+            'action': 'rank_matching_resumes', '_selected_action': [posting.pk],
+        })
+        [(ranked_posting, matches)] = response.context['results']
+        self.assertEqual((ranked_posting, [resume for resume, _ in matches]), (posting, [self.resumes['python']]))
+        self.assertContains(response, '2 finished resumes have no match vector yet')
+        self.assertEqual(matching.missing_vectors(), 2)
+        call_command('vectorize_resumes', stdout=io.StringIO())
+        self.assertEqual(matching.missing_vectors(), 0)
+
+
+class StageReuseTests(TestCase):
+    def setUp(self):
+        self.parent = ResumeGeneration.objects.create(
+            form_data=SUBMISSION, generated_resume=SAMPLE_RESUME, status=ResumeGeneration.STATUS_DONE,
+        )
+        stages.StageRecorder(self.parent).record(stages.STAGE_ANALYSIS, stages.analysis_digest(SUBMISSION),
+                                                 'parent analysis', llm_calls=1)
+
+    def revision(self, **changes):
+        return ResumeGeneration.objects.create(form_data={**SUBMISSION, **changes}, parent=self.parent)
+
+    def test_changed_sections(self):
+        self.assertEqual(stages.changed_sections(SUBMISSION, {**SUBMISSION, 'full_name': ' Ann  Lee'}), [])
+        self.assertEqual(stages.changed_sections(SUBMISSION, {**SUBMISSION, 'technical_skills': 'Go', 'phone': '1'}),
+                         ['contact', 'skills'])
+        self.assertIsNone(stages.changed_sections(SUBMISSION, {**SUBMISSION, 'target_position': 'SRE'}))
+
+    def test_unchanged_stages_reuse_the_parents_output(self):
+        job = self.revision(technical_skills='Python, Django, Go')
+        recorder = stages.StageRecorder(job)
+        compute = mock.Mock(return_value=('new analysis', 1))
+        self.assertEqual(recorder.run(stages.STAGE_ANALYSIS, stages.analysis_digest(job.form_data), compute),
+                         ('parent analysis', True))
+        compute.assert_not_called()
+        self.assertEqual(recorder.run(stages.STAGE_RESUME, stages.resume_digest(job.form_data), compute),
+                         ('new analysis', False))
+        self.assertEqual(stages.stage_stats(), {'runs': 3, 'reused': 1, 'tweaks': 0, 'llm_calls': 2})
+
+    def test_changed_target_or_regenerate_runs_again(self):
+        for job in (self.revision(job_description='Rust developer'), self.revision(bypass_cache=True)):
+            compute = mock.Mock(return_value=('new analysis', 1))
+            output, reused = stages.StageRecorder(job).run(
+                stages.STAGE_ANALYSIS, stages.analysis_digest(job.form_data), compute,
+            )
+            self.assertEqual((output, reused, compute.call_count), ('new analysis', False, 1))
+
+    def test_tweak_mode_revises_only_changed_sections(self):
+        tweak = self.revision(tweak=True, technical_skills='Go')
+        self.assertEqual(stages.StageRecorder(tweak).tweak_sections(tweak.form_data), ['skills'])
+        rewrite = self.revision(technical_skills='Go')
+        self.assertIsNone(stages.StageRecorder(rewrite).tweak_sections(rewrite.form_data))
+
+
+class SectionFanOutTests(SimpleTestCase):
+    DATA = {
+        **SUBMISSION, 'phone': '+1 555 0100',
+        'experience_data': [{'title': 'Engineer', 'company': 'Acme'}, {'title': '', 'company': ''},
+                            {'title': 'Intern', 'company': 'Initech'}],
+        'projects_data': [{'name': 'Placify'}], 'education_data': [{'degree': 'BSc', 'school': 'MIT', 'year': '2020'}],
+    }
+
+    def test_plan_and_merge(self):
+        planned = sections.plan_sections(self.DATA)
+        self.assertEqual([section.name for section in planned],
+                         ['summary', 'skills', 'experience.0', 'experience.1', 'projects'])
+        outputs = {section.name: f'<{section.name}>' for section in planned}
+        self.assertEqual(sections.merge_sections(self.DATA, planned, outputs), (
+            'Ann Lee\nann@example.com | +1 555 0100\n\nPROFESSIONAL SUMMARY\n<summary>\n\nSKILLS\n<skills>\n\n'
+            'EXPERIENCE\n<experience.0>\n\n<experience.1>\n\nPROJECTS\n<projects>\n\nEDUCATION\nBSc, MIT, 2020'
+        ))
+        # An edited entry changes its own digest only
+        edited = sections.plan_sections({**self.DATA, 'technical_skills': 'Go'})
+        self.assertEqual([a.digest('x') == b.digest('x') for a, b in zip(planned, edited)],
+                         [True, False, True, True, True])
+
+    def run_counting(self, planned, **kwargs):
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def generate(section):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return section.name.upper()
+
+        results = {section.name: output for section, output in sections.run_sections(planned, generate, **kwargs)}
+        return results, peak[0]
+
+    def test_sections_run_concurrently_up_to_the_limit(self):
+        planned = sections.plan_sections(self.DATA)
+        results, peak = self.run_counting(planned, max_workers=3)
+        self.assertEqual(results, {section.name: section.name.upper() for section in planned})
+        self.assertEqual(peak, 3)
+
+    @override_settings(RESUME_LLM_KEY_CONCURRENCY=1, OPENAI_API_KEY='section-test-key')
+    def test_calls_share_the_per_key_limit(self):
+        _, peak = self.run_counting(sections.plan_sections(self.DATA), max_workers=4)
+        self.assertEqual(peak, 1)
+        self.assertEqual(sections.in_flight_calls(), 0)
+
+    def test_a_failed_section_fails_the_draft(self):
+        def generate(section):
+            if section.name == 'skills':
+                raise RuntimeError('rate limited')
+            return 'ok'
+
+        with self.assertRaisesMessage(RuntimeError, 'rate limited'):
+            list(sections.run_sections(sections.plan_sections(self.DATA), generate, max_workers=1))
+
+
+@skipUnless(MockLLM, 'LangChain is not installed')
+class MockLLMTests(SimpleTestCase):
+    def test_response_is_deterministic(self):
+        prompt = 'Job Description: Python and Docker developer'
+        self.assertEqual(mock_response(prompt), mock_response(prompt))
+        self.assertNotEqual(mock_response(prompt), mock_response(prompt + ' with AWS'))
+
+    def test_response_mentions_prompt_skills_in_final_answer_format(self):
+        text = MockLLM(**FAST_MOCK).invoke('We need Python, Docker and AWS')
+        self.assertTrue(text.startswith('Thought:'))
+        self.assertIn('Final Answer:', text)
+        for skill in ('Python', 'Docker', 'AWS'):
+            self.assertIn(skill, text)
+
+    def test_streams_tokens_through_callbacks(self):
+        from langchain.callbacks.base import BaseCallbackHandler
+
+        class TokenCollector(BaseCallbackHandler):
+            def __init__(self):
+                self.tokens = []
+
+            def on_llm_new_token(self, token, **kwargs):
+                self.tokens.append(token)
+
+        collector = TokenCollector()
+        llm = MockLLM(**FAST_MOCK, streaming=True, callbacks=[collector])
+        text = llm.invoke('Django developer')
+        self.assertEqual(''.join(collector.tokens), text)
+
+    def test_failure_injection(self):
+        llm = MockLLM(**{**FAST_MOCK, 'failure_rate': 1.0})
+        with self.assertRaises(MockLLMError):
+            llm.invoke('anything')
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+class SessionStorageTests(TestCase):
+    def test_failed_login_message_does_not_create_a_session(self):
+        response = self.client.post(reverse('login'), {'username': 'nobody', 'password': 'x'}, follow=True)
+        self.assertContains(response, 'Invalid Data')
+        self.assertFalse(Session.objects.exists())
+
+    def test_expired_sessions_are_purged(self):
+        store = SessionStore()
+        store.set_expiry(-1)
+        store.save()
+        SessionStore().save()
+        jobs.purge_expired_sessions()
+        self.assertEqual(Session.objects.count(), 1)
+
+
+class StartupTests(SimpleTestCase):
+    def test_web_process_does_not_load_llm_libraries(self):
+        result = subprocess.run(
+            [sys.executable, '-c', bench_startup.CHILD, 'web'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(json.loads(result.stdout)['llm_modules'], [])
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ann', password='secret')
+        self.job = ResumeGeneration.objects.create(
+            user=self.user, full_name='Ann Lee', generated_resume=SAMPLE_RESUME, form_data={},
+            status=ResumeGeneration.STATUS_DONE, finished_at=timezone.now(),
+        )
+
+    async def test_login_and_pages_under_asgi(self):
+        response = await self.async_client.post(reverse('login'), {'username': 'ann', 'password': 'secret'})
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+        response = await self.async_client.get(reverse('index'))
+        self.assertContains(response, 'Welcome back, ann!')
+        response = await self.async_client.get(reverse('res_result', args=[self.job.pk]))
+        self.assertContains(response, 'PROFESSIONAL SUMMARY')
+
+    @override_settings(AUTHENTICATION_BACKENDS=[
+        'django.contrib.auth.backends.ModelBackend', 'django.contrib.auth.backends.AllowAllUsersModelBackend',
+    ])
+    async def test_login_goes_through_the_configured_backends(self):
+        failures = []
+        receiver = lambda sender, credentials, **kwargs: failures.append(credentials['username'])
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+
+        await self.async_client.post(reverse('login'), {'username': 'ann', 'password': 'wrong'})
+        self.assertEqual(failures, ['ann'])
+        response = await self.async_client.post(reverse('login'), {'username': 'ann', 'password': 'secret'})
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+        self.assertEqual((await self.async_client.session.aget(BACKEND_SESSION_KEY)),
+                         'django.contrib.auth.backends.ModelBackend')
+
+    async def test_polling_leaves_the_event_loop_only_for_io(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse('resume_status', args=[self.job.pk])
+        await self.async_client.get(url)
+        with bench_asgi._HandOffs() as hand_offs:
+            response = await self.async_client.get(url)
+        self.assertEqual(json.loads(response.content)['status'], ResumeGeneration.STATUS_DONE)
+        # request_started, session, user, generation, response close; none for middleware
+        self.assertLessEqual(hand_offs.count, 5)
+
+
+@override_settings(RESUME_WORKERS_IN_PROCESS=False, RESUME_LLM_PRICING={'input_per_1k': 0.0015, 'output_per_1k': 0.002})
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        caches['resumes'].clear()
+        caches['ratelimit'].clear()
+
+    def count(self, histogram, **labels):
+        counts = histogram.samples().get(tuple(labels.get(name, '') for name in histogram.labels))
+        return sum(counts[:-1]) if counts else 0
+
+    def test_metrics_are_for_staff_or_the_bearer_token(self):
+        ResumeGeneration.objects.create(form_data={})
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        # No token configured: an empty bearer token must not match
+        self.assertEqual(self.client.get(url, headers={'Authorization': 'Bearer '}).status_code, 403)
+        with self.settings(METRICS_TOKEN='s3cret'):
+            self.assertEqual(self.client.get(url, headers={'Authorization': 'Bearer wrong'}).status_code, 403)
+            response = self.client.get(url, headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        text = response.content.decode()
+        self.assertIn('# TYPE placify_request_duration_seconds histogram\n', text)
+        self.assertIn('# TYPE placify_llm_tokens_total counter\n', text)
+        self.assertIn('# TYPE placify_queue_depth gauge\nplacify_queue_depth 1\n', text)
+
+        self.client.force_login(User.objects.create_user('admin', password='secret', is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_histograms_accumulate_buckets_and_render_cumulatively(self):
+        histogram = metrics.Histogram('test_seconds', 'Test timings.', buckets=(0.5, 1, 10), labels=('view',))
+        counter = metrics.Counter('test_total', 'Test count.', labels=('direction',))
+        for metric in (histogram, counter):
+            self.addCleanup(metrics.REGISTRY.remove, metric)
+        for value in (0.3, 0.5, 5, 1000):
+            histogram.observe(value, view='a')
+        histogram.observe(2, view='b"c')
+        counter.inc(2, direction='in')
+        counter.inc(0.5, direction='in')
+
+        self.assertEqual(histogram.samples()[('a',)], [2, 0, 1, 1, 1005.8])
+        self.assertEqual(histogram.render(), [
+            '# HELP test_seconds Test timings.', '# TYPE test_seconds histogram',
+            'test_seconds_bucket{view="a",le="0.5"} 2', 'test_seconds_bucket{view="a",le="1"} 2',
+            'test_seconds_bucket{view="a",le="10"} 3', 'test_seconds_bucket{view="a",le="+Inf"} 4',
+            'test_seconds_sum{view="a"} 1005.8', 'test_seconds_count{view="a"} 4',
+            'test_seconds_bucket{view="b\\"c",le="0.5"} 0', 'test_seconds_bucket{view="b\\"c",le="1"} 0',
+            'test_seconds_bucket{view="b\\"c",le="10"} 1', 'test_seconds_bucket{view="b\\"c",le="+Inf"} 1',
+            'test_seconds_sum{view="b\\"c"} 2', 'test_seconds_count{view="b\\"c"} 1',
+        ])
+        self.assertEqual(counter.render()[2:], ['test_total{direction="in"} 2.5'])
+        self.assertIn('test_seconds_count{view="a"} 4', metrics.render())
+
+    def test_middleware_times_every_request_and_counts_its_queries(self):
+        seconds = self.count(metrics.REQUEST_SECONDS, view='home')
+        queries = self.count(metrics.REQUEST_QUERIES, view='home')
+        unmatched = self.count(metrics.REQUEST_SECONDS, view='unmatched')
+        self.client.get(reverse('home'))
+        self.client.get('/no-such-page/')
+        self.assertEqual(self.count(metrics.REQUEST_SECONDS, view='home'), seconds + 1)
+        self.assertEqual(self.count(metrics.REQUEST_QUERIES, view='home'), queries + 1)
+        self.assertEqual(self.count(metrics.REQUEST_SECONDS, view='unmatched'), unmatched + 1)
+
+    def test_sampled_request_traces_are_stored_on_their_generation(self):
+        form = {'full_name': 'Ann Lee', 'email': 'ann@example.com', 'target_position': 'Backend Engineer',
+                'job_description': POSTING}
+        with self.settings(TRACE_REQUEST_SAMPLE_RATE=1.0):
+            self.client.post(reverse('ai_resume'), form)
+        trace = ResumeGeneration.objects.get().request_trace
+        self.assertEqual((trace['name'], trace['sampled']), ('request', True))
+        self.assertGreater(trace['queries'], 0)
+        self.assertLessEqual({'form_parse', 'enqueue', 'view', 'middleware'}, {span['name'] for span in trace['spans']})
+
+        with self.settings(TRACE_REQUEST_SAMPLE_RATE=0):
+            self.client.post(reverse('ai_resume'), {**form, 'full_name': 'Bo Chen'})
+        self.assertEqual(ResumeGeneration.objects.get(full_name='Bo Chen').request_trace, {})
+
+    def test_job_traces_add_llm_usage_up_across_attempts(self):
+        job = ResumeGeneration.objects.create(form_data={}, status=ResumeGeneration.STATUS_PENDING)
+        retries = self.count(metrics.JOB_SECONDS, status='retry')
+        for _ in range(2):
+            with tracing.trace('job', sampled=True) as trace:
+                tracing.record_llm_usage(1000, 500)
+                tracing.record_llm_usage(200, 100)
+                tracing.incr('resume_cache.miss')
+            jobs._record_trace(job, trace)
+
+        job.refresh_from_db()
+        self.assertEqual((job.llm_tokens_in, job.llm_tokens_out), (2400, 1200))
+        self.assertAlmostEqual(job.llm_cost_usd, 2 * (1.2 * 0.0015 + 0.6 * 0.002))
+        self.assertEqual({key: job.job_trace[key] for key in ('llm_calls', 'tokens_in', 'tokens_out', 'counters')},
+                         {'llm_calls': 2, 'tokens_in': 1200, 'tokens_out': 600, 'counters': {'resume_cache.miss': 1}})
+        self.assertEqual(self.count(metrics.JOB_SECONDS, status='retry'), retries + 2)
+
+    def test_threads_bound_to_a_trace_count_every_query(self):
+        with tracing.trace('job', sampled=True) as trace:
+            def work():
+                with tracing.bind(trace):
+                    for _ in range(200):
+                        tracing._count_query(lambda *args: None, 'SELECT 1', (), False, {})
+
+            threads = [threading.Thread(target=work) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(trace.queries, 1600)
+
+
+class PromptTests(TestCase):
+    def test_candidate_data_is_compact(self):
+        user_data = {
+            'full_name': 'Ann Lee', 'email': '', 'technical_skills': 'Python,  Django',
+            'experience_data': [{'title': 'Engineer', 'company': 'Acme', 'start_date': '2021-01',
+                                 'end_date': '', 'description': 'Built APIs'}],
+            'education_data': [], 'projects_data': [],
+        }
+        text = prompts.candidate(user_data)
+        self.assertEqual(text, 'Name: Ann Lee\nTechnical skills: Python, Django\n'
+                               'Work experience:\n- Engineer, Acme (2021-01 - Present): Built APIs')
+
+    def test_long_posting_keeps_requirements_and_terms(self):
+        boilerplate = ''.join(f'Paragraph {i} about our culture, offices and mission.\n' for i in range(200))
+        posting = boilerplate + 'Requirements:\n- 5+ years of Python\n- Docker and AWS\n' + boilerplate
+        with tracing.trace('job', sampled=True) as trace:
+            text = prompts.posting(posting, max_tokens=100)
+        self.assertLessEqual(prompts.estimate_tokens(text), 100)
+        self.assertIn('- 5+ years of Python', text)
+        self.assertIn('Key terms: 5+ years, Python, Docker, AWS', text)
+        self.assertNotIn('Paragraph', text)
+        self.assertGreater(trace.counters['prompt.tokens_saved.posting'], 0)
+
+    def test_section_and_tweak_inputs_count_no_savings(self):
+        section = sections.Section('experience.0', 'experience', {'title': 'Engineer', 'company': 'Acme'})
+        with tracing.trace('job', sampled=True) as trace:
+            self.assertEqual(prompts.section_data(section), '- Engineer, Acme (Present)')
+            self.assertEqual(prompts.changed_inputs({'technical_skills': 'Go', 'soft_skills': ''}),
+                             'Technical skills: Go')
+        self.assertNotIn('prompt.tokens_saved.compact', trace.counters)
+
+    def test_render_fits_budget_by_cutting_parts(self):
+        text = prompts.render("""
+            Instructions
+            {analysis}
+            {draft}
+            """, budget=200, analysis=prompts.Part('word ' * 1000, min_tokens=50), draft='kept ' * 20)
+        self.assertTrue(text.startswith('Instructions\n'))
+        self.assertLessEqual(prompts.estimate_tokens(text), 200)
+        self.assertIn('kept ' * 20, text)
+
+    def test_render_cuts_parts_below_their_minimum_rather_than_overrun(self):
+        text = prompts.render('Instructions\n{analysis}\n{draft}', budget=60,
+                              analysis=prompts.Part('word ' * 1000, min_tokens=50),
+                              draft=prompts.Part('kept ' * 200, min_tokens=2000))
+        self.assertLessEqual(prompts.estimate_tokens(text), 60)
+        with self.assertRaises(prompts.BudgetExceeded):
+            prompts.render('Instructions {fixed}', budget=10, fixed='word ' * 100)
+
+    def test_tasks_of_a_generation_share_one_budget(self):
+        budget = prompts.Budget(total=3000)
+        budget.plan()
+        budget.plan(8)
+        budget.plan(prompts.RESUME_WEIGHT)
+        analysis = 'A requirement of the job. ' * 400
+        prompts.render('Analyze:\n{posting}', budget=budget, posting=prompts.Part('Python. ' * 2000))
+        sizes = []
+
+        def section():
+            text = prompts.render('Write a section.\n{candidate}\n{analysis}', budget=budget,
+                                  candidate=prompts.Part('Built APIs. ' * 300, min_tokens=200),
+                                  analysis=prompts.Part(analysis))
+            sizes.append(prompts.estimate_tokens(text))
+
+        threads = [threading.Thread(target=section) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        review = prompts.render('Review.\n{draft}', budget=budget, weight=prompts.RESUME_WEIGHT,
+                                draft=prompts.Part('Resume line. ' * 4000, min_tokens=2000))
+        self.assertLessEqual(budget.spent, 3000)
+        self.assertEqual(budget.planned, 0)
+        # The review carries the whole draft and gets the larger share
+        self.assertGreater(prompts.estimate_tokens(review), max(sizes))
+
+    @skipUnless(MockLLM and find_spec('crewai'), 'needs CrewAI and LangChain')
+    @override_settings(RESUME_PROMPT_TOKEN_BUDGET=4000, RESUME_SECTION_FANOUT=True)
+    def test_a_whole_generation_stays_under_the_budget(self):
+        from .pipeline import ResumeOptimizerAgent
+
+        caches['resumes'].clear()
+        user_data = {
+            **SUBMISSION, 'job_description': POSTING * 40, 'current_summary': 'Backend engineer. ' * 200,
+            'experience_data': [{'title': f'Engineer {n}', 'company': 'Acme', 'description': 'Built APIs. ' * 300}
+                                for n in range(12)],
+        }
+        rendered = []
+
+        def render(template, **values):
+            text = prompts_render(template, **values)
+            rendered.append(prompts.estimate_tokens(text))
+            return text
+
+        prompts_render = prompts.render
+        with mock.patch.object(prompts, 'render', render):
+            ResumeOptimizerAgent(llm=MockLLM(**FAST_MOCK)).create_optimized_resume(user_data)
+        # The analysis, every section and the review
+        self.assertEqual(len(rendered), 1 + len(sections.plan_sections(user_data)) + 1)
+        self.assertLessEqual(sum(rendered), 4000)
+
+
+POSTING = """Acme is hiring a Backend Engineer.
+Requirements:
+- 3+ years of Python and Django
+- A Bachelor degree
+Skills and technologies:
+- Docker, Kubernetes and AWS
+- SQL and Git
+"""
+
+
+class ScanRecorder:
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.scanned = []
+
+    def extract(self, text):
+        self.scanned.append(text)
+        return self.extractor.extract(text)
+
+
+class LiveAnalysisTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def _post(self, body, client=None):
+        return (client or self.client).post(reverse('analyze_job'), data=json.dumps(body),
+                                            content_type='application/json')
+
+    def test_state_is_kept_off_the_event_loop(self):
+        cache, loops = live_analysis._cache, []
+
+        def recording_cache():
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return cache()
+
+        with mock.patch.object(live_analysis, '_cache', recording_cache):
+            digest = self._post({'doc': 'page', 'job_description': POSTING}).json()['hash']
+            edited = POSTING + '\nFlask'
+            reply = self._post({'doc': 'page', 'base': digest, 'hash': live_analysis.content_hash(edited),
+                                'changes': [{'start': 7, 'end': 8, 'lines': ['', 'Flask']}]})
+        self.assertEqual(reply.status_code, 200)
+        self.assertTrue(loops)
+        self.assertEqual(set(loops), {None})
+
+    def test_line_edits_match_a_full_analysis_and_scan_only_edited_lines(self):
+        extractor = default_extractor()
+        index = LineIndex(extractor, POSTING)
+        lines = POSTING.split('\n')
+        edits = [(2, 3, ['- 5+ years of Java and React']), (5, 5, ['Must have:', '- Scrum']), (0, 1, []),
+                 (len(lines) - 1, len(lines), ['Qualifications', '- Master in CS', 'Agile teams'])]
+        for start, end, new in edits:
+            recorder = ScanRecorder(extractor)
+            index.replace(recorder, start, end, new)
+            self.assertEqual(recorder.scanned, new)
+            lines[start:end] = new
+            expected = extractor.extract('\n'.join(lines))
+            result = index.result()
+            self.assertEqual(result.as_dict(), expected.as_dict())
+            self.assertEqual(result.counts, expected.counts)
+        self.assertEqual(index.text, '\n'.join(lines))
+
+    def test_endpoint_applies_changes_to_the_sessions_text(self):
+        response = self._post({'doc': 'page', 'job_description': POSTING}).json()
+        self.assertEqual(response['hash'], live_analysis.content_hash(POSTING))
+        edited = POSTING.replace('- SQL and Git', '- SQL, Git and Flask')
+        change = {'start': 6, 'end': 7, 'lines': ['- SQL, Git and Flask']}
+        response = self._post({'doc': 'page', 'base': response['hash'], 'hash': live_analysis.content_hash(edited),
+                               'changes': [change]}).json()
+        self.assertEqual(response['analysis'], self._post({'job_description': edited}).json()['analysis'])
+        self.assertIn('Flask', response['analysis']['keywords'])
+
+        # A stale base, a text that does not match its hash or another page's id ask for the full text
+        for body in ({'base': 0, 'hash': response['hash']}, {'base': response['hash'], 'hash': 1},
+                     {'doc': 'other', 'base': response['hash'], 'hash': response['hash']}):
+            reply = self._post({'doc': 'page', 'changes': [], **body})
+            self.assertEqual(reply.status_code, 409)
+            self.assertTrue(reply.json()['resync'])
+
+
+    def test_edits_across_blocks_touch_only_their_blocks(self):
+        extractor, block = default_extractor(), live_analysis.BLOCK_LINES
+        lines = bench_live_analysis.posting(6 * block)
+        _, digest = live_analysis.start(extractor, 'session', 'page', '\n'.join(lines))
+        rng = random.Random(0)
+        for _ in range(40):
+            changes = []
+            for _ in range(rng.randint(1, 3)):
+                start = rng.randint(0, len(lines))
+                end = min(start + rng.choice([0, 1, 1, block + 10]), len(lines))
+                new = [rng.choice(['- Flask and PhD', 'Requirements:', '', 'Skills', '- 7+ years of Go'])
+                       for _ in range(rng.choice([0, 1, 2, block]))]
+                lines[start:end] = new
+                changes.append({'start': start, 'end': end, 'lines': new})
+            text = '\n'.join(lines)
+            recorder = ScanRecorder(extractor)
+            extraction, digest = live_analysis.update(recorder, 'session', 'page', {
+                'base': digest, 'hash': live_analysis.content_hash(text), 'changes': changes,
+            })
+            self.assertEqual(recorder.scanned, [line for change in changes for line in change['lines']])
+            expected = extractor.extract(text)
+            self.assertEqual(extraction.as_dict(), expected.as_dict())
+            self.assertEqual(extraction.skill_ids(), expected.skill_ids())
+
+        # One edited line rewrites the header and the block holding it
+        cache, row = caches['default'], len(lines) // 2
+        self.assertGreater(len(lines), 2 * block)
+        lines[row] += ' Kubernetes'
+        text = '\n'.join(lines)
+        with mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            live_analysis.update(extractor, 'session', 'page', {
+                'base': digest, 'hash': live_analysis.content_hash(text),
+                'changes': [{'start': row, 'end': row + 1, 'lines': [lines[row]]}],
+            })
+        self.assertEqual(len(set_many.call_args.args[0]), 2)
+
+    def test_visitors_without_a_session_get_one(self):
+        other = Client()
+        first = self._post({'doc': 'page', 'job_description': POSTING}).json()
+        self._post({'doc': 'page', 'job_description': 'Go developer'}, client=other)
+        self.assertNotEqual(self.client.session.session_key, other.session.session_key)
+
+        edited = POSTING + '\n- Flask'
+        response = self._post({'doc': 'page', 'base': first['hash'], 'hash': live_analysis.content_hash(edited),
+                               'changes': [{'start': 8, 'end': 8, 'lines': ['- Flask']}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Flask', response.json()['analysis']['keywords'])
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        caches['ratelimit'].clear()
+        # The cached queue load would outlive the jobs rolled back after a test
+        self.addCleanup(caches['ratelimit'].clear)
+
+    def analyze(self, client=None):
+        return (client or self.client).post(
+            reverse('analyze_job'), data=json.dumps({'job_description': 'Python developer'}),
+            content_type='application/json',
+        )
+
+    @override_settings(RATELIMITS={'analyze': {'ip': '3/m'}})
+    def test_burst_then_429_with_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.analyze().status_code, 200)
+        response = self.analyze()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(int(response['Retry-After']), 20)
+        self.assertEqual(response.json()['retry_after'], 20)
+
+    @override_settings(RATELIMITS={'analyze': {'ip': '1/m', 'global': '100/m'}})
+    def test_rejected_requests_are_not_charged(self):
+        self.analyze()
+        for _ in range(5):
+            self.assertEqual(self.analyze().status_code, 429)
+        other = Client(REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(self.analyze(other).status_code, 200)
+
+    @override_settings(RATELIMITS={'analyze': {'ip': '1/m'}})
+    def test_limits_survive_other_caches_filling_up(self):
+        self.assertEqual(self.analyze().status_code, 200)
+        # Past MAX_ENTRIES these caches cull their oldest entries
+        for alias in ('default', 'progress'):
+            cache = caches[alias]
+            self.addCleanup(cache.clear)
+            cache.set_many({f'filler:{i}': i for i in range(cache._max_entries + 1)})
+        self.assertEqual(self.analyze().status_code, 429)
+
+    @override_settings(RATELIMITS={'analyze': {'ip': '1/m'}})
+    def test_async_views_check_limits_off_the_event_loop(self):
+        cache, loops = ratelimit._cache, []
+
+        def recording_cache():
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return cache()
+
+        with mock.patch.object(ratelimit, '_cache', recording_cache):
+            self.assertEqual(self.analyze().status_code, 200)
+            self.assertEqual(self.analyze().status_code, 429)
+        self.assertEqual(loops, [None, None])
+
+    def jobs(self, status, count):
+        ResumeGeneration.objects.bulk_create(ResumeGeneration(status=status, form_data={}) for _ in range(count))
+        caches['ratelimit'].clear()
+
+    @override_settings(RESUME_ADMISSION_MODE='reject', RESUME_ADMISSION_RETRY_AFTER=7)
+    def test_generation_rejected_while_workers_are_busy(self):
+        self.jobs(ResumeGeneration.STATUS_RUNNING, settings.RESUME_WORKER_CONCURRENCY - 1)
+        self.assertIsNone(ratelimit.admit_generation())
+        self.jobs(ResumeGeneration.STATUS_RUNNING, 1)
+        self.assertEqual(ratelimit.admit_generation(), 7)
+
+    def test_generation_rejected_when_queue_is_full_with_the_default_settings(self):
+        self.jobs(ResumeGeneration.STATUS_RUNNING, settings.RESUME_WORKER_CONCURRENCY)
+        self.jobs(ResumeGeneration.STATUS_PENDING, settings.RESUME_ADMISSION_MAX_QUEUE - 1)
+        self.assertIsNone(ratelimit.admit_generation())
+        self.jobs(ResumeGeneration.STATUS_PENDING, 1)
+        self.assertEqual(ratelimit.admit_generation(), settings.RESUME_ADMISSION_RETRY_AFTER)
+
+    @override_settings(RESUME_WORKERS_IN_PROCESS=False, RESUME_ADMISSION_MAX_QUEUE=1,
+                       RATELIMITS={'generate': {'ip': '1/h'}})
+    def test_submissions_turned_away_by_admission_are_not_charged(self):
+        form = {'full_name': 'Ann Lee', 'email': 'ann@example.com', 'target_position': 'Backend Engineer',
+                'job_description': POSTING}
+        self.jobs(ResumeGeneration.STATUS_PENDING, 1)
+        for _ in range(3):
+            self.assertEqual(self.client.post(reverse('ai_resume'), form).status_code, 429)
+        ResumeGeneration.objects.all().delete()
+        caches['ratelimit'].delete('ratelimit:queue_load')
+        self.assertEqual(self.client.post(reverse('ai_resume'), form).status_code, 302)
+        self.assertEqual(self.client.post(reverse('ai_resume'), form).status_code, 429)
+
+
+SAMPLE_RESUME = """Ann Lee
+ann@example.com | +1 555 0100 | Remote
+
+## PROFESSIONAL SUMMARY
+Backend engineer with **6 years** of Python (and Django) experience.
+
+EXPERIENCE
+- Built APIs used by 1M users, cutting latency by 40%
+- Migrated services to Docker and AWS
+"""
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_dir)
+        overrides = self.settings(RESUME_EXPORT_DIR=self.export_dir)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_parse_blocks(self):
+        kinds = [kind for kind, _ in export.parse(SAMPLE_RESUME)]
+        self.assertEqual(kinds, ['name', 'contact', 'blank', 'heading', 'text', 'blank', 'heading', 'bullet', 'bullet'])
+        self.assertIn((export.TEXT, 'Backend engineer with 6 years of Python (and Django) experience.'),
+                      export.parse(SAMPLE_RESUME))
+
+    def test_pdf_and_docx_are_well_formed(self):
+        pdf = export.render(SAMPLE_RESUME, 'pdf', 'Ann Lee')
+        self.assertTrue(pdf.startswith(b'%PDF-1.4'))
+        self.assertTrue(pdf.rstrip().endswith(b'%%EOF'))
+        stream = re.search(rb'stream\n(.*?)\nendstream', pdf, re.S).group(1)
+        self.assertIn(b'(and Django\\)', zlib.decompress(stream))
+
+        with zipfile.ZipFile(io.BytesIO(export.render(SAMPLE_RESUME, 'docx'))) as archive:
+            document = archive.read('word/document.xml').decode()
+        self.assertIn('<w:pStyle w:val="Heading1"/>', document)
+        self.assertIn('Migrated services to Docker and AWS', document)
+        self.assertEqual(export.render(SAMPLE_RESUME, 'docx'), export.render(SAMPLE_RESUME, 'docx'))
+
+    def test_download_is_cached_and_conditional(self):
+        job = ResumeGeneration.objects.create(
+            full_name='Ann Lee', generated_resume=SAMPLE_RESUME, form_data={},
+            status=ResumeGeneration.STATUS_DONE, finished_at=timezone.now(),
+        )
+        session = self.client.session
+        session['resume_history'] = [job.pk]
+        session.save()
+        url = reverse('download_resume', args=[job.pk, 'pdf'])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('Ann_Lee_ATS_optimized.pdf', response['Content-Disposition'])
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        self.assertEqual(len(list(pathlib.Path(self.export_dir).rglob('*.pdf'))), 1)
+
+        revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+        self.assertEqual(self.client.get(reverse('download_resume', args=[job.pk, 'exe'])).status_code, 404)
+
+        loops = []
+
+        def recording_open(*args, **kwargs):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return open(*args, **kwargs)
+
+        with mock.patch('main.views.open', recording_open, create=True):
+            self.assertTrue(b''.join(self.client.get(url).streaming_content).startswith(b'%PDF'))
+        self.assertEqual(loops, [None])
+
+    def test_pdf_of_non_latin_text_is_exported_as_docx(self):
+        resume = SAMPLE_RESUME.replace('Ann Lee', 'Анна Ли')
+        self.assertEqual(export.output_format(SAMPLE_RESUME, 'pdf', 'Ann Lee'), 'pdf')
+        self.assertEqual(export.output_format(resume, 'pdf', 'Анна Ли'), 'docx')
+        self.assertEqual(export.output_format(SAMPLE_RESUME, 'pdf', 'Анна Ли'), 'docx')
+        with self.assertRaises(UnicodeEncodeError):
+            export.render_pdf(resume)
+
+        job = ResumeGeneration.objects.create(
+            full_name='Анна Ли', generated_resume=resume, form_data={},
+            status=ResumeGeneration.STATUS_DONE, finished_at=timezone.now(),
+        )
+        session = self.client.session
+        session['resume_history'] = [job.pk]
+        session.save()
+        response = self.client.get(reverse('download_resume', args=[job.pk, 'pdf']))
+        self.assertEqual(response['Content-Type'], export.FORMATS['docx'])
+        self.assertIn('.docx', response['Content-Disposition'])
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertIn('Анна Ли', archive.read('word/document.xml').decode())
+
+    def test_title_is_part_of_the_cache_key(self):
+        first, _ = export.export_path(SAMPLE_RESUME, 'pdf', 'Ann Lee')
+        second, rendered = export.export_path(SAMPLE_RESUME, 'pdf', 'Ann Lee-Smith')
+        self.assertTrue(rendered)
+        self.assertNotEqual(first, second)
+        self.assertIn(b'/Title (Ann Lee-Smith)', second.read_bytes())
+
+
+class HistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ann', password='secret')
+        other = User.objects.create_user('bob', password='secret')
+        created = timezone.now()
+        generations = ResumeGeneration.objects.bulk_create(
+            ResumeGeneration(user=self.user if index % 5 else other, full_name='Ann Lee', form_data={},
+                             target_position=f'Role {index}', status=ResumeGeneration.STATUS_DONE)
+            for index in range(50)
+        )
+        # Several rows share a timestamp so the cursor has to break ties on the id
+        for index, job in enumerate(generations):
+            ResumeGeneration.objects.filter(pk=job.pk).update(created_at=created - timedelta(minutes=index // 3))
+        ATSAnalysis.objects.bulk_create(ATSAnalysis(resume_generation=job, readability_score=70) for job in generations)
+        self.client.force_login(self.user)
+
+    def test_keyset_pages_cover_the_users_resumes_once(self):
+        url, seen = reverse('resume_history'), []
+        while url:
+            with self.assertNumQueries(2):  # user, one page; the session comes from the cache
+                response = self.client.get(url)
+            page = response.context['resumes']
+            self.assertLessEqual(len(page), views.HISTORY_PAGE_SIZE)
+            seen.extend(job.pk for job in page)
+            cursor = response.context['next_cursor']
+            url = f"{reverse('resume_history')}?after={cursor}" if cursor else None
+
+        expected = ResumeGeneration.objects.filter(user=self.user).order_by('-created_at', '-pk')
+        self.assertEqual(seen, list(expected.values_list('pk', flat=True)))
+
+    def test_detail_is_limited_to_the_owner(self):
+        own = ResumeGeneration.objects.filter(user=self.user).first()
+        other = ResumeGeneration.objects.exclude(user=self.user).first()
+        response = self.client.get(reverse('resume_detail', args=[own.pk]))
+        self.assertContains(response, own.target_position)
+        self.assertRedirects(self.client.get(reverse('resume_detail', args=[other.pk])), reverse('resume_history'))
+        # Staff read other people's resumes in the admin, not through the site
+        self.user.is_staff = True
+        self.user.save()
+        self.assertRedirects(self.client.get(reverse('resume_detail', args=[other.pk])), reverse('resume_history'))
+        self.assertEqual(self.client.get(reverse('resume_status', args=[other.pk])).status_code, 404)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ann', password='secret')
+        self.python = ResumeGeneration.objects.create(
+            user=self.user, full_name='Ann Lee', email='ann@example.com', target_position='Backend Engineer',
+            form_data={}, job_description='We need Kubernetes experience.', generated_resume=SAMPLE_RESUME,
+        )
+        self.other = ResumeGeneration.objects.create(
+            full_name='Bob Stone', email='bob@example.com', target_position='Python Trainer', form_data={},
+            job_description='Teach Python to beginners.', generated_resume='Taught Python for ten years.',
+        )
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        self.assertTrue(search.enabled())
+        self.assertEqual([hit.pk for hit in search.search('kubern')], [self.python.pk])
+        # A match in the position outranks one in the resume body
+        self.assertEqual([hit.pk for hit in search.search('python')], [self.other.pk, self.python.pk])
+        self.assertIn('[Python]', search.search('python', ids=[self.python.pk])[0].snippet)
+
+        ResumeGeneration.objects.filter(pk=self.other.pk).update(target_position='Golang Trainer')
+        self.assertEqual([hit.pk for hit in search.search('golang')], [self.other.pk])
+        self.assertEqual(search.search('trainer python', user=self.user), [])
+        self.other.delete()
+        self.assertEqual([hit.pk for hit in search.search('python')], [self.python.pk])
+
+    def test_queries_are_words_not_syntax(self):
+        self.assertEqual(search.terms('"C++" OR (django) \\ ann@example.com -'),
+                         ['C++', 'OR', '(django)', 'ann@example.com'])
+        self.assertEqual([hit.pk for hit in search.search('ann@example.com AND "')], [self.python.pk])
+        self.assertEqual(search.search('  " -- '), [])
+
+    def test_endpoint_and_history_are_scoped_to_the_visitor(self):
+        self.client.force_login(self.user)
+        results = self.client.get(reverse('resume_search'), {'q': 'python'}).json()['results']
+        self.assertEqual([result['id'] for result in results], [self.python.pk])
+        self.assertContains(self.client.get(reverse('resume_history'), {'q': 'kubernetes'}), 'Backend Engineer')
+
+    def test_admin_uses_the_index(self):
+        User.objects.create_superuser('admin', password='secret')
+        self.client.login(username='admin', password='secret')
+        response = self.client.get(reverse('admin:main_resumegeneration_changelist'), {'q': 'teach'})
+        self.assertEqual([job.pk for job in response.context['cl'].result_list], [self.other.pk])
+
+
+
+class StaticAssetTests(TestCase):
+    def test_anonymous_pages_are_cached(self):
+        caches['default'].clear()
+        rendered = self.client.get(reverse('home'))
+        self.assertTemplateUsed(rendered, 'home.html')
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.templates, [])
+        self.assertContains(response, 'Login')
+        self.assertEqual(dict(response.items()), dict(rendered.items()))
+
+        user = User.objects.create_user('ann', password='secret', first_name='Ann')
+        self.client.force_login(user)
+        response = self.client.get(reverse('home'))
+        self.assertTemplateUsed(response, 'home.html')
+        self.assertNotContains(response, 'btn-login')
+
+    def test_cached_pages_keep_the_headers_the_view_set(self):
+        caches['default'].clear()
+
+        async def view(request):
+            return HttpResponse('<p>Hi</p>', headers={'Content-Language': 'en', 'Cache-Control': 'max-age=60'})
+
+        page = page_cache.anonymous_page(view)
+        for _ in range(2):
+            request = RequestFactory().get('/page/')
+            request.auser = mock.AsyncMock(return_value=AnonymousUser())
+            response = async_to_sync(page)(request)
+            self.assertEqual(response.content, b'<p>Hi</p>')
+            self.assertEqual(response['Content-Language'], 'en')
+            self.assertEqual(response['Cache-Control'], 'max-age=60')
+
+    def test_font_awesome_is_served_from_this_site_with_the_cdn_as_fallback(self):
+        vendor._vendored.cache_clear()
+        self.addCleanup(vendor._vendored.cache_clear)
+        with mock.patch.object(vendor.finders, 'find', return_value='/app/all.min.css'), \
+                mock.patch.object(vendor, 'static', return_value='/static/all.1234.css'):
+            link = vendor.font_awesome()
+            self.assertEqual(checks.check_font_awesome(None), [])
+        self.assertTrue(link.startswith('<link href="/static/all.1234.css"'))
+        self.assertIn(vendor.FONT_AWESOME_CDN, link)
+
+        vendor._vendored.cache_clear()
+        with mock.patch.object(vendor.finders, 'find', return_value=None):
+            self.assertEqual(vendor.font_awesome(), f'<link href="{vendor.FONT_AWESOME_CDN}" rel="stylesheet">')
+            self.assertEqual([error.id for error in checks.check_font_awesome(None)], ['main.W001'])
+
+    def test_collected_assets_are_hashed_compressed_and_cached_for_good(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        with override_settings(STATIC_ROOT=root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            page = self.client.get(reverse('home')).content.decode()
+            url = re.search(r'href="(/static/main/css/home\.[0-9a-f]{12}\.css)"', page).group(1)
+
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='br;q=0, gzip')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+            self.assertIn('immutable', response['Cache-Control'])
+            css = gzip.decompress(b''.join(response.streaming_content))
+            response.close()
+            self.assertEqual(css, (pathlib.Path(__file__).parent / 'static/main/css/home.css').read_bytes())
+
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='identity')
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertEqual(b''.join(response.streaming_content), css)
+            response.close()
+            self.assertEqual(self.client.get('/static/main/css/missing.css').status_code, 404)
+
+
+@override_settings(
+    RESUME_LLM_BACKEND='mock',
+    RESUME_MOCK_LLM=FAST_MOCK,
+    RESUME_WORKERS_IN_PROCESS=True,
+    RESUME_WORKER_POLL_INTERVAL=0.05,
+    # Every simulated user shares one client address
+    RATELIMIT_ENABLED=False,
+)
+@skipUnless(MockLLM and find_spec('crewai'), 'CrewAI and LangChain are not installed')
+class ResumeLoadTest(TransactionTestCase):
+    """Offline end-to-end load test of the resume endpoints
+
+    Size the run with LOADTEST_SESSIONS and LOADTEST_CONCURRENCY. Query counts
+    are checked against fixed budgets so N+1 regressions fail the suite;
+    ``manage.py load_test`` prints the full latency report.
+    """
+    QUERY_BUDGETS = {
+        # The first analysis in a process also checks and loads the taxonomy
+        'analyze_job_description': 3,
+        # Admission counts queued and running jobs once per RESUME_ADMISSION_QUEUE_CHECK_INTERVAL
+        'resume_builder': 7,
+        # Sessions are read from the session cache, not the database
+        'resume_status': 1,
+        'resume_result': 1,
+        'download_resume': 1,
+    }
+
+    def setUp(self):
+        agent_pool.reset()
+
+    def tearDown(self):
+        jobs.stop_pool()
+        agent_pool.reset()
+
+    def test_resume_endpoints_under_load(self):
+        report = LoadTest(
+            sessions=int(os.environ.get('LOADTEST_SESSIONS', 12)),
+            concurrency=int(os.environ.get('LOADTEST_CONCURRENCY', 4)),
+        ).run()
+
+        self.assertEqual(report['jobs']['statuses'], {'done': report['sessions']})
+        summary = format_report(report)
+        for name, budget in self.QUERY_BUDGETS.items():
+            stats = report['endpoints'][name]
+            self.assertEqual(stats['errors'], 0, name)
+            self.assertLessEqual(stats['queries_max'], budget, name)
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'], name)
+            self.assertIn(name, summary)
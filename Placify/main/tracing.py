@@ -0,0 +1,177 @@
+"""Structured, sampled tracing of requests and resume generation jobs.
+
+A ``trace`` covers one HTTP request (started by ``RequestMetricsMiddleware``)
+or one job attempt (started in ``jobs.run_job``). Code inside marks phases
+with ``span(name)``: form parsing, agent checkout, each pipeline stage and
+section, template rendering. Each span records its wall time and the database
+queries it ran. LLM token usage, its estimated cost and cache lookups are
+added to the running trace, so every job row shows its own spend.
+
+Only sampled traces (``TRACE_REQUEST_SAMPLE_RATE`` and
+``TRACE_JOB_SAMPLE_RATE``) record spans. Token, cost and query totals are
+always counted, because they are cheap and are needed in full for
+accounting. The current trace lives in a context variable; threads that work
+for a trace, such as the section fan-out, join it with ``bind``.
+"""
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+
+from . import metrics
+
+_current = ContextVar('placify_trace', default=None)
+_thread = threading.local()
+
+
+def should_sample(kind):
+    rate = getattr(settings, f'TRACE_{kind.upper()}_SAMPLE_RATE', 1.0)
+    return rate >= 1.0 or (rate > 0 and random.random() < rate)
+
+
+def llm_cost(tokens_in, tokens_out):
+    """Estimated cost in USD under ``RESUME_LLM_PRICING``"""
+    pricing = getattr(settings, 'RESUME_LLM_PRICING', {})
+    return (tokens_in * pricing.get('input_per_1k', 0.0) + tokens_out * pricing.get('output_per_1k', 0.0)) / 1000
+
+
+class Trace:
+    def __init__(self, name, sampled):
+        self.name = name
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.queries = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.llm_calls = 0
+        self.counters = Counter()
+        self.spans = []
+        self.attributes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cost(self):
+        return llm_cost(self.tokens_in, self.tokens_out)
+
+    def add_span(self, name, seconds, queries):
+        with self._lock:
+            self.spans.append({'name': name, 'ms': round(seconds * 1000, 2), 'queries': queries})
+        metrics.SPAN_SECONDS.observe(seconds, span=name)
+
+    def add_query(self):
+        # Section threads bound to the trace run queries concurrently
+        with self._lock:
+            self.queries += 1
+
+    def add_count(self, name, amount):
+        with self._lock:
+            self.counters[name] += amount
+
+    def add_tokens(self, tokens_in, tokens_out):
+        with self._lock:
+            self.tokens_in += tokens_in
+            self.tokens_out += tokens_out
+            self.llm_calls += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'sampled': self.sampled,
+                'ms': round(self.duration * 1000, 2),
+                'queries': self.queries,
+                'llm_calls': self.llm_calls,
+                'tokens_in': self.tokens_in,
+                'tokens_out': self.tokens_out,
+                'cost_usd': round(self.cost, 6),
+                'counters': dict(self.counters),
+                'spans': list(self.spans),
+            }
+
+
+def current():
+    return _current.get()
+
+
+def _thread_queries():
+    return getattr(_thread, 'queries', 0)
+
+
+def _count_query(execute, sql, params, many, context):
+    _thread.queries = _thread_queries() + 1
+    trace = _current.get()
+    if trace is not None:
+        trace.add_query()
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def trace(name, sampled=None, count_queries=True):
+    """Run the block under a new trace; yields the ``Trace``"""
+    if sampled is None:
+        sampled = should_sample(name)
+    new = Trace(name, sampled)
+    token = _current.set(new)
+    try:
+        if count_queries:
+            with connection.execute_wrapper(_count_query):
+                yield new
+        else:
+            yield new
+    finally:
+        new.duration = time.perf_counter() - new.started
+        _current.reset(token)
+
+
+@contextmanager
+def bind(existing):
+    """Make ``existing`` the current trace in another thread"""
+    token = _current.set(existing)
+    try:
+        yield existing
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name):
+    """Record the wall time and queries of the block on the sampled current trace"""
+    current_trace = _current.get()
+    if current_trace is None or not current_trace.sampled:
+        yield
+        return
+    started = time.perf_counter()
+    queries = _thread_queries()
+    try:
+        yield
+    finally:
+        current_trace.add_span(name, time.perf_counter() - started, _thread_queries() - queries)
+
+
+def annotate(**attributes):
+    """Attach attributes (such as ``generation_id``) to the current trace"""
+    current_trace = _current.get()
+    if current_trace is not None:
+        current_trace.attributes.update(attributes)
+
+
+def incr(name, amount=1):
+    current_trace = _current.get()
+    if current_trace is not None:
+        current_trace.add_count(name, amount)
+
+
+def record_llm_usage(tokens_in, tokens_out):
+    """Account one LLM call to the current trace and the process metrics"""
+    metrics.LLM_TOKENS.inc(tokens_in, direction='in')
+    metrics.LLM_TOKENS.inc(tokens_out, direction='out')
+    metrics.LLM_COST.inc(llm_cost(tokens_in, tokens_out))
+    current_trace = _current.get()
+    if current_trace is not None:
+        current_trace.add_tokens(tokens_in, tokens_out)
@@ -9,6 +9,17 @@ urlpatterns = [
     path('index/', index, name='index'),
     path('resume/', resume_builder, name='ai_resume'),
     path('result/', resume_result, name='res_result'),
+    path('result/<int:pk>/', resume_result, name='res_result'),
+    path('result/<int:pk>/status/', resume_status, name='resume_status'),
+    path('result/<int:pk>/stream/', resume_stream, name='resume_stream'),
+    path('history/', resume_history, name='resume_history'),
+    path('history/<int:pk>/', resume_detail, name='resume_detail'),
+    path('history/search/', resume_search, name='resume_search'),
+    path('jobs/stats/', job_queue_stats, name='job_queue_stats'),
+    path('metrics/', prometheus_metrics, name='metrics'),
     path('download/', download_resume, name='download_resume'),
+    path('download/<int:pk>/', download_resume, name='download_resume'),
+    path('download/<int:pk>/<str:fmt>/', download_resume, name='download_resume'),
     path('analyze-job/', analyze_job_description, name='analyze_job'),
+    path('analyze-job/batch/', analyze_job_batch, name='analyze_job_batch'),
 ]
\ No newline at end of file
@@ -1,43 +1,62 @@
 from django.shortcuts import render, redirect
-from django.http import JsonResponse, HttpResponse
+from django.urls import reverse
+from django.http import FileResponse, Http404, JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 from django.conf import settings
+from django.db.models import Q
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
 import json
 import os
-from crewai import Agent, Task, Crew
-from crewai.tools import BaseTool
-from langchain.llms import OpenAI
-from typing import List, Dict, Any
-import re
-from datetime import datetime
-from django.contrib.auth import authenticate,login,logout
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.contrib.auth import aauthenticate, alogin, alogout
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.decorators import login_required
 from .models import *
+from . import (batch_analysis, export, jobs, live_analysis, metrics, progress, ratelimit, resume_cache, search,
+               stages, taxonomy, tracing)
+from .page_cache import anonymous_page
+from asgiref.sync import sync_to_async
 
 
-def home(request):
+# The light views below are async so an ASGI server runs them on its event
+# loop (see main/middleware.py for the middleware side). Sync views still work
+# under ASGI, each call in a worker thread.
+
+async def _auser(request):
+    """Load the visitor without blocking and pin it for sync code and templates"""
+    request.user = await request.auser()
+    return request.user
+
+# Password hashing is deliberately slow CPU work. It runs in a worker thread of
+# its own so neither the event loop nor the thread serving the database waits.
+_hash = sync_to_async(make_password, thread_sensitive=False)
+
+@anonymous_page
+async def home(request):
+    await _auser(request)
     return render(request, 'home.html')
-def login_page(request):
+async def login_page(request):
     if request.method== "POST":
         username = request.POST.get('username')
         password = request.POST.get('password')
 
-        if not User.objects.filter(username = username).exists():
-             messages.info(request, 'Invalid Data')
-             return redirect('/login/')
-        user = authenticate(username = username, password = password)
+        user = await aauthenticate(request, username=username, password=password)
 
         if user is None:
              messages.info(request, 'Invalid Data')
              return redirect('/login/')
         else :
-            login(request, user)
+            await alogin(request, user)
             return redirect('/')
 
+    await _auser(request)
     return render(request, 'login.html')
     
-def register_page(request):
+async def register_page(request):
 
     if request.method== "POST":
         first_name = request.POST.get('first_name')
@@ -45,374 +64,566 @@ def register_page(request):
         username = request.POST.get('username')
         password = request.POST.get('password')
 
-        user = User.objects.filter(username = username)
-        if user.exists():
+        if await User.objects.filter(username = username).aexists():
             messages.info(request, 'Username already Taken')
             return redirect('/register/')
 
-        user=User.objects.create(
+        user = User(
             first_name = first_name,
             last_name = last_name,
             username = username,
         )
-        user.set_password(password)
-        user.save()
+        user.password = await _hash(password)
+        await user.asave()
 
 
         messages.info(request, 'Account Created Successfully')
 
         return redirect("/login/")
 
+    await _auser(request)
     return render(request, 'register.html')
 
-def logout_page(request):
-    logout(request)
+async def logout_page(request):
+    await alogout(request)
     return redirect('/login/')
 
 
-def index(request):
+@anonymous_page
+async def index(request):
+    await _auser(request)
     return render(request, 'index.html')
-class ATSAnalyzerTool(BaseTool):
-    name: str = "ATS Analyzer"
-    description: str = "Analyzes job descriptions and extracts key requirements for ATS optimization"
-
-    def _run(self, job_description: str) -> Dict[str, List[str]]:
-        """Extract keywords and requirements from job description"""
-        # Simple keyword extraction - you can enhance this with NLP libraries
-        keywords = []
-        skills = []
-        requirements = []
-        
-        # Extract common sections
-        lines = job_description.lower().split('\n')
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if any(word in line for word in ['requirements', 'qualifications', 'must have']):
-                current_section = 'requirements'
-            elif any(word in line for word in ['skills', 'technologies', 'experience with']):
-                current_section = 'skills'
-            elif line and current_section:
-                if current_section == 'requirements':
-                    requirements.append(line)
-                elif current_section == 'skills':
-                    skills.append(line)
-        
-        # Extract technical terms and tools
-        tech_patterns = [
-            r'\b(Python|Java|JavaScript|React|Django|Flask|AWS|Azure|Docker|Kubernetes|SQL|NoSQL|Git|Agile|Scrum)\b',
-            r'\b(\d+\+?\s*years?)\b',
-            r'\b(Bachelor|Master|PhD|degree)\b'
-        ]
-        
-        for pattern in tech_patterns:
-            matches = re.findall(pattern, job_description, re.IGNORECASE)
-            keywords.extend(matches)
-        
-        return {
-            'keywords': list(set(keywords)),
-            'skills': skills,
-            'requirements': requirements
-        }
+def _parse_resume_form(request):
+    """Build the generation input (``user_data``) from the resume builder form"""
+    # Extract form data
+    user_data = {
+        'full_name': request.POST.get('full_name'),
+        'email': request.POST.get('email'),
+        'phone': request.POST.get('phone'),
+        'location': request.POST.get('location'),
+        'linkedin': request.POST.get('linkedin'),
+        'portfolio': request.POST.get('portfolio'),
+        'target_position': request.POST.get('target_position'),
+        'target_industry': request.POST.get('target_industry'),
+        'job_description': request.POST.get('job_description'),
+        'current_summary': request.POST.get('current_summary'),
+        'years_experience': request.POST.get('years_experience'),
+        'career_level': request.POST.get('career_level'),
+        'technical_skills': request.POST.get('technical_skills'),
+        'soft_skills': request.POST.get('soft_skills'),
+        'certifications': request.POST.get('certifications'),
+        'languages': request.POST.get('languages'),
+        'achievements': request.POST.get('achievements'),
+        'additional_info': request.POST.get('additional_info'),
+        'bypass_cache': request.POST.get('regenerate') == 'on',
+        'tweak': request.POST.get('tweak') == 'on',
+    }
 
-class ResumeOptimizerAgent:
-    def __init__(self):
-        self.llm = OpenAI(
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
-        
-        # Initialize CrewAI agents
-        self.ats_analyzer = Agent(
-            role='ATS Optimization Specialist',
-            goal='Analyze job descriptions and optimize resumes for ATS systems',
-            backstory="""You are an expert in Applicant Tracking Systems (ATS) and resume optimization. 
-            You understand how ATS systems parse and rank resumes, and you know the best practices for 
-            keyword optimization, formatting, and content structure to achieve high ATS scores.""",
-            verbose=True,
-            allow_delegation=False,
-            llm=self.llm,
-            tools=[ATSAnalyzerTool()]
-        )
-        
-        self.content_writer = Agent(
-            role='Professional Resume Writer',
-            goal='Create compelling and professional resume content',
-            backstory="""You are a professional resume writer with 10+ years of experience. You excel at 
-            crafting compelling professional summaries, quantifying achievements, and presenting experience 
-            in the most impactful way. You know how to highlight transferable skills and make candidates 
-            stand out while maintaining professional standards.""",
-            verbose=True,
-            allow_delegation=False,
-            llm=self.llm
-        )
-        
-        self.quality_reviewer = Agent(
-            role='Resume Quality Assurance Specialist',
-            goal='Review and improve resume quality and ATS compatibility',
-            backstory="""You are a meticulous quality assurance specialist who reviews resumes for 
-            grammar, consistency, ATS compatibility, and overall impact. You ensure that resumes 
-            meet industry standards and will perform well in both ATS systems and human review.""",
-            verbose=True,
-            allow_delegation=False,
-            llm=self.llm
-        )
+    # Process experience data
+    experience_data = []
+    experience_titles = request.POST.getlist('experience_title[]')
+    experience_companies = request.POST.getlist('experience_company[]')
+    experience_starts = request.POST.getlist('experience_start[]')
+    experience_ends = request.POST.getlist('experience_end[]')
+    experience_descriptions = request.POST.getlist('experience_description[]')
 
-    def create_optimized_resume(self, user_data: Dict[str, Any]) -> str:
-        """Create an ATS-optimized resume using CrewAI"""
-        
-        # Task 1: Analyze job description for ATS optimization
-        analyze_task = Task(
-            description=f"""
-            Analyze the following job description and extract:
-            1. Key technical skills and technologies
-            2. Required qualifications and experience levels
-            3. Important keywords that should appear in the resume
-            4. Soft skills mentioned in the job posting
-            5. Company culture indicators
-            
-            Job Description:
-            {user_data.get('job_description', '')}
-            
-            Target Position: {user_data.get('target_position', '')}
-            Target Industry: {user_data.get('target_industry', '')}
-            """,
-            agent=self.ats_analyzer,
-            expected_output="A detailed analysis of job requirements and ATS optimization keywords"
-        )
-        
-        # Task 2: Create optimized resume content
-        write_task = Task(
-            description=f"""
-            Create an ATS-optimized resume using the analysis from the previous task and the following candidate information:
-            
-            Personal Information:
-            - Name: {user_data.get('full_name', '')}
-            - Email: {user_data.get('email', '')}
-            - Phone: {user_data.get('phone', '')}
-            - Location: {user_data.get('location', '')}
-            - LinkedIn: {user_data.get('linkedin', '')}
-            - Portfolio: {user_data.get('portfolio', '')}
-            
-            Experience Level: {user_data.get('years_experience', '')} years
-            Career Level: {user_data.get('career_level', '')}
-            
-            Work Experience: {user_data.get('experience_data', [])}
-            Education: {user_data.get('education_data', [])}
-            Technical Skills: {user_data.get('technical_skills', '')}
-            Soft Skills: {user_data.get('soft_skills', '')}
-            Projects: {user_data.get('projects_data', [])}
-            Certifications: {user_data.get('certifications', '')}
-            Languages: {user_data.get('languages', '')}
-            Achievements: {user_data.get('achievements', '')}
-            Additional Info: {user_data.get('additional_info', '')}
-            Current Summary: {user_data.get('current_summary', '')}
-            
-            Requirements:
-            1. Create a compelling professional summary that incorporates job-specific keywords
-            2. Optimize work experience descriptions with action verbs and quantified achievements
-            3. Ensure skills section matches job requirements
-            4. Use ATS-friendly formatting
-            5. Include relevant keywords naturally throughout the resume
-            6. Structure the resume for maximum ATS compatibility
-            """,
-            agent=self.content_writer,
-            expected_output="A complete, ATS-optimized resume in professional format",
-            context=[analyze_task]
-        )
-        
-        # Task 3: Quality review and final optimization
-        review_task = Task(
-            description="""
-            Review the generated resume and ensure:
-            1. ATS compatibility (proper formatting, keyword density, structure)
-            2. Grammar and consistency
-            3. Professional presentation
-            4. Keyword optimization without over-stuffing
-            5. Quantified achievements where possible
-            6. Proper contact information formatting
-            7. Industry-appropriate language and terminology
-            
-            Provide the final, polished resume ready for submission.
-            """,
-            agent=self.quality_reviewer,
-            expected_output="A final, polished, ATS-optimized resume",
-            context=[analyze_task, write_task]
-        )
-        
-        # Create and run the crew
-        crew = Crew(
-            agents=[self.ats_analyzer, self.content_writer, self.quality_reviewer],
-            tasks=[analyze_task, write_task, review_task],
-            verbose=2
-        )
-        
-        result = crew.kickoff()
-        return result
+    for i in range(len(experience_titles)):
+        if experience_titles[i]:  # Only add if title is provided
+            experience_data.append({
+                'title': experience_titles[i],
+                'company': experience_companies[i] if i < len(experience_companies) else '',
+                'start_date': experience_starts[i] if i < len(experience_starts) else '',
+                'end_date': experience_ends[i] if i < len(experience_ends) else 'Present',
+                'description': experience_descriptions[i] if i < len(experience_descriptions) else ''
+            })
+
+    # Process education data
+    education_data = []
+    education_degrees = request.POST.getlist('education_degree[]')
+    education_schools = request.POST.getlist('education_school[]')
+    education_years = request.POST.getlist('education_year[]')
+    education_gpas = request.POST.getlist('education_gpa[]')
+
+    for i in range(len(education_degrees)):
+        if education_degrees[i]:  # Only add if degree is provided
+            education_data.append({
+                'degree': education_degrees[i],
+                'school': education_schools[i] if i < len(education_schools) else '',
+                'year': education_years[i] if i < len(education_years) else '',
+                'gpa': education_gpas[i] if i < len(education_gpas) else ''
+            })
+
+    # Process projects data
+    projects_data = []
+    project_names = request.POST.getlist('project_name[]')
+    project_techs = request.POST.getlist('project_tech[]')
+    project_descriptions = request.POST.getlist('project_description[]')
+    project_urls = request.POST.getlist('project_url[]')
+
+    for i in range(len(project_names)):
+        if project_names[i]:  # Only add if name is provided
+            projects_data.append({
+                'name': project_names[i],
+                'technologies': project_techs[i] if i < len(project_techs) else '',
+                'description': project_descriptions[i] if i < len(project_descriptions) else '',
+                'url': project_urls[i] if i < len(project_urls) else ''
+            })
+
+    user_data.update({
+        'experience_data': experience_data,
+        'education_data': education_data,
+        'projects_data': projects_data
+    })
+    
+    return user_data
 
 def resume_builder(request):
     """Main resume builder view"""
     if request.method == 'POST':
         try:
-            # Extract form data
-            user_data = {
-                'full_name': request.POST.get('full_name'),
-                'email': request.POST.get('email'),
-                'phone': request.POST.get('phone'),
-                'location': request.POST.get('location'),
-                'linkedin': request.POST.get('linkedin'),
-                'portfolio': request.POST.get('portfolio'),
-                'target_position': request.POST.get('target_position'),
-                'target_industry': request.POST.get('target_industry'),
-                'job_description': request.POST.get('job_description'),
-                'current_summary': request.POST.get('current_summary'),
-                'years_experience': request.POST.get('years_experience'),
-                'career_level': request.POST.get('career_level'),
-                'technical_skills': request.POST.get('technical_skills'),
-                'soft_skills': request.POST.get('soft_skills'),
-                'certifications': request.POST.get('certifications'),
-                'languages': request.POST.get('languages'),
-                'achievements': request.POST.get('achievements'),
-                'additional_info': request.POST.get('additional_info'),
-            }
-            
-            # Process experience data
-            experience_data = []
-            experience_titles = request.POST.getlist('experience_title[]')
-            experience_companies = request.POST.getlist('experience_company[]')
-            experience_starts = request.POST.getlist('experience_start[]')
-            experience_ends = request.POST.getlist('experience_end[]')
-            experience_descriptions = request.POST.getlist('experience_description[]')
-            
-            for i in range(len(experience_titles)):
-                if experience_titles[i]:  # Only add if title is provided
-                    experience_data.append({
-                        'title': experience_titles[i],
-                        'company': experience_companies[i] if i < len(experience_companies) else '',
-                        'start_date': experience_starts[i] if i < len(experience_starts) else '',
-                        'end_date': experience_ends[i] if i < len(experience_ends) else 'Present',
-                        'description': experience_descriptions[i] if i < len(experience_descriptions) else ''
-                    })
-            
-            # Process education data
-            education_data = []
-            education_degrees = request.POST.getlist('education_degree[]')
-            education_schools = request.POST.getlist('education_school[]')
-            education_years = request.POST.getlist('education_year[]')
-            education_gpas = request.POST.getlist('education_gpa[]')
-            
-            for i in range(len(education_degrees)):
-                if education_degrees[i]:  # Only add if degree is provided
-                    education_data.append({
-                        'degree': education_degrees[i],
-                        'school': education_schools[i] if i < len(education_schools) else '',
-                        'year': education_years[i] if i < len(education_years) else '',
-                        'gpa': education_gpas[i] if i < len(education_gpas) else ''
-                    })
-            
-            # Process projects data
-            projects_data = []
-            project_names = request.POST.getlist('project_name[]')
-            project_techs = request.POST.getlist('project_tech[]')
-            project_descriptions = request.POST.getlist('project_description[]')
-            project_urls = request.POST.getlist('project_url[]')
+            with tracing.span('form_parse'):
+                user_data = _parse_resume_form(request)
             
-            for i in range(len(project_names)):
-                if project_names[i]:  # Only add if name is provided
-                    projects_data.append({
-                        'name': project_names[i],
-                        'technologies': project_techs[i] if i < len(project_techs) else '',
-                        'description': project_descriptions[i] if i < len(project_descriptions) else '',
-                        'url': project_urls[i] if i < len(project_urls) else ''
-                    })
+            parent = _previous_generation(request, request.POST.get('previous_generation'))
             
-            user_data.update({
-                'experience_data': experience_data,
-                'education_data': education_data,
-                'projects_data': projects_data
-            })
-            
-            # Initialize resume optimizer and generate resume
-            optimizer = ResumeOptimizerAgent()
-            optimized_resume = optimizer.create_optimized_resume(user_data)
+            # Admission first, so a submission turned away is not charged to the buckets
+            retry_after = ratelimit.admit_generation() or ratelimit.check(request, 'generate')
+            if retry_after:
+                # Keep what the visitor typed so they can resubmit later
+                context = {'previous': parent, 'prefill': user_data, 'retry_after': retry_after}
+                response = render(request, 'ai_resume.html', context, status=429)
+                response['Retry-After'] = str(retry_after)
+                return response
             
-            # Store the result in session or return it
-            request.session['generated_resume'] = optimized_resume
-            request.session['user_data'] = user_data
+            # Queue the generation; a worker runs the CrewAI pipeline
+            with tracing.span('enqueue'):
+                job = jobs.enqueue(
+                    user_data,
+                    user=request.user if request.user.is_authenticated else None,
+                    parent=parent
+                )
+            tracing.annotate(generation_id=job.pk)
+            _remember_generation(request, job)
             
-            # Redirect to results page
-            return redirect('res_result')
+            # Redirect to results page, which polls until the job finishes
+            return redirect('res_result', pk=job.pk)
             
         except Exception as e:
             messages.error(request, f'Error generating resume: {str(e)}')
             return render(request, 'ai_resume.html')
     
-    return render(request, 'ai_resume.html')
+    previous = _previous_generation(request, request.GET.get('edit'))
+    context = {'previous': previous, 'prefill': previous.form_data if previous else None}
+    with tracing.span('render'):
+        return render(request, 'ai_resume.html', context)
+
+SESSION_HISTORY_LIMIT = 20
+
+def _remember_generation(request, job):
+    """Keep only generation ids in the session; content lives in the database"""
+    request.session['resume_job_id'] = job.pk
+    if not request.user.is_authenticated:
+        history = [pk for pk in request.session.get('resume_history', []) if pk != job.pk]
+        request.session['resume_history'] = (history + [job.pk])[-SESSION_HISTORY_LIMIT:]
+
+def _previous_generation(request, pk):
+    """The finished generation a submission edits, if the visitor may see it"""
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    job = _get_generation(request, pk)
+    return job if job is not None and job.status == ResumeGeneration.STATUS_DONE else None
+
+def _generation_query(pk, fields, related):
+    queryset = ResumeGeneration.objects.filter(pk=pk).select_related(*related)
+    if fields:
+        queryset = queryset.only('user_id', *fields)
+    return queryset
+
+def _visible(job, user, history):
+    if job is None:
+        return None
+    if job.user_id:
+        return job if job.user_id == user.id else None
+    return job if job.pk in history else None
+
+def _get_generation(request, pk=None, fields=None, related=()):
+    """Load a generation the current visitor may see, defaulting to the latest one"""
+    if pk is None:
+        pk = request.session.get('resume_job_id')
+        if not pk:
+            return None
+    
+    job = _generation_query(pk, fields, related).first()
+    return _visible(job, request.user, request.session.get('resume_history', []))
 
-def resume_result(request):
-    """Display the generated resume"""
-    generated_resume = request.session.get('generated_resume')
-    user_data = request.session.get('user_data')
+async def _aget_generation(request, pk=None, fields=None, related=()):
+    """``_get_generation`` for async views"""
+    if pk is None:
+        pk = await request.session.aget('resume_job_id')
+        if not pk:
+            return None
     
-    if not generated_resume:
+    job = await _generation_query(pk, fields, related).afirst()
+    return _visible(job, await _auser(request), await request.session.aget('resume_history', []))
+
+async def resume_result(request, pk=None):
+    """Display the generated resume, or a progress page while it is queued"""
+    job = await _aget_generation(request, pk, related=('atsanalysis',))
+    
+    if job is None:
         messages.warning(request, 'No resume found. Please generate a resume first.')
-        return redirect('resume_builder')
+        return redirect('ai_resume')
+    
+    if pk is None:
+        return redirect('res_result', pk=job.pk)
+    
+    if job.status == ResumeGeneration.STATUS_FAILED:
+        messages.error(request, f'Error generating resume: {job.error}')
+        return redirect('ai_resume')
     
     context = {
-        'resume_content': generated_resume,
-        'user_data': user_data
+        'job': job,
+        'ats_analysis': getattr(job, 'atsanalysis', None),
+        'pending': job.status != ResumeGeneration.STATUS_DONE,
+        'resume_content': job.generated_resume,
+        'user_data': job.form_data
     }
     
-    return render(request, 'res_result.html', context)
+    with tracing.span('render'):
+        return render(request, 'res_result.html', context)
+
+HISTORY_PAGE_SIZE = 20
+SEARCH_RESULTS = 50
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+def _history_cursor(job):
+    return f"{(job.created_at - _EPOCH) // timedelta(microseconds=1)}-{job.pk}"
+
+def _parse_history_cursor(value):
+    try:
+        micros, pk = (int(part) for part in (value or '').split('-'))
+    except ValueError:
+        return None
+    return _EPOCH + timedelta(microseconds=micros), pk
+
+def _search_scope(request):
+    """``search.search`` arguments limiting results to the visitor's resumes"""
+    if request.user.is_authenticated:
+        return {'user': request.user}
+    # Anonymous visitors see the generations remembered in their session
+    return {'ids': request.session.get('resume_history', [])}
+
+def _search_resumes(request, query, limit):
+    """Resumes matching ``query`` for the history page, best first, with snippets"""
+    hits = search.search(query, limit=limit, **_search_scope(request))
+    rows = (
+        ResumeGeneration.objects.select_related('atsanalysis')
+        .defer(*ResumeGeneration.LARGE_FIELDS)
+        .in_bulk([hit.pk for hit in hits])
+    )
+    resumes = []
+    for hit in hits:
+        resume = rows[hit.pk]
+        resume.snippet = hit.snippet
+        resumes.append(resume)
+    return resumes
+
+def resume_history(request):
+    """The visitor's resumes, newest first, one keyset page at a time
+    
+    Pages continue after the ``(created_at, id)`` of the last row shown, so
+    every page is one range scan of the (user, created_at) index however
+    deep the visitor goes, unlike OFFSET pagination. With ``q`` the page
+    lists the best full-text matches instead.
+    """
+    query = request.GET.get('q', '').strip()
+    if query:
+        context = {'resumes': _search_resumes(request, query, SEARCH_RESULTS), 'query': query, 'first_page': True}
+        with tracing.span('render'):
+            return render(request, 'resume_history.html', context)
+    
+    if request.user.is_authenticated:
+        resumes = ResumeGeneration.objects.filter(user=request.user)
+    else:
+        resumes = ResumeGeneration.objects.filter(pk__in=request.session.get('resume_history', []))
+    
+    cursor = _parse_history_cursor(request.GET.get('after'))
+    if cursor:
+        created_at, pk = cursor
+        resumes = resumes.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    
+    page = list(
+        resumes.select_related('atsanalysis')
+        .defer(*ResumeGeneration.LARGE_FIELDS)
+        .order_by('-created_at', '-pk')[:HISTORY_PAGE_SIZE + 1]
+    )
+    has_next = len(page) > HISTORY_PAGE_SIZE
+    page = page[:HISTORY_PAGE_SIZE]
+    
+    context = {
+        'resumes': page,
+        'next_cursor': _history_cursor(page[-1]) if has_next else None,
+        'first_page': cursor is None,
+    }
+    with tracing.span('render'):
+        return render(request, 'resume_history.html', context)
+
+def resume_search(request):
+    """Full-text search over the visitor's resumes and job descriptions (JSON)"""
+    retry_after = ratelimit.check(request, 'search')
+    if retry_after:
+        return ratelimit.too_many_requests(retry_after)
+    try:
+        limit = min(int(request.GET.get('limit', SEARCH_RESULTS)), SEARCH_RESULTS)
+    except ValueError:
+        return JsonResponse({'error': 'limit must be a number'}, status=400)
+    
+    resumes = _search_resumes(request, request.GET.get('q', ''), max(limit, 1))
+    return JsonResponse({'results': [
+        {
+            'id': resume.pk,
+            'full_name': resume.full_name,
+            'target_position': resume.target_position,
+            'status': resume.status,
+            'created_at': resume.created_at.isoformat(),
+            'snippet': resume.snippet,
+            'url': reverse('resume_detail', args=[resume.pk]),
+        }
+        for resume in resumes
+    ]})
+
+def resume_detail(request, pk):
+    """Summary of one stored resume with its ATS analysis"""
+    job = _get_generation(request, pk, related=('atsanalysis',))
+    if job is None:
+        messages.error(request, 'Resume not found or access denied.')
+        return redirect('resume_history')
+    
+    context = {
+        'resume': job,
+        'ats_analysis': getattr(job, 'atsanalysis', None),
+    }
+    with tracing.span('render'):
+        return render(request, 'resume_detail.html', context)
+
+async def resume_status(request, pk):
+    """Polling endpoint reporting the state of a generation job"""
+    job = await _aget_generation(request, pk, fields=('status', 'attempts', 'error'))
+    if job is None:
+        return JsonResponse({'error': 'Job not found'}, status=404)
+    
+    return JsonResponse({
+        'id': pk,
+        'status': job.status,
+        'attempts': job.attempts,
+        'error': job.error,
+    })
 
-def download_resume(request):
-    """Download the generated resume as a text file"""
-    generated_resume = request.session.get('generated_resume')
-    user_data = request.session.get('user_data')
+async def resume_stream(request, pk):
+    """Server-sent events with stage progress and streamed text for a job"""
+    job = await _aget_generation(request, pk, fields=('status', 'error'))
+    if job is None:
+        return JsonResponse({'error': 'Job not found'}, status=404)
     
-    if not generated_resume:
+    initial = (job.status, {'status': job.status})
+    if job.status == ResumeGeneration.STATUS_FAILED:
+        initial = ('failed', {'error': job.error})
+    
+    response = StreamingHttpResponse(
+        progress.event_stream(pk, initial=initial),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def job_queue_stats(request):
+    """Queue depth, latency, cache and stage reuse metrics for the generation workers"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    stats = jobs.queue_stats()
+    stats['cache'] = resume_cache.cache_stats()
+    stats['stages'] = stages.stage_stats()
+    return JsonResponse(stats)
+
+def prometheus_metrics(request):
+    """Prometheus scrape endpoint for staff sessions or the METRICS_TOKEN bearer token"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    authorized = request.user.is_staff or (
+        token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    )
+    if not authorized:
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def _open_export(text, fmt, title):
+    path, _ = export.export_path(text, fmt, title=title)
+    return open(path, 'rb')
+
+async def download_resume(request, pk=None, fmt='txt'):
+    """Download the generated resume as text, PDF or DOCX (see main/export.py)"""
+    if fmt not in export.FORMATS:
+        raise Http404('Unknown export format')
+    job = await _aget_generation(
+        request, pk, fields=('status', 'full_name', 'generated_resume', 'finished_at', 'updated_at')
+    )
+    
+    if job is None or job.status != ResumeGeneration.STATUS_DONE:
         messages.warning(request, 'No resume found. Please generate a resume first.')
         return redirect('ai_resume')
     
-    response = HttpResponse(generated_resume, content_type='text/plain')
-    filename = f"{user_data.get('full_name', 'resume').replace(' ', '_')}_ATS_optimized.txt"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
+    # A PDF of text the built-in PDF fonts cannot show is sent as DOCX
+    fmt = export.output_format(job.generated_resume, fmt, job.full_name)
+    # The file is rendered once per distinct resume text and format; browsers
+    # revalidate with If-None-Match / If-Modified-Since and get a 304
+    etag = f'"{export.content_hash(job.generated_resume, fmt, job.full_name)}"'
+    last_modified = (job.finished_at or job.updated_at).timestamp()
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': 'private, no-cache',
+    }
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if response is None:
+        # Rendering a file not in the export cache yet is CPU and disk work
+        handle = await sync_to_async(_open_export, thread_sensitive=False)(
+            job.generated_resume, fmt, job.full_name
+        )
+        response = FileResponse(
+            handle,
+            as_attachment=True,
+            filename=export.filename(job.full_name, fmt),
+            content_type=export.FORMATS[fmt],
+        )
+    for header, value in headers.items():
+        response[header] = value
     return response
 
 @csrf_exempt
-def analyze_job_description(request):
+async def analyze_job_description(request):
     """AJAX endpoint to analyze job description and provide real-time feedback"""
     if request.method == 'POST':
+        await _auser(request)
+        retry_after = await ratelimit.acheck(request, 'analyze')
+        if retry_after:
+            return ratelimit.too_many_requests(retry_after)
         try:
             data = json.loads(request.body)
-            job_description = data.get('job_description', '')
-            
-            if not job_description:
-                return JsonResponse({'error': 'Job description is required'})
+            extractor = await taxonomy.aget_extractor()
+            doc = data.get('doc')
+            digest = None
             
-            # Simple analysis for immediate feedback
-            analyzer = ATSAnalyzerTool()
-            analysis = analyzer._run(job_description)
-            
-            # Calculate approximate ATS score based on various factors
-            score = min(100, len(analysis['keywords']) * 5 + len(analysis['skills']) * 3)
+            if doc and 'changes' in data:
+                # Only the lines edited since the last call (see main/live_analysis.py)
+                try:
+                    extraction, digest = await live_analysis.aupdate(
+                        extractor, request.session.session_key, doc, data
+                    )
+                except live_analysis.Resync:
+                    return JsonResponse(
+                        {'error': 'Analysis state expired, send the full job description', 'resync': True},
+                        status=409
+                    )
+            else:
+                job_description = data.get('job_description', '')
+                
+                if not job_description:
+                    return JsonResponse({'error': 'Job description is required'})
+                
+                # Simple analysis for immediate feedback
+                if doc and not request.session.session_key:
+                    # The edit state is kept per session, so start one for a new visitor
+                    await request.session.acreate()
+                if doc and request.session.session_key:
+                    extraction, digest = await live_analysis.astart(
+                        extractor, request.session.session_key, doc, job_description
+                    )
+                else:
+                    extraction = extractor.extract(job_description)
+            payload = batch_analysis.analysis_payload(extraction)
             
             return JsonResponse({
                 'success': True,
-                'analysis': analysis,
-                'estimated_keywords': len(analysis['keywords']),
-                'estimated_score': score,
-                'suggestions': [
-                    'Include these key skills in your resume',
-                    'Use exact job title from the posting',
-                    'Quantify your achievements with numbers',
-                    'Match the company\'s language and terminology'
-                ]
+                **payload,
+                'canonical_skills': await taxonomy.askill_names(payload['skill_ids']),
+                'suggestions': batch_analysis.SUGGESTIONS,
+                **({'hash': digest} if digest is not None else {}),
             })
             
         except Exception as e:
             return JsonResponse({'error': str(e)})
     
-    return JsonResponse({'error': 'Invalid request method'})
\ No newline at end of file
+    return JsonResponse({'error': 'Invalid request method'})
+
+def _parse_batch(request, limit):
+    """Read a JSON array or NDJSON batch into ``(index, id, job_description)`` items
+
+    Items that cannot be analyzed are returned separately as error results so
+    they do not fail the whole batch.
+    """
+    if request.content_type == 'application/x-ndjson':
+        entries = []
+        for line in request:
+            line = line.strip()
+            if not line:
+                continue
+            if len(entries) >= limit:
+                raise OverflowError(f'Batch exceeds the limit of {limit} job descriptions')
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                entries.append(None)
+    else:
+        entries = json.loads(request.body)
+        if not isinstance(entries, list):
+            raise ValueError('Expected a JSON array of job descriptions')
+        if len(entries) > limit:
+            raise OverflowError(f'Batch exceeds the limit of {limit} job descriptions')
+    
+    items, errors = [], []
+    for index, entry in enumerate(entries):
+        item_id = entry.get('id') if isinstance(entry, dict) else None
+        job_description = entry.get('job_description') if isinstance(entry, dict) else entry
+        if not isinstance(job_description, str) or not job_description.strip():
+            errors.append({'index': index, 'id': item_id, 'error': 'Job description is required'})
+        else:
+            items.append((index, item_id, job_description))
+    return items, errors
+
+@csrf_exempt
+def analyze_job_batch(request):
+    """Analyze many job descriptions at once, streaming one NDJSON result per item"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+    
+    retry_after = ratelimit.check(request, 'analyze_batch')
+    if retry_after:
+        return ratelimit.too_many_requests(retry_after)
+    
+    try:
+        items, errors = _parse_batch(request, settings.ATS_BATCH_MAX_ITEMS)
+    except OverflowError as e:
+        return JsonResponse({'error': str(e)}, status=413)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    extractor = taxonomy.get_extractor()
+    
+    def stream():
+        started = time.perf_counter()
+        failed = len(errors)
+        for result in errors:
+            yield json.dumps(result) + '\n'
+        for result in batch_analysis.analyze_batch(extractor, items):
+            if 'error' in result:
+                failed += 1
+            yield json.dumps(result) + '\n'
+        yield json.dumps({'summary': {
+            'items': len(items) + len(errors),
+            'failed': failed,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+        }}) + '\n'
+    
+    return StreamingHttpResponse(stream(), content_type='application/x-ndjson')